@@ -0,0 +1,5 @@
+"""Scripts de benchmark du projet.
+
+Chaque module se lance depuis la racine du dépôt, par exemple:
+`python -m benchmarks.bench_retrieval`
+"""
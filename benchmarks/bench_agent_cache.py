@@ -0,0 +1,112 @@
+"""Mesure le temps d'un rerun Streamlit avec et sans cache d'agent.
+
+Usage:
+`python -m benchmarks.bench_agent_cache --reruns 50`
+
+Mesure d'abord l'étape "agent" d'un rerun, seule: l'ancien
+`build_portfolio_agent` appelé dans `main()` contre la lecture du cache
+(empreinte du prompt mémorisée, puis agent partagé). L'empreinte recalculée à
+chaque appel est aussi affichée, pour voir ce que coûterait un prompt
+reconstruit à chaque rerun.
+
+Puis l'application entière est exécutée avec `streamlit.testing` (sans
+navigateur ni appel réseau) dans une copie temporaire du dossier de données.
+"Sans cache" vide le cache d'agent avant chaque rerun. Le reste du script
+domine un rerun complet: l'écart entre les deux passes reste dans le bruit de
+mesure.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from portfolio.agent import (
+    construire_agent_portfolio,
+    empreinte_instructions,
+    obtenir_agent_portfolio,
+    vider_agents,
+)
+
+from .outils import chronometrer, resumer
+
+
+RACINE = Path(__file__).resolve().parent.parent
+VERSION_BENCH = "benchmark"
+
+
+def mesurer_reruns(app: AppTest, reruns: int, *, vider: bool) -> list[float]:
+    """Relance l'application et mesure chaque rerun.
+
+    Args:
+        app (AppTest): Application déjà exécutée une première fois.
+        reruns (int): Nombre de reruns mesurés.
+        vider (bool): Vider le cache d'agent avant chaque rerun.
+
+    Returns:
+        list[float]: Durée de chaque rerun en millisecondes.
+    """
+    durees = []
+    for _ in range(reruns):
+        if vider:
+            st.cache_resource.clear()
+            vider_agents()
+        debut = time.perf_counter()
+        app.run()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return durees
+
+
+def etape_agent_en_cache() -> object:
+    """Reproduit l'étape "agent" d'un rerun: empreinte du prompt, puis agent partagé.
+
+    Returns:
+        object: Agent en cache.
+    """
+    empreinte_instructions("concis", VERSION_BENCH)
+    return obtenir_agent_portfolio("portfolio", "concis", version=VERSION_BENCH)
+
+
+def main() -> int:
+    """Point d'entrée du benchmark.
+
+    Returns:
+        int: Code de sortie.
+    """
+    parser = argparse.ArgumentParser(description="Streamlit rerun time with and without the agent cache")
+    parser.add_argument("--reruns", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"agent reconstruit    {resumer(chronometrer(construire_agent_portfolio, args.reruns))}")
+    print(f"agent en cache       {resumer(chronometrer(etape_agent_en_cache, args.reruns))}")
+    print(f"empreinte recalculée {resumer(chronometrer(empreinte_instructions.__wrapped__, args.reruns))}")
+
+    # La clé n'est pas utilisée: l'app ne fait aucun appel pendant un rerun sans message.
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    with tempfile.TemporaryDirectory() as dossier:
+        shutil.copytree(RACINE / "data", Path(dossier) / "data")
+        shutil.copy(RACINE / "streamlit_app.py", dossier)
+        cwd = os.getcwd()
+        os.chdir(dossier)
+        try:
+            app = AppTest.from_file("streamlit_app.py", default_timeout=30)
+            app.run()
+            sans_cache = mesurer_reruns(app, args.reruns, vider=True)
+            avec_cache = mesurer_reruns(app, args.reruns, vider=False)
+        finally:
+            os.chdir(cwd)
+
+    print(f"rerun sans cache     {resumer(sans_cache)}")
+    print(f"rerun avec cache     {resumer(avec_cache)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,347 @@
+"""Test de charge du chat, hors ligne (sans OpenAI ni Upstash).
+
+Usage:
+`python -m benchmarks.bench_charge --conversations 40 --concurrence 8 --tours 4`
+
+Le vrai agent (`construire_agent_portfolio`, outil `retrieve_portfolio`
+compris) et la vraie recherche (`enrichir_question` / `search_portfolio`,
+caches et mémoïsation du tour compris) sont exécutés; seuls le modèle et
+l'index sont remplacés:
+- `ModeleFactice`: réponses déterministes, avec une latence et un nombre de
+  tokens de sortie réglables. Il appelle l'outil quand le message n'a pas de
+  contexte injecté, ou pour une part `--taux-outil` des questions. Il vérifie
+  que chaque `previous_response_id` désigne bien sa réponse précédente;
+- `IndexFactice` (`benchmarks.outils`): extraits de `data/`, avec latence.
+
+Chaque conversation tourne dans son propre thread avec `Runner.run_sync`,
+comme une session Streamlit, et enchaîne ses tours par `previous_response_id`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from agents import RunConfig, Runner
+from agents.items import ModelResponse
+from agents.models.interface import Model, ModelProvider
+from agents.usage import Usage
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+from portfolio.agent import construire_agent_portfolio
+from portfolio.chunking import decouper_tous_les_fichiers
+from portfolio.rag import enrichir_question, imposer_index_recherche, stats_cache_recherche
+from portfolio.text import estimer_tokens
+from portfolio.tracing import stats_etapes, tracer
+from portfolio.turn import tour_de_conversation
+
+from .bench_mmr import QUESTIONS_MMR
+from .outils import IndexFactice, MOTS, percentile
+
+
+MARQUEUR_CONTEXTE = "Infos sur moi:"
+
+
+@dataclass
+class StatsModele:
+    """Compteurs du modèle factice.
+
+    Args:
+        appels (int): Appels du modèle (un tour peut en faire plusieurs).
+        appels_outil (int): Appels de `retrieve_portfolio` demandés.
+        chainages_invalides (int): `previous_response_id` inconnus ou périmés.
+    """
+
+    appels: int = 0
+    appels_outil: int = 0
+    chainages_invalides: int = 0
+
+
+class ModeleFactice(Model):
+    """Modèle déterministe, sans réseau.
+
+    Args:
+        latence (float): Attente avant la réponse, en secondes.
+        secondes_par_token (float): Attente supplémentaire par token de sortie.
+        tokens_sortie (int): Longueur des réponses, en mots.
+        taux_outil (float): Part des questions (avec contexte) pour lesquelles
+            l'outil est quand même appelé.
+    """
+
+    def __init__(
+        self,
+        latence: float = 0.3,
+        secondes_par_token: float = 0.0,
+        tokens_sortie: int = 80,
+        taux_outil: float = 0.2,
+    ) -> None:
+        self.latence = latence
+        self.secondes_par_token = secondes_par_token
+        self.tokens_sortie = tokens_sortie
+        self.taux_outil = taux_outil
+        self.stats = StatsModele()
+        # Dernière réponse de chaque chaîne: id de réponse -> id de chaîne
+        self._chaines: dict[str, str] = {}
+        self._compteur = 0
+        self._verrou = threading.Lock()
+
+    def _nouvel_id(self, previous_response_id: str | None) -> str:
+        with self._verrou:
+            self._compteur += 1
+            self.stats.appels += 1
+            if previous_response_id is None:
+                chaine = f"chaine_{self._compteur}"
+            else:
+                # Une réponse ne peut être suivie qu'une fois: la chaîne avance.
+                chaine = self._chaines.pop(previous_response_id, None)
+                if chaine is None:
+                    self.stats.chainages_invalides += 1
+                    chaine = f"chaine_{self._compteur}"
+            identifiant = f"resp_{self._compteur}"
+            self._chaines[identifiant] = chaine
+            return identifiant
+
+    @staticmethod
+    def _texte(input) -> str:
+        if isinstance(input, str):
+            return input
+        morceaux = []
+        for item in input:
+            contenu = item.get("content") if isinstance(item, dict) else None
+            if isinstance(contenu, str):
+                morceaux.append(contenu)
+        return "\n".join(morceaux)
+
+    def _doit_appeler_outil(self, texte: str) -> bool:
+        if MARQUEUR_CONTEXTE not in texte:
+            return True
+        question = texte.rsplit("Question:", 1)[-1]
+        return zlib.crc32(question.encode("utf-8")) % 1000 < self.taux_outil * 1000
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *,
+        previous_response_id=None,
+        conversation_id=None,
+        prompt=None,
+    ) -> ModelResponse:
+        items = [] if isinstance(input, str) else list(input)
+        sortie_outil = any(isinstance(i, dict) and i.get("type") == "function_call_output" for i in items)
+        texte = self._texte(input)
+        identifiant = self._nouvel_id(previous_response_id)
+
+        if not sortie_outil and self._doit_appeler_outil(texte):
+            await asyncio.sleep(self.latence)
+            with self._verrou:
+                self.stats.appels_outil += 1
+            question = texte.rsplit("Question:", 1)[-1].strip()
+            sortie = [ResponseFunctionToolCall(
+                id=f"fc_{identifiant}",
+                call_id=f"call_{identifiant}",
+                name="retrieve_portfolio",
+                arguments=json.dumps({"requete": question}, ensure_ascii=False),
+                type="function_call",
+                status="completed",
+            )]
+            tokens_sortie = 20
+        else:
+            await asyncio.sleep(self.latence + self.secondes_par_token * self.tokens_sortie)
+            mots = [MOTS[(zlib.crc32(texte.encode("utf-8")) + i) % len(MOTS)] for i in range(self.tokens_sortie)]
+            sortie = [ResponseOutputMessage(
+                id=f"msg_{identifiant}",
+                content=[ResponseOutputText(annotations=[], text=" ".join(mots), type="output_text")],
+                role="assistant",
+                status="completed",
+                type="message",
+            )]
+            tokens_sortie = self.tokens_sortie
+
+        tokens_entree = estimer_tokens((system_instructions or "") + texte)
+        usage = Usage(
+            requests=1,
+            input_tokens=tokens_entree,
+            output_tokens=tokens_sortie,
+            total_tokens=tokens_entree + tokens_sortie,
+        )
+        return ModelResponse(output=sortie, usage=usage, response_id=identifiant)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError("ModeleFactice ne gère que les réponses complètes")
+
+
+class FournisseurFactice(ModelProvider):
+    """Fournisseur qui sert le même modèle factice quel que soit le nom demandé.
+
+    Args:
+        modele (ModeleFactice): Modèle partagé par tous les agents.
+    """
+
+    def __init__(self, modele: ModeleFactice) -> None:
+        self.modele = modele
+
+    def get_model(self, model_name: str | None) -> Model:
+        return self.modele
+
+
+@dataclass
+class Tour:
+    """Mesures d'un tour de conversation.
+
+    Args:
+        duree (float): Durée du tour, en secondes.
+        appels_outil (int): Appels de `retrieve_portfolio` pendant le tour.
+    """
+
+    duree: float
+    appels_outil: int
+
+
+@dataclass
+class Resultats:
+    """Mesures de toute la charge.
+
+    Args:
+        tours (list[Tour]): Tours terminés.
+        erreurs (list[str]): Tours en erreur.
+    """
+
+    tours: list[Tour] = field(default_factory=list)
+    erreurs: list[str] = field(default_factory=list)
+    _verrou: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def ajouter(self, tour: Tour) -> None:
+        with self._verrou:
+            self.tours.append(tour)
+
+    def echouer(self, erreur: str) -> None:
+        with self._verrou:
+            self.erreurs.append(erreur)
+
+
+def simuler_conversation(
+    numero: int,
+    nb_tours: int,
+    agent,
+    config: RunConfig,
+    resultats: Resultats,
+    *,
+    injecter_contexte: bool,
+) -> None:
+    """Joue une conversation complète, tour après tour.
+
+    Args:
+        numero (int): Numéro de la conversation (choix des questions).
+        nb_tours (int): Nombre de tours.
+        agent: Agent du portfolio.
+        config (RunConfig): Configuration du run (fournisseur factice).
+        resultats (Resultats): Mesures partagées.
+        injecter_contexte (bool): Ajouter les extraits à la question, comme l'app.
+
+    Returns:
+        None
+    """
+    previous_response_id = None
+    for rang in range(nb_tours):
+        question = QUESTIONS_MMR[(numero * 3 + rang) % len(QUESTIONS_MMR)]
+        debut = time.perf_counter()
+        try:
+            with tracer("tour"), tour_de_conversation() as tour:
+                texte = enrichir_question(question) if injecter_contexte else question
+                with tracer("agent"):
+                    result = Runner.run_sync(
+                        agent,
+                        texte,
+                        previous_response_id=previous_response_id,
+                        max_turns=6,
+                        run_config=config,
+                    )
+        except Exception as exc:
+            resultats.echouer(f"conversation {numero}, tour {rang}: {exc!r}")
+            return
+        previous_response_id = result.last_response_id
+        resultats.ajouter(Tour(time.perf_counter() - debut, tour.stats.appels_outil))
+
+
+def main() -> int:
+    """Point d'entrée du test de charge.
+
+    Returns:
+        int: Code de sortie (1 si des tours échouent ou si un chaînage est invalide).
+    """
+    parser = argparse.ArgumentParser(description="Offline load test of the chat path (fake model and index)")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--conversations", type=int, default=40)
+    parser.add_argument("--concurrence", type=int, default=8, help="Conversations running at the same time")
+    parser.add_argument("--tours", type=int, default=4, help="Turns per conversation")
+    parser.add_argument("--latence-modele", type=float, default=0.3, help="Seconds per model call")
+    parser.add_argument("--secondes-par-token", type=float, default=0.0)
+    parser.add_argument("--tokens-sortie", type=int, default=80, help="Words per answer")
+    parser.add_argument("--taux-outil", type=float, default=0.2, help="Share of questions that still call the tool")
+    parser.add_argument("--latence-index", type=float, default=0.05, help="Seconds per index query")
+    parser.add_argument("--sans-contexte", action="store_true", help="Do not inject context (every turn uses the tool)")
+    args = parser.parse_args()
+
+    index = IndexFactice(latence=args.latence_index, reserve=decouper_tous_les_fichiers(str(Path(args.data_dir))))
+    imposer_index_recherche(index)
+    modele = ModeleFactice(args.latence_modele, args.secondes_par_token, args.tokens_sortie, args.taux_outil)
+    config = RunConfig(model_provider=FournisseurFactice(modele), tracing_disabled=True)
+    agent = construire_agent_portfolio()
+    resultats = Resultats()
+
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrence) as pool:
+        for numero in range(args.conversations):
+            pool.submit(
+                simuler_conversation, numero, args.tours, agent, config, resultats,
+                injecter_contexte=not args.sans_contexte,
+            )
+    duree = time.perf_counter() - debut
+    imposer_index_recherche(None)
+
+    tours = resultats.tours
+    print(
+        f"{args.conversations} conversations x {args.tours} turns, "
+        f"{args.concurrence} concurrent: {len(tours)} turns in {duree:.1f}s "
+        f"({len(tours) / duree:.1f} turns/s)"
+    )
+    if tours:
+        durees = [t.duree * 1000 for t in tours]
+        print(
+            f"turn latency: p50={percentile(durees, 50):.0f} ms  p95={percentile(durees, 95):.0f} ms  "
+            f"p99={percentile(durees, 99):.0f} ms"
+        )
+        repartition: dict[int, int] = {}
+        for t in tours:
+            repartition[t.appels_outil] = repartition.get(t.appels_outil, 0) + 1
+        moyenne = sum(t.appels_outil for t in tours) / len(tours)
+        detail = ", ".join(f"{n} call(s): {nb}" for n, nb in sorted(repartition.items()))
+        print(f"tool calls per turn: mean={moyenne:.2f} ({detail})")
+    cache = stats_cache_recherche()
+    print(
+        f"model calls: {modele.stats.appels} • index queries: {index.requetes} • "
+        f"search cache hits: {cache.hits}/{cache.hits + cache.misses}"
+    )
+    for etape, s in stats_etapes().items():
+        print(f"  {etape:<16} p50={s.p50:8.1f} ms  p95={s.p95:8.1f} ms  p99={s.p99:8.1f} ms  (n={s.nb})")
+    print(f"invalid previous_response_id chains: {modele.stats.chainages_invalides}")
+    for erreur in resultats.erreurs[:5]:
+        print(f"ERROR {erreur}")
+    return 1 if resultats.erreurs or modele.stats.chainages_invalides else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""Mesure le gain de la découpe multi-cœurs (`--jobs`) sur un corpus synthétique.
+
+Usage:
+`python -m benchmarks.bench_chunking_parallele --files 20000 --jobs 1 2 4 8`
+
+Chaque configuration est comparée au mode série: mêmes chunks, dans le même
+ordre, avec les mêmes ids. Le gain dépend du nombre de cœurs disponibles.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from portfolio.chunking import iterer_chunks
+
+from .outils import generer_corpus
+
+
+def decouper(dossier: str, jobs: int) -> tuple[list[str], float]:
+    """Découpe tout le corpus et retourne les ids obtenus.
+
+    Args:
+        dossier (str): Dossier du corpus.
+        jobs (int): Nombre de processus.
+
+    Returns:
+        tuple[list[str], float]: (ids dans l'ordre, durée en secondes).
+    """
+    debut = time.perf_counter()
+    ids = [chunk["id"] for chunk in iterer_chunks(dossier, jobs=jobs)]
+    return ids, time.perf_counter() - debut
+
+
+def main() -> int:
+    """Point d'entrée du benchmark.
+
+    Returns:
+        int: Code de sortie (1 si une configuration diffère du mode série).
+    """
+    parser = argparse.ArgumentParser(description="Serial vs multi-process chunking")
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cœurs disponibles")
+    with tempfile.TemporaryDirectory() as racine:
+        dossier = str(generer_corpus(Path(racine) / "data", args.files))
+        reference, duree_serie = decouper(dossier, 1)
+        print(f"{'jobs':>5} | {'durée':>7} | {'speedup':>7} | identique")
+        print(f"{1:>5} | {duree_serie:>6.2f}s | {1.0:>6.2f}x | oui")
+
+        code = 0
+        for jobs in args.jobs:
+            if jobs <= 1:
+                continue
+            ids, duree = decouper(dossier, jobs)
+            identique = ids == reference
+            code = code or int(not identique)
+            print(
+                f"{jobs:>5} | {duree:>6.2f}s | {duree_serie / duree:>6.2f}x | "
+                f"{'oui' if identique else 'NON'}"
+            )
+    return code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
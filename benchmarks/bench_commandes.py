@@ -0,0 +1,82 @@
+"""Mesure la détection des commandes du chat.
+
+Usage:
+`python -m benchmarks.bench_commandes --repetitions 2000`
+
+L'ancienne chaîne de `any(x in t ...)` face à l'automate, sur des messages
+courts et longs, et sur une table de commandes 10x plus grande (le coût de
+l'ancienne chaîne croît avec le nombre de mots-clés). Les cas de
+non-régression sont dans `tests/test_commandes.py`.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from portfolio.commandes import COMMANDES_EXACTES, MOTS_CLES_COMMANDES, AutomateCommandes, trouver_commande
+
+from .outils import chronometrer, resumer
+
+
+MESSAGES = [
+    "Quels sont tes projets ?",
+    "Parle-moi de ton alternance à la MAIF et des traitements SAS que tu migres vers Python",
+    "Tu travailles dans le digital ?",
+    "un quiz sur github",
+]
+
+
+def detection_chaine(texte: str, table: list[tuple[str, tuple[str, ...]]]) -> str | None:
+    """Reproduit l'ancienne détection (une recherche de sous-chaîne par mot-clé).
+
+    Args:
+        texte (str): Message de l'utilisateur.
+        table (list[tuple[str, tuple[str, ...]]]): Commandes et mots-clés.
+
+    Returns:
+        str | None: Première commande dont un mot-clé apparaît.
+    """
+    t = texte.lower().strip()
+    if t in COMMANDES_EXACTES:
+        return COMMANDES_EXACTES[t]
+    for nom, mots_cles in table:
+        if any(x in t for x in mots_cles):
+            return nom
+    return None
+
+
+def main() -> int:
+    """Point d'entrée du benchmark.
+
+    Returns:
+        int: Code de sortie.
+    """
+    parser = argparse.ArgumentParser(description="Command matcher micro-benchmark")
+    parser.add_argument("--repetitions", type=int, default=2000)
+    args = parser.parse_args()
+
+    grande_table = [
+        (f"{nom}_{copie}", tuple(f"{mot}{copie}" for mot in mots_cles))
+        for copie in range(10)
+        for nom, mots_cles in MOTS_CLES_COMMANDES
+    ]
+    grand_automate = AutomateCommandes(grande_table)
+    for libelle, table, automate in (
+        (f"{len(MOTS_CLES_COMMANDES)} commands", MOTS_CLES_COMMANDES, None),
+        (f"{len(grande_table)} commands", grande_table, grand_automate),
+    ):
+        for message in MESSAGES:
+            print(f"\n{libelle} — {message[:50]!r}")
+            chaine = chronometrer(lambda: detection_chaine(message, table), args.repetitions)
+            if automate is None:
+                compile_ = chronometrer(lambda: trouver_commande(message), args.repetitions)
+            else:
+                compile_ = chronometrer(lambda: automate.trouver(message.lower().strip()), args.repetitions)
+            print(f"  any() chain : {resumer(chaine)}")
+            print(f"  automaton   : {resumer(compile_)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
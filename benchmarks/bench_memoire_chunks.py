@@ -0,0 +1,104 @@
+"""Mesure la mémoire occupée par chunk, avant et après `ChunkCompact`.
+
+Usage:
+`python -m benchmarks.bench_memoire_chunks --copies 1000`
+
+Le corpus de `data/` est découpé `--copies` fois. Pour chaque représentation,
+les mêmes chaînes (id, texte, source, titre) sont reprises: seul le coût des
+conteneurs est mesuré (tracemalloc), en octets par chunk:
+- chunks de la découpe: dictionnaire + dictionnaire `metadata` (avant)
+  contre `ChunkCompact` (après);
+- titres de section: une chaîne par section et par fichier (avant) contre
+  une chaîne internée par titre distinct (après);
+- résultats de recherche: `RetrievedChunk` sans `__slots__` (avant) contre
+  la dataclass à slots (après).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from portfolio.chunking import ChunkCompact, decouper_markdown
+from portfolio.rag import RetrievedChunk
+
+
+@dataclass(frozen=True)
+class RetrievedChunkSansSlots:
+    """Ancienne forme de `RetrievedChunk` (dataclass figée sans slots)."""
+
+    id: str
+    score: float
+    text: str
+    metadata: dict
+
+
+def octets_alloues(construire: Callable[[], list]) -> tuple[int, list]:
+    """Mesure la mémoire allouée (et gardée) par une construction.
+
+    Args:
+        construire (Callable[[], list]): Construit et retourne les objets.
+
+    Returns:
+        tuple[int, list]: (octets alloués, objets construits).
+    """
+    gc.collect()
+    tracemalloc.start()
+    objets = construire()
+    octets, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return octets, objets
+
+
+def main() -> int:
+    """Point d'entrée du benchmark.
+
+    Returns:
+        int: Code de sortie.
+    """
+    parser = argparse.ArgumentParser(description="Bytes per chunk: dict chunks vs slotted records")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--copies", type=int, default=1000, help="Times the corpus is chunked")
+    args = parser.parse_args()
+
+    base = Path(args.data_dir)
+    chunks: list[ChunkCompact] = []
+    for copie in range(args.copies):
+        for fichier in sorted(base.rglob("*.md")):
+            source = f"copie_{copie:05d}/{fichier.relative_to(base).as_posix()}"
+            chunks.extend(decouper_markdown(fichier.read_text(encoding="utf-8"), source))
+    n = len(chunks)
+    print(f"{n} chunks ({args.copies} copies of {args.data_dir})")
+
+    avant, _ = octets_alloues(lambda: [
+        {"id": c.id, "text": c.text, "metadata": {"source": c.source, "heading": c.heading}}
+        for c in chunks
+    ])
+    apres, _ = octets_alloues(lambda: [ChunkCompact(c.id, c.text, c.source, c.heading) for c in chunks])
+    print(f"chunk record : dict {avant / n:6.0f} B/chunk -> ChunkCompact {apres / n:6.0f} B/chunk "
+          f"({1 - apres / avant:.0%} less)")
+
+    metadonnees = [c.metadata for c in chunks]
+    avant, _ = octets_alloues(lambda: [
+        RetrievedChunkSansSlots(c.id, 0.5, c.text, m) for c, m in zip(chunks, metadonnees)
+    ])
+    apres, _ = octets_alloues(lambda: [RetrievedChunk(c.id, 0.5, c.text, m) for c, m in zip(chunks, metadonnees)])
+    print(f"search result: dataclass {avant / n:6.0f} B/chunk -> slots {apres / n:6.0f} B/chunk "
+          f"({1 - apres / avant:.0%} less)")
+
+    # Sans interning, chaque section de chaque fichier avait sa propre chaîne de titre.
+    sections = {(c.source, c.heading) for c in chunks}
+    distincts = {c.heading for c in chunks}
+    economie = sum(sys.getsizeof(h) for _, h in sections) - sum(sys.getsizeof(h) for h in distincts)
+    print(f"headings     : {len(sections)} section strings -> {len(distincts)} interned "
+          f"({economie / n:.0f} B/chunk saved)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+"""Mesure la mémoire de pointe de l'indexation sur un corpus synthétique.
+
+Compare l'ancien chemin (tous les chunks en liste, puis tous les `Vector`)
+au pipeline en flux de `indexer_dossier` (lecture, découpe et envoi par lots).
+
+Usage:
+`python -m benchmarks.bench_memoire_pipeline --files 1000 10000 100000`
+
+Le corpus est généré dans un dossier temporaire; l'index est un faux client.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from portfolio.chunking import decouper_tous_les_fichiers
+from portfolio.indexing import construire_vecteurs, indexer_dossier
+
+from .outils import IndexFactice, generer_corpus
+
+
+def pic_memoire(fonction: Callable[[], object]) -> tuple[float, float]:
+    """Exécute une fonction en mesurant sa mémoire de pointe.
+
+    Args:
+        fonction (Callable[[], object]): Fonction à mesurer.
+
+    Returns:
+        tuple[float, float]: (pic en Mo, durée en secondes).
+    """
+    tracemalloc.start()
+    debut = time.perf_counter()
+    fonction()
+    duree = time.perf_counter() - debut
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pic / 1024 / 1024, duree
+
+
+def chemin_liste(dossier: str) -> None:
+    """Reproduit l'ancien chemin: liste de chunks puis liste de vecteurs."""
+    chunks = decouper_tous_les_fichiers(dossier)
+    vecteurs = construire_vecteurs(list(chunks))
+    IndexFactice().upsert(vecteurs)
+
+
+def chemin_flux(dossier: str) -> None:
+    """Indexation complète en flux (un manifeste neuf à chaque mesure)."""
+    with tempfile.TemporaryDirectory() as etat:
+        os.environ["PORTFOLIO_STATE_DIR"] = etat
+        indexer_dossier(data_dir=dossier, index=IndexFactice(), complet=True, garder_ids=False)
+
+
+def main() -> int:
+    """Point d'entrée du benchmark.
+
+    Returns:
+        int: Code de sortie.
+    """
+    parser = argparse.ArgumentParser(description="Peak memory of list vs streaming indexing")
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'fichiers':>9} | {'liste (Mo)':>10} {'durée':>7} | {'flux (Mo)':>10} {'durée':>7}")
+    for nb_fichiers in args.files:
+        with tempfile.TemporaryDirectory() as racine:
+            dossier = str(generer_corpus(Path(racine) / "data", nb_fichiers))
+            liste, duree_liste = pic_memoire(lambda: chemin_liste(dossier))
+            flux, duree_flux = pic_memoire(lambda: chemin_flux(dossier))
+        print(
+            f"{nb_fichiers:>9} | {liste:>10.1f} {duree_liste:>6.1f}s | {flux:>10.1f} {duree_flux:>6.1f}s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+"""Mesure les tokens économisés par la diversification MMR des extraits.
+
+Usage:
+`python -m benchmarks.bench_mmr --data-dir data --k 5 6 8`
+
+Pour chaque question, compare le contexte de référence (8 premiers résultats)
+à deux sélections sur les mêmes candidats, pour chaque k: les k premiers, et
+k extraits choisis par MMR. Deux couvertures sont données, en part de celles
+du contexte de référence: les fichiers sources, et les sections (source +
+titre). L'index local du backend "local" sert d'index (hors ligne, chunks
+dédupliqués).
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from portfolio.local_index import obtenir_index_local
+from portfolio.mmr import FACTEUR_CANDIDATS, selectionner_mmr
+from portfolio.rag import format_context, search_portfolio
+from portfolio.text import estimer_tokens
+
+from .bench_retrieval import QUESTIONS
+
+
+QUESTIONS_MMR = QUESTIONS + [
+    "Quels projets de data as-tu réalisés ?",
+    "Tu as fait des sites web ?",
+    "Quelles bases de données connais-tu ?",
+    "Qu'as-tu appris en première année ?",
+]
+
+
+def sources(chunks: list) -> set[str]:
+    """Retourne les fichiers sources couverts par des extraits.
+
+    Args:
+        chunks (list): Extraits.
+
+    Returns:
+        set[str]: Sources distinctes.
+    """
+    return {c.metadata.get("source", "") for c in chunks}
+
+
+def sections(chunks: list) -> set[tuple[str, str]]:
+    """Retourne les sections (source, titre) couvertes par des extraits.
+
+    Args:
+        chunks (list): Extraits.
+
+    Returns:
+        set[tuple[str, str]]: Sections distinctes.
+    """
+    return {(c.metadata.get("source", ""), c.metadata.get("heading", "")) for c in chunks}
+
+
+def couverture(reference: set, selection: set) -> float:
+    """Part des éléments de la référence présents dans la sélection (0 à 1).
+
+    Args:
+        reference (set): Éléments du contexte de référence.
+        selection (set): Éléments de la sélection comparée.
+
+    Returns:
+        float: Couverture.
+    """
+    return len(reference & selection) / max(1, len(reference))
+
+
+def main() -> int:
+    """Point d'entrée du benchmark.
+
+    Returns:
+        int: Code de sortie.
+    """
+    parser = argparse.ArgumentParser(description="Tokens saved by MMR re-selection")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--top-k", type=int, default=8, help="Chunks injected today")
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 6, 8], help="Chunks kept, one pass per value")
+    args = parser.parse_args()
+
+    index = obtenir_index_local(args.data_dir)
+    profondeur = max(args.top_k, *args.k) * FACTEUR_CANDIDATS
+    candidats = {
+        question: search_portfolio(question, top_k=profondeur, index=index, utiliser_cache=False)
+        for question in QUESTIONS_MMR
+    }
+    references = {question: chunks[: args.top_k] for question, chunks in candidats.items()}
+    tokens_ref = sum(estimer_tokens(format_context(c, max_items=len(c))) for c in references.values())
+
+    print(f"reference: top-{args.top_k}, {tokens_ref} tokens over {len(QUESTIONS_MMR)} questions")
+    print(f"{'selection':<8} | {'tokens':>6} | {'saved':>5} | {'sources kept':>12} | {'sections kept':>13}")
+    for k in args.k:
+        for nom, choisir in (("top", lambda c: c[:k]), ("mmr", lambda c: selectionner_mmr(c, k))):
+            tokens, part_sources, part_sections = 0, 0.0, 0.0
+            for question, chunks in candidats.items():
+                selection = choisir(chunks)
+                tokens += estimer_tokens(format_context(selection, max_items=len(selection)))
+                part_sources += couverture(sources(references[question]), sources(selection))
+                part_sections += couverture(sections(references[question]), sections(selection))
+            n = len(QUESTIONS_MMR)
+            print(
+                f"{nom}-{k:<4} | {tokens:>6} | {1 - tokens / max(1, tokens_ref):>5.0%} | "
+                f"{part_sources / n:>12.0%} | {part_sections / n:>13.0%}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
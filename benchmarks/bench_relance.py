@@ -0,0 +1,126 @@
+"""Mesure la latence des recherches avec et sans délai ni relance.
+
+Usage:
+`python -m benchmarks.bench_relance --requetes 300 --lentes 0.05`
+
+Le faux index répond en quelques millisecondes, sauf une part `--lentes` des
+requêtes qui attend `--latence-lente` secondes (une queue de latence comme
+celle d'un service distant). Les mêmes requêtes passent par
+`search_portfolio` sans délai, puis avec `--delai`: une seconde requête part
+après le percentile `--percentile` des latences mesurées, et les recherches
+encore sans réponse au délai renvoient une liste vide.
+
+Affiche p50 / p95 / p99 / max de chaque passe et les compteurs des
+recherches bornées (relances, relances gagnantes, délais dépassés).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import time
+from pathlib import Path
+
+from portfolio.chunking import decouper_markdown
+from portfolio.rag import search_portfolio, stats_recherches_bornees
+from portfolio.tracing import TRACEUR
+
+from .bench_retrieval import QUESTIONS
+from .outils import IndexFactice
+
+
+class IndexIrregulier(IndexFactice):
+    """Faux index dont une part des requêtes est très lente.
+
+    Args:
+        reserve (list[dict]): Chunks renvoyés par `query`.
+        part_lente (float): Probabilité qu'une requête soit lente (0 à 1).
+        latence_lente (float): Attente d'une requête lente, en secondes.
+        graine (int): Graine du tirage (mêmes requêtes lentes à chaque passe).
+    """
+
+    def __init__(self, reserve: list[dict], part_lente: float, latence_lente: float, graine: int = 0) -> None:
+        super().__init__(reserve=reserve)
+        self.part_lente = part_lente
+        self.latence_lente = latence_lente
+        self._tirage = random.Random(graine)
+
+    def query(self, data: str | None = None, top_k: int = 10, **options) -> list:
+        lente = self._tirage.random() < self.part_lente
+        time.sleep(self.latence_lente if lente else self._tirage.uniform(0.005, 0.02))
+        return super().query(data, top_k, **options)
+
+
+def mesurer_passe(index: IndexIrregulier, requetes: list[str], delai: float | None) -> tuple[list[float], int]:
+    """Lance les requêtes une par une et mesure chacune.
+
+    Args:
+        index (IndexIrregulier): Faux index.
+        requetes (list[str]): Requêtes à envoyer.
+        delai (float | None): Délai des recherches (None: pas de délai).
+
+    Returns:
+        tuple[list[float], int]: (durées en ms, recherches sans résultat).
+    """
+    durees, vides = [], 0
+    for requete in requetes:
+        debut = time.perf_counter()
+        chunks = search_portfolio(requete, top_k=6, index=index, utiliser_cache=False, delai=delai)
+        durees.append((time.perf_counter() - debut) * 1000)
+        vides += not chunks
+    return durees, vides
+
+
+def afficher(nom: str, durees: list[float], vides: int) -> None:
+    # Méthode inclusive: les centiles restent entre le min et le max mesurés.
+    centiles = statistics.quantiles(durees, n=100, method="inclusive")
+    print(
+        f"{nom:<22} p50 {centiles[49]:7.1f}  p95 {centiles[94]:7.1f}  "
+        f"p99 {centiles[98]:7.1f}  max {max(durees):7.1f} ms  ({vides} without context)"
+    )
+
+
+def main() -> int:
+    """Point d'entrée du benchmark.
+
+    Returns:
+        int: Code de sortie.
+    """
+    parser = argparse.ArgumentParser(description="Search latency with a deadline and hedged requests")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--requetes", type=int, default=300, help="Searches per pass")
+    parser.add_argument("--lentes", type=float, default=0.05, help="Share of slow index requests")
+    parser.add_argument("--latence-lente", type=float, default=0.5, help="Latency of a slow request (s)")
+    parser.add_argument("--delai", type=float, default=0.3, help="Search deadline (s)")
+    parser.add_argument("--percentile", type=float, default=90.0, help="Latency percentile before hedging")
+    args = parser.parse_args()
+
+    base = Path(args.data_dir)
+    chunks = [
+        chunk
+        for fichier in sorted(base.rglob("*.md"))
+        for chunk in decouper_markdown(fichier.read_text(encoding="utf-8"), fichier.relative_to(base).as_posix())
+    ]
+    requetes = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.requetes)]
+    os.environ["PORTFOLIO_HEDGE_PERCENTILE"] = str(args.percentile)
+
+    TRACEUR.vider()
+    index = IndexIrregulier(chunks, args.lentes, args.latence_lente)
+    afficher("no deadline", *mesurer_passe(index, requetes, None))
+
+    # Les latences de la passe précédente donnent le délai de relance.
+    index = IndexIrregulier(chunks, args.lentes, args.latence_lente)
+    afficher(f"deadline {args.delai * 1000:.0f} ms + hedge", *mesurer_passe(index, requetes, args.delai))
+
+    stats = stats_recherches_bornees()
+    print(
+        f"{stats.appels} bounded searches: {stats.relances} hedged, "
+        f"{stats.gagnees_par_relance} won by the hedge, {stats.delais_depasses} past the deadline"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
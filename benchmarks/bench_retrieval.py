@@ -0,0 +1,90 @@
+"""Compare la latence de l'index local et de l'index Upstash distant.
+
+Usage:
+`python -m benchmarks.bench_retrieval --repetitions 50`
+
+L'index local est construit comme le backend "local" de `search_portfolio`
+(`obtenir_index_local`: chunks dédupliqués par contenu). L'index distant n'est
+mesuré que si les variables Upstash sont configurées.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from portfolio.clients import charger_environnement, lire_config_upstash
+from portfolio.local_index import obtenir_index_local, vider_index_locaux
+from portfolio.rag import search_portfolio
+
+from .outils import chronometrer, resumer
+
+
+QUESTIONS = [
+    "Quels sont tes projets ?",
+    "Parle-moi de ton alternance",
+    "Quelles compétences maîtrises-tu ?",
+    "C'est quoi ton parcours ?",
+    "Tu fais du sport ?",
+    "Quels outils de datavisualisation utilises-tu ?",
+    "MAIF migration SAS Python",
+    "séries chronologiques",
+]
+
+
+def mesurer_backend(index: object, repetitions: int, namespace: str) -> list[float]:
+    """Mesure `search_portfolio` sur toutes les questions avec un index donné.
+
+    Args:
+        index (object): Index à interroger.
+        repetitions (int): Nombre de passes sur les questions.
+        namespace (str): Namespace Upstash.
+
+    Returns:
+        list[float]: Durée de chaque requête en millisecondes.
+    """
+    durees: list[float] = []
+    for question in QUESTIONS:
+        durees.extend(chronometrer(
+            lambda: search_portfolio(question, top_k=8, namespace=namespace, index=index),
+            repetitions,
+        ))
+    return durees
+
+
+def main() -> int:
+    """Point d'entrée du benchmark.
+
+    Returns:
+        int: Code de sortie.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark local vs Upstash retrieval")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--namespace", default="portfolio")
+    parser.add_argument("--repetitions", type=int, default=20)
+    args = parser.parse_args()
+
+    vider_index_locaux()
+    debut = time.perf_counter()
+    local = obtenir_index_local(args.data_dir)
+    construction = (time.perf_counter() - debut) * 1000
+    print(f"Index local: {len(local)} chunks construits en {construction:.1f} ms")
+    print(f"local   {resumer(mesurer_backend(local, args.repetitions, args.namespace))}")
+
+    charger_environnement()
+    url, token = lire_config_upstash()
+    if not url or not token:
+        print("upstash (ignoré: UPSTASH_VECTOR_REST_URL / TOKEN absents)")
+        return 0
+
+    from portfolio.indexing import get_upstash_index
+
+    distant = get_upstash_index()
+    # Une requête de chauffe pour ne pas compter l'ouverture de connexion.
+    search_portfolio(QUESTIONS[0], namespace=args.namespace, index=distant)
+    print(f"upstash {resumer(mesurer_backend(distant, args.repetitions, args.namespace))}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
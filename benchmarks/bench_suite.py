@@ -0,0 +1,289 @@
+"""Suite de benchmarks du pipeline sur des corpus synthétiques à l'échelle.
+
+Usage:
+`python -m benchmarks.bench_suite --output resultats.json`
+`python -m benchmarks.bench_suite --baseline reference.json --seuil 1.25`
+
+Le corpus de `data/` est recopié 1x, 100x et 10 000x (en mémoire, et sur
+disque pour `decouper_tous_les_fichiers`). Chaque étape est mesurée sur tout
+le corpus de l'échelle:
+- `decouper_markdown` et `decouper_tous_les_fichiers`: chaque document;
+- `construire_vecteurs`: chaque chunk, par lots de `TAILLE_LOT` envoyés à
+  un faux index Upstash local (`IndexFactice`);
+- `convertir_resultats` et `format_context`: une recherche par question et
+  par copie du corpus, servie par le faux index;
+- conversations: `CONVERSATIONS_1X` conversations par copie, sauvegardées
+  puis rechargées depuis une base SQLite neuve.
+
+Les mesures vont dans un JSON. Avec `--baseline`, chaque mesure plus lente
+que la référence d'un facteur supérieur à `--seuil` est signalée et le code
+de sortie vaut 1: la suite peut bloquer un déploiement.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+from portfolio.chunking import decouper_markdown, decouper_tous_les_fichiers
+from portfolio.indexing import TAILLE_LOT, construire_vecteurs
+from portfolio.rag import convertir_resultats, format_context
+from portfolio.stockage import StockageConversations
+
+from .bench_retrieval import QUESTIONS
+from .outils import IndexFactice, chronometrer, corpus_a_l_echelle
+
+
+ECHELLES = (1, 100, 10_000)
+# Ralentissement toléré face à la référence (1.25 = +25 %)
+SEUIL_REGRESSION = 1.25
+# Écart absolu ignoré (bruit de mesure des étapes très courtes), en ms
+BRUIT_MS = 2.0
+# Conversations simulées par copie du corpus
+CONVERSATIONS_1X = 10
+MESSAGES_PAR_CONVERSATION = 12
+
+
+@dataclass
+class Mesure:
+    """Durée d'une étape à une échelle donnée.
+
+    Args:
+        nom (str): Étape mesurée.
+        echelle (int): Facteur appliqué au corpus.
+        ms (float): Durée médiane, en millisecondes.
+        elements (int): Éléments traités (documents, chunks, requêtes...).
+    """
+
+    nom: str
+    echelle: int
+    ms: float
+    elements: int
+
+    @property
+    def us_par_element(self) -> float:
+        return self.ms * 1000 / max(1, self.elements)
+
+
+def mesurer(nom: str, echelle: int, elements: int, fonction: Callable[[], object], repetitions: int) -> Mesure:
+    """Mesure une étape et affiche le résultat.
+
+    Args:
+        nom (str): Étape mesurée.
+        echelle (int): Facteur appliqué au corpus.
+        elements (int): Éléments traités par un appel.
+        fonction (Callable[[], object]): Étape à mesurer.
+        repetitions (int): Nombre d'appels (la médiane est gardée).
+
+    Returns:
+        Mesure: Durée médiane.
+    """
+    mesure = Mesure(nom, echelle, statistics.median(chronometrer(fonction, repetitions)), elements)
+    print(
+        f"{nom:<28} {echelle:>6}x  {mesure.ms:10.1f} ms  "
+        f"{elements:>9} items  {mesure.us_par_element:8.2f} µs/item"
+    )
+    return mesure
+
+
+def documents_a_l_echelle(documents: list[tuple[str, str]], facteur: int) -> Iterator[tuple[str, str]]:
+    """Recopie les documents en mémoire, avec un chemin distinct par copie.
+
+    Args:
+        documents (list[tuple[str, str]]): (texte, source) du corpus d'origine.
+        facteur (int): Nombre de copies.
+
+    Yields:
+        tuple[str, str]: (texte, source).
+    """
+    for copie in range(facteur):
+        for texte, source in documents:
+            yield texte, f"copie_{copie:05d}/{source}"
+
+
+def construire_par_lots(chunks: list[dict], facteur: int, index: IndexFactice) -> None:
+    """Convertit `facteur` copies des chunks en vecteurs, lot par lot.
+
+    Args:
+        chunks (list[dict]): Chunks du corpus d'origine.
+        facteur (int): Nombre de copies.
+        index (IndexFactice): Faux index qui reçoit les lots.
+
+    Returns:
+        None
+    """
+    for _ in range(facteur):
+        for debut in range(0, len(chunks), TAILLE_LOT):
+            index.upsert(construire_vecteurs(chunks[debut:debut + TAILLE_LOT]))
+
+
+def sauvegarder_conversations(chemin: Path, nb_conversations: int) -> StockageConversations:
+    """Écrit des conversations synthétiques dans une base neuve.
+
+    Args:
+        chemin (Path): Fichier de la base (supprimé s'il existe).
+        nb_conversations (int): Nombre de conversations.
+
+    Returns:
+        StockageConversations: Stockage ouvert.
+    """
+    for fichier in chemin.parent.glob(chemin.name + "*"):
+        fichier.unlink()
+    stockage = StockageConversations(chemin)
+    messages = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"{QUESTIONS[i % len(QUESTIONS)]} " * 4}
+        for i in range(MESSAGES_PAR_CONVERSATION)
+    ]
+    stats = {"questions": MESSAGES_PAR_CONVERSATION // 2, "debut": datetime(2026, 1, 1)}
+    for numero in range(nb_conversations):
+        stockage.sauvegarder(f"conv-{numero:07d}", messages, f"resp_{numero}", stats)
+    return stockage
+
+
+def lancer_suite(data_dir: Path, echelles: list[int], repetitions: int) -> list[Mesure]:
+    """Mesure toutes les étapes à toutes les échelles.
+
+    Args:
+        data_dir (Path): Corpus d'origine.
+        echelles (list[int]): Facteurs appliqués au corpus.
+        repetitions (int): Répétitions à 1x (divisées par la racine de l'échelle).
+
+    Returns:
+        list[Mesure]: Mesures, étape par étape.
+    """
+    documents = [
+        (fichier.read_text(encoding="utf-8"), fichier.relative_to(data_dir).as_posix())
+        for fichier in sorted(data_dir.rglob("*.md"))
+    ]
+    chunks = [chunk for texte, source in documents for chunk in decouper_markdown(texte, source)]
+    index = IndexFactice(reserve=chunks)
+    bruts = {q: index.query(q, top_k=8, include_metadata=True, include_data=True) for q in QUESTIONS}
+    convertis = {q: convertir_resultats(r) for q, r in bruts.items()}
+
+    mesures: list[Mesure] = []
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as tmp:
+        for facteur in echelles:
+            n = max(1, round(repetitions / math.sqrt(facteur)))
+
+            mesures.append(mesurer(
+                "decouper_markdown", facteur, len(documents) * facteur,
+                lambda: [decouper_markdown(t, s) for t, s in documents_a_l_echelle(documents, facteur)], n,
+            ))
+
+            dossier = corpus_a_l_echelle(data_dir, Path(tmp) / f"corpus_{facteur}", facteur)
+            mesures.append(mesurer(
+                "decouper_tous_les_fichiers", facteur, len(documents) * facteur,
+                lambda: decouper_tous_les_fichiers(str(dossier)), n,
+            ))
+
+            mesures.append(mesurer(
+                "construire_vecteurs", facteur, len(chunks) * facteur,
+                lambda: construire_par_lots(chunks, facteur, index), n,
+            ))
+
+            requetes = len(QUESTIONS) * facteur
+            mesures.append(mesurer(
+                "convertir_resultats", facteur, requetes,
+                lambda: [convertir_resultats(r) for _ in range(facteur) for r in bruts.values()], n,
+            ))
+            mesures.append(mesurer(
+                "format_context", facteur, requetes,
+                lambda: [format_context(c) for _ in range(facteur) for c in convertis.values()], n,
+            ))
+
+            base = Path(tmp) / f"conversations_{facteur}.sqlite"
+            nb_conversations = CONVERSATIONS_1X * facteur
+            mesures.append(mesurer(
+                "conversations_sauvegarde", facteur, nb_conversations,
+                lambda: sauvegarder_conversations(base, nb_conversations).fermer(), n,
+            ))
+            stockage = StockageConversations(base)
+            mesures.append(mesurer(
+                "conversations_chargement", facteur, nb_conversations,
+                lambda: [stockage.charger(i) for i in stockage.lister_ids()], n,
+            ))
+            stockage.fermer()
+    return mesures
+
+
+def comparer(mesures: list[Mesure], reference: dict, seuil: float) -> list[str]:
+    """Compare les mesures à un JSON de référence.
+
+    Args:
+        mesures (list[Mesure]): Mesures courantes.
+        reference (dict): Contenu d'un JSON écrit par cette suite.
+        seuil (float): Ralentissement toléré (rapport des durées).
+
+    Returns:
+        list[str]: Description des régressions (vide si aucune).
+    """
+    references = {(m["nom"], m["echelle"]): m["ms"] for m in reference.get("mesures", [])}
+    regressions = []
+    for mesure in mesures:
+        avant = references.get((mesure.nom, mesure.echelle))
+        if avant is None:
+            continue
+        if mesure.ms > avant * seuil and mesure.ms - avant > BRUIT_MS:
+            regressions.append(
+                f"{mesure.nom} {mesure.echelle}x: {avant:.1f} ms -> {mesure.ms:.1f} ms "
+                f"(x{mesure.ms / avant:.2f} > x{seuil:.2f})"
+            )
+    return regressions
+
+
+def main() -> int:
+    """Point d'entrée du benchmark.
+
+    Returns:
+        int: Code de sortie (1 si une régression est détectée).
+    """
+    parser = argparse.ArgumentParser(description="Pipeline benchmark suite on scaled synthetic corpora")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(ECHELLES))
+    parser.add_argument(
+        "--repetitions", type=int, default=30, help="Repetitions at 1x (divided by the square root of the scale)"
+    )
+    parser.add_argument("--output", help="Write the measurements to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from a previous run to compare against")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION, help="Tolerated slowdown ratio")
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    mesures = lancer_suite(Path(args.data_dir), args.scales, args.repetitions)
+    print(f"Suite completed in {time.perf_counter() - debut:.1f}s")
+
+    if args.output:
+        resultat = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "echelles": args.scales,
+            },
+            "mesures": [dict(asdict(m), us_par_element=round(m.us_par_element, 3)) for m in mesures],
+        }
+        Path(args.output).write_text(json.dumps(resultat, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        reference = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = comparer(mesures, reference, args.seuil)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regression above x{args.seuil:.2f} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,190 @@
+"""Petits utilitaires partagés par les scripts de benchmark."""
+
+from __future__ import annotations
+
+import random
+import time
+import zlib
+from pathlib import Path
+from typing import Callable
+
+from upstash_vector.types import QueryResult
+
+
+def percentile(valeurs: list[float], p: float) -> float:
+    """Calcule un percentile par interpolation linéaire.
+
+    Args:
+        valeurs (list[float]): Mesures (non vides).
+        p (float): Percentile voulu, entre 0 et 100.
+
+    Returns:
+        float: Valeur du percentile.
+    """
+    triees = sorted(valeurs)
+    if len(triees) == 1:
+        return triees[0]
+    rang = (len(triees) - 1) * p / 100
+    bas = int(rang)
+    haut = min(bas + 1, len(triees) - 1)
+    return triees[bas] + (triees[haut] - triees[bas]) * (rang - bas)
+
+
+def chronometrer(fonction: Callable[[], object], repetitions: int) -> list[float]:
+    """Exécute une fonction plusieurs fois et mesure chaque appel.
+
+    Args:
+        fonction (Callable[[], object]): Fonction à mesurer.
+        repetitions (int): Nombre d'appels.
+
+    Returns:
+        list[float]: Durées en millisecondes.
+    """
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return durees
+
+
+def resumer(durees: list[float]) -> str:
+    """Formate p50 / p99 / moyenne d'une série de durées.
+
+    Args:
+        durees (list[float]): Durées en millisecondes.
+
+    Returns:
+        str: Résumé lisible.
+    """
+    moyenne = sum(durees) / len(durees)
+    return (
+        f"p50={percentile(durees, 50):8.3f} ms  "
+        f"p99={percentile(durees, 99):8.3f} ms  "
+        f"moy={moyenne:8.3f} ms  (n={len(durees)})"
+    )
+
+
+MOTS = (
+    "donnees analyse python projet alternance modele serie temporelle tableau "
+    "indicateur visualisation requete base sql pipeline nettoyage statistique "
+    "prevision regression classification enquete etudiant territoire culture "
+    "economie collecte web scraping api automatisation rapport dashboard"
+).split()
+
+
+def generer_markdown(alea: random.Random, nb_sections: int = 4) -> str:
+    """Génère un document Markdown synthétique (titres + paragraphes).
+
+    Args:
+        alea (random.Random): Générateur pseudo-aléatoire (reproductible).
+        nb_sections (int): Nombre de sections de niveau 2.
+
+    Returns:
+        str: Contenu Markdown.
+    """
+    lignes = [f"# Document {alea.randrange(10**6)}", ""]
+    for section in range(nb_sections):
+        lignes += [f"## Section {section} {alea.choice(MOTS)}", ""]
+        for _ in range(alea.randint(1, 4)):
+            phrase = " ".join(alea.choice(MOTS) for _ in range(alea.randint(20, 80)))
+            lignes += [phrase.capitalize() + ".", ""]
+    return "\n".join(lignes)
+
+
+def generer_corpus(dossier: Path, nb_fichiers: int, *, graine: int = 42, par_dossier: int = 500) -> Path:
+    """Écrit un corpus synthétique de fichiers Markdown.
+
+    Les fichiers sont répartis en sous-dossiers pour rester raisonnable pour
+    le système de fichiers.
+
+    Args:
+        dossier (Path): Dossier de destination (créé si besoin).
+        nb_fichiers (int): Nombre de fichiers à générer.
+        graine (int): Graine du générateur (corpus reproductible).
+        par_dossier (int): Nombre de fichiers par sous-dossier.
+
+    Returns:
+        Path: Dossier du corpus.
+    """
+    alea = random.Random(graine)
+    for numero in range(nb_fichiers):
+        sous_dossier = dossier / f"lot_{numero // par_dossier:05d}"
+        if numero % par_dossier == 0:
+            sous_dossier.mkdir(parents=True, exist_ok=True)
+        (sous_dossier / f"doc_{numero:07d}.md").write_text(generer_markdown(alea), encoding="utf-8")
+    return dossier
+
+
+def corpus_a_l_echelle(source: Path, dossier: Path, facteur: int) -> Path:
+    """Recopie un corpus réel `facteur` fois (1x, 100x, ...).
+
+    Args:
+        source (Path): Corpus d'origine (par exemple `data/`).
+        dossier (Path): Dossier de destination (créé si besoin).
+        facteur (int): Nombre de copies.
+
+    Returns:
+        Path: Dossier du corpus.
+    """
+    fichiers = sorted(source.rglob("*.md"))
+    for copie in range(facteur):
+        for fichier in fichiers:
+            cible = dossier / f"copie_{copie:05d}" / fichier.relative_to(source)
+            cible.parent.mkdir(parents=True, exist_ok=True)
+            cible.write_text(fichier.read_text(encoding="utf-8"), encoding="utf-8")
+    return dossier
+
+
+class IndexFactice:
+    """Faux client Upstash: compte les envois sans rien garder.
+
+    Les recherches renvoient des extraits d'une réserve fixe, choisis selon
+    la requête (toujours les mêmes pour une même requête), sans calcul de
+    similarité: seul le code autour de l'index est mesuré.
+
+    Args:
+        latence (float): Attente simulée par requête, en secondes.
+        reserve (list[dict] | None): Chunks renvoyés par `query`.
+    """
+
+    def __init__(self, latence: float = 0.0, reserve: list[dict] | None = None) -> None:
+        self.latence = latence
+        self.reserve = reserve or []
+        self.vecteurs = 0
+        self.requetes = 0
+
+    def upsert(self, vectors: list, namespace: str = "") -> str:
+        self.requetes += 1
+        self.vecteurs += len(vectors)
+        if self.latence:
+            time.sleep(self.latence)
+        return "Success"
+
+    def delete(self, ids: list, namespace: str = "") -> None:
+        self.requetes += 1
+
+    def query(
+        self,
+        data: str | None = None,
+        top_k: int = 10,
+        include_metadata: bool = False,
+        include_data: bool = False,
+        **_options,
+    ) -> list[QueryResult]:
+        self.requetes += 1
+        if self.latence:
+            time.sleep(self.latence)
+        if not self.reserve:
+            return []
+        depart = zlib.crc32((data or "").encode("utf-8")) % len(self.reserve)
+        resultats = []
+        for rang in range(min(top_k, len(self.reserve))):
+            chunk = self.reserve[(depart + rang) % len(self.reserve)]
+            resultats.append(QueryResult(
+                id=chunk["id"],
+                score=1.0 / (rang + 1),
+                metadata=dict(chunk["metadata"]) if include_metadata else None,
+                data=chunk["text"] if include_data else None,
+            ))
+        return resultats
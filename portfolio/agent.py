@@ -3,12 +3,32 @@ Construction de l'agent RAG pour le portfolio de Yvan NEDELEC.
 
 Cet agent utilise OpenAI (via openai-agents) et un système RAG
 pour répondre aux questions sur Yvan comme si c'était lui qui parlait.
+
+L'agent ne dépend que du namespace, du style et du prompt: `obtenir_agent_portfolio`
+le garde en cache pour tout le processus au lieu de le reconstruire à chaque
+rerun Streamlit.
 """
 
 from __future__ import annotations
 
+import hashlib
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+
 from agents import Agent, ModelSettings, function_tool
-from .rag import format_context, search_portfolio
+from .rag import (
+    BUDGET_CONTEXTE_OUTIL,
+    asearch_portfolio,
+    compter_tokens_contexte,
+    emballer_contexte,
+    lire_budget_tokens,
+    lire_delai_recherche,
+    lire_diversification,
+    search_portfolio,
+)
+from .tracing import tracer
+from .turn import contexte_tour_courant
 
 
 # Fonctions utilitaires
@@ -69,6 +89,8 @@ Donc TOUTES les questions concernent MOI (Yvan), peu importe la formulation :
 4) QUESTIONS SUR MOI : Pour toute question sur mon profil, mes études, mon alternance, 
    mes compétences, mes projets ou mes centres d'intérêt → j'utilise retrieve_portfolio 
    pour chercher les infos, puis je réponds.
+   Si le message contient déjà une section "Infos sur moi" qui répond à la question,
+   je réponds directement avec ces infos, sans rappeler retrieve_portfolio.
 
 5) HORS-SUJET : Pour les questions sans rapport (cuisine, météo, etc.) → je dis poliment 
    que je préfère parler de mon parcours et je propose des sujets.
@@ -86,19 +108,56 @@ Donc TOUTES les questions concernent MOI (Yvan), peu importe la formulation :
     return instructions.strip()
 
 
+def _compter_appel_outil() -> None:
+    """Compte un appel de l'outil dans le tour en cours (s'il y en a un).
+
+    Returns:
+        None
+    """
+    tour = contexte_tour_courant()
+    if tour is not None:
+        tour.stats.appels_outil += 1
+
+
+def _contexte_outil(chunks: list) -> str:
+    """Formate la réponse de l'outil de recherche dans son budget de tokens.
+
+    Le budget vaut PORTFOLIO_TOOL_TOKEN_BUDGET (sinon `BUDGET_CONTEXTE_OUTIL`),
+    relu à chaque appel.
+
+    Args:
+        chunks (list): Extraits trouvés.
+
+    Returns:
+        str: Contexte textuel, ou un message si rien n'a été trouvé.
+    """
+    budget = lire_budget_tokens("PORTFOLIO_TOOL_TOKEN_BUDGET", BUDGET_CONTEXTE_OUTIL)
+    contexte = emballer_contexte(chunks, max_items=5, budget_tokens=budget)
+    compter_tokens_contexte(contexte)
+    return contexte.texte if contexte.texte else "Aucune information trouvée."
+
+
 # Fonction principale
 
 def construire_agent_portfolio(
     namespace: str = "portfolio",
-    style_reponse: str = "concis"
+    style_reponse: str = "concis",
+    *,
+    asynchrone: bool = False,
 ) -> Agent:
     """Construit et retourne l'agent RAG du portfolio.
 
     L'agent utilise un outil pour chercher des infos, puis répond en "je".
 
+    L'outil synchrone bloque la boucle de l'agent pendant la requête: c'est
+    sans importance pour un seul tour (Streamlit, `Runner.run_sync`). Un
+    serveur qui fait tourner plusieurs tours sur une même boucle
+    (`await Runner.run(...)`) doit prendre l'outil asynchrone.
+
     Args:
         namespace (str): Espace de noms Upstash où sont stockées les données.
         style_reponse (str): "concis" ou "detaille".
+        asynchrone (bool): Utiliser l'outil asynchrone (`asearch_portfolio`).
 
     Returns:
         Agent: Agent configuré et prêt à l'emploi.
@@ -120,13 +179,43 @@ def construire_agent_portfolio(
         Returns:
             str: Contexte textuel prêt à être injecté dans le prompt.
         """
-        # Recherche dans Upstash Vector
-        chunks = search_portfolio(requete, top_k=nb_resultats, namespace=namespace)
+        _compter_appel_outil()
+
+        with tracer("outil"):
+            # Recherche dans Upstash Vector (ou dans les extraits déjà récupérés du tour)
+            chunks = search_portfolio(
+                requete,
+                top_k=nb_resultats,
+                namespace=namespace,
+                diversifier=lire_diversification(),
+                delai=lire_delai_recherche(),
+            )
+
+            # Formatage du contexte pour l'agent
+            return _contexte_outil(chunks)
+
+    # Même outil, sans bloquer la boucle pendant la requête réseau
+    @function_tool(name_override="retrieve_portfolio")
+    async def rechercher_dans_portfolio_async(requete: str, nb_resultats: int = 5) -> str:
+        """Recherche des informations pertinentes sur moi.
 
-        # Formatage du contexte pour l'agent
-        contexte = format_context(chunks)
+        Args:
+            requete (str): Question ou mots-clés à rechercher.
+            nb_resultats (int): Nombre de résultats à retourner.
 
-        return contexte if contexte else "Aucune information trouvée."
+        Returns:
+            str: Contexte textuel prêt à être injecté dans le prompt.
+        """
+        _compter_appel_outil()
+        with tracer("outil"):
+            chunks = await asearch_portfolio(
+                requete,
+                top_k=nb_resultats,
+                namespace=namespace,
+                diversifier=lire_diversification(),
+                delai=lire_delai_recherche(),
+            )
+            return _contexte_outil(chunks)
 
     # Création de l'agent avec ses paramètres
     agent = Agent(
@@ -134,11 +223,110 @@ def construire_agent_portfolio(
         instructions=_generer_instructions_agent(style_reponse),
         model="gpt-4.1-nano",
         model_settings=ModelSettings(temperature=0.3),  # Peu de créativité, réponses cohérentes
-        tools=[rechercher_dans_portfolio],
+        tools=[rechercher_dans_portfolio_async if asynchrone else rechercher_dans_portfolio],
     )
 
     return agent
 
 
+# Cache des agents construits
+
+@dataclass
+class StatsAgents:
+    """Compteurs du cache d'agents.
+
+    Args:
+        constructions (int): Agents construits.
+        reutilisations (int): Demandes servies par un agent déjà construit.
+        taille (int): Nombre d'agents en cache.
+    """
+
+    constructions: int = 0
+    reutilisations: int = 0
+    taille: int = 0
+
+
+_AGENTS: dict[tuple[str, str, bool, str, str], Agent] = {}
+_VERROU = threading.Lock()
+_STATS = StatsAgents()
+
+
+@lru_cache(maxsize=32)
+def empreinte_instructions(style_reponse: str = "concis", version: str = "") -> str:
+    """Calcule l'empreinte du prompt système pour un style.
+
+    Le prompt n'est construit et haché qu'une fois par (style, version): un
+    rerun Streamlit ne paie plus que la lecture du cache.
+
+    Args:
+        style_reponse (str): "concis" ou "detaille".
+        version (str): Version de l'application (une nouvelle version recalcule l'empreinte).
+
+    Returns:
+        str: Empreinte hexadécimale (12 caractères).
+    """
+    return hashlib.sha1(_generer_instructions_agent(style_reponse).encode()).hexdigest()[:12]
+
+
+def obtenir_agent_portfolio(
+    namespace: str = "portfolio",
+    style_reponse: str = "concis",
+    *,
+    asynchrone: bool = False,
+    version: str = "",
+) -> Agent:
+    """Retourne l'agent du portfolio, construit une seule fois par configuration.
+
+    La clé du cache comprend la version de l'application et l'empreinte du
+    prompt: changer l'une ou l'autre construit un nouvel agent (l'ancien est
+    oublié).
+
+    Args:
+        namespace (str): Espace de noms Upstash où sont stockées les données.
+        style_reponse (str): "concis" ou "detaille".
+        asynchrone (bool): Utiliser l'outil asynchrone.
+        version (str): Version de l'application (par exemple `VERSION`).
+
+    Returns:
+        Agent: Agent partagé, prêt à l'emploi.
+    """
+    configuration = (namespace, style_reponse, asynchrone)
+    cle = (*configuration, version, empreinte_instructions(style_reponse, version))
+    with _VERROU:
+        agent = _AGENTS.get(cle)
+        if agent is not None:
+            _STATS.reutilisations += 1
+            return agent
+
+        agent = construire_agent_portfolio(namespace, style_reponse, asynchrone=asynchrone)
+        # Une seule version gardée par configuration.
+        for ancienne in [c for c in _AGENTS if c[:3] == configuration]:
+            del _AGENTS[ancienne]
+        _AGENTS[cle] = agent
+        _STATS.constructions += 1
+        return agent
+
+
+def vider_agents() -> None:
+    """Oublie tous les agents en cache.
+
+    Returns:
+        None
+    """
+    with _VERROU:
+        _AGENTS.clear()
+
+
+def stats_agents() -> StatsAgents:
+    """Retourne les compteurs du cache d'agents.
+
+    Returns:
+        StatsAgents: Copie des compteurs.
+    """
+    with _VERROU:
+        return StatsAgents(_STATS.constructions, _STATS.reutilisations, len(_AGENTS))
+
+
 # Alias pour compatibilité avec le code existant
-build_portfolio_agent = construire_agent_portfolio
\ No newline at end of file
+build_portfolio_agent = construire_agent_portfolio
+get_portfolio_agent = obtenir_agent_portfolio
\ No newline at end of file
@@ -8,8 +8,54 @@ optimisés pour la recherche vectorielle.
 from __future__ import annotations
 
 import hashlib
+import os
 import re
+import sys
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .text import estimer_tokens
+
+
+# Découpe parallèle: nombre de fichiers envoyés à un worker en une fois
+FICHIERS_PAR_TACHE = 64
+
+# Découpe stricte: plafond minimal d'un chunk, en tokens
+MIN_TOKENS_STRICT = 16
+
+# Découpe stricte: niveaux de repli pour un morceau trop long
+# (paragraphes, puis lignes et phrases, puis mots). Les séparateurs sont
+# capturés pour être remis tels quels entre les morceaux.
+_NIVEAUX_DECOUPE = (
+    re.compile(r"(\n\s*\n)"),
+    re.compile(r"(\n+|(?<=[.!?…])[ \t]+)"),
+    re.compile(r"(\s+)"),
+)
+
+
+def iterer_fichiers_markdown(dossier: str = "data") -> Iterator[Path]:
+    """Parcourt les fichiers Markdown d'un dossier, sans tout charger en mémoire.
+
+    Les entrées sont triées par nom à chaque niveau: l'ordre est stable d'une
+    exécution à l'autre, et seul le dossier courant est gardé en mémoire.
+
+    Args:
+        dossier (str): Chemin vers le dossier contenant les fichiers .md.
+
+    Returns:
+        Iterator[Path]: Chemins des fichiers trouvés.
+    """
+    with os.scandir(dossier) as entrees:
+        triees = sorted(entrees, key=lambda e: e.name)
+    for entree in triees:
+        if entree.is_dir():
+            yield from iterer_fichiers_markdown(entree.path)
+        elif entree.name.endswith(".md"):
+            yield Path(entree.path)
 
 
 def charger_fichiers_markdown(dossier: str = "data") -> list[Path]:
@@ -21,7 +67,34 @@ def charger_fichiers_markdown(dossier: str = "data") -> list[Path]:
     Returns:
         list[Path]: Liste triée des chemins vers les fichiers trouvés.
     """
-    return sorted(Path(dossier).rglob("*.md"))
+    return list(iterer_fichiers_markdown(dossier))
+
+
+def iterer_sources(dossier: str = "data") -> Iterator[tuple[str, str]]:
+    """Lit les fichiers Markdown un par un.
+
+    Args:
+        dossier (str): Chemin vers le dossier racine.
+
+    Returns:
+        Iterator[tuple[str, str]]: Couples (chemin relatif, contenu).
+    """
+    base = Path(dossier)
+    for fichier in iterer_fichiers_markdown(dossier):
+        source = str(fichier.relative_to(base)).replace("\\", "/")
+        yield source, fichier.read_text(encoding="utf-8")
+
+
+def empreinte_texte(texte: str) -> str:
+    """Calcule l'empreinte d'un texte.
+
+    Args:
+        texte (str): Contenu à hacher.
+
+    Returns:
+        str: Empreinte hexadécimale (20 caractères).
+    """
+    return hashlib.sha1(texte.encode()).hexdigest()[:20]
 
 
 def generer_id(source: str, titre: str, index: int) -> str:
@@ -39,16 +112,306 @@ def generer_id(source: str, titre: str, index: int) -> str:
     return hashlib.sha1(texte.encode()).hexdigest()[:20]
 
 
-def decouper_markdown(texte: str, source: str, max_chars: int = 1000) -> list[dict]:
+def normaliser_contenu(texte: str) -> str:
+    """Normalise un texte pour comparer des contenus (casse, blancs).
+
+    Args:
+        texte (str): Texte d'origine.
+
+    Returns:
+        str: Texte en minuscules, blancs réduits à une espace.
+
+    Exemple:
+        >>> normaliser_contenu("- Datavisualisation\\n-  Séries")
+        '- datavisualisation - séries'
+    """
+    return " ".join(texte.lower().split())
+
+
+class ChunkCompact(Mapping):
+    """Chunk prêt à indexer, sans dictionnaire par chunk.
+
+    Les champs sont dans des `__slots__` et les métadonnées Upstash ne sont
+    construites qu'à la demande. Le titre de section et la source sont
+    internés: les chunks d'une même section (et les sections de même titre
+    dans d'autres fichiers) partagent la même chaîne, y compris après un
+    passage par un worker de découpe.
+
+    Le chunk reste un mapping en lecture seule de clés "id", "text" et
+    "metadata" (`chunk["id"]`, `chunk.get(...)`, `in`, `dict(chunk)`), comme
+    les anciens dictionnaires.
+
+    Args:
+        id (str): Identifiant du chunk.
+        text (str): Texte indexé (titre de section compris).
+        source (str): Chemin relatif du fichier.
+        heading (str): Chemin des titres de la section.
+        sources (tuple[str, ...] | None): Toutes les sources d'un contenu
+            dédupliqué (`source` est la première), None avant déduplication.
+
+    Exemple:
+        >>> chunk = ChunkCompact("1", "Projets\\n\\nUn site web.", "projets.md", "Projets")
+        >>> chunk["id"], chunk.get("source"), "metadata" in chunk
+        ('1', None, True)
+        >>> dict(chunk)["metadata"]
+        {'source': 'projets.md', 'heading': 'Projets'}
+    """
+
+    __slots__ = ("id", "text", "source", "heading", "sources")
+
+    _CLES = ("id", "text", "metadata")
+
+    def __init__(
+        self,
+        id: str,
+        text: str,
+        source: str,
+        heading: str,
+        sources: tuple[str, ...] | None = None,
+    ) -> None:
+        self.id = id
+        self.text = text
+        self.source = sys.intern(source)
+        self.heading = sys.intern(heading)
+        self.sources = tuple(sys.intern(s) for s in sources) if sources is not None else None
+
+    @property
+    def metadata(self) -> dict:
+        """Métadonnées envoyées à Upstash (nouveau dictionnaire à chaque appel)."""
+        if self.sources is None:
+            return {"source": self.source, "heading": self.heading}
+        return {"source": self.source, "heading": self.heading, "sources": list(self.sources)}
+
+    @property
+    def corps(self) -> str:
+        """Texte du chunk sans la ligne de titre de section."""
+        _, separateur, corps = self.text.partition("\n\n")
+        return corps if separateur else self.text
+
+    @property
+    def id_contenu(self) -> str:
+        """Identifiant du contenu: empreinte du corps normalisé.
+
+        Deux chunks qui répètent le même paragraphe (sous des titres ou dans
+        des fichiers différents) ont le même identifiant de contenu.
+        """
+        return empreinte_texte(normaliser_contenu(self.corps))
+
+    def __getitem__(self, cle: str):
+        if cle not in self._CLES:
+            raise KeyError(cle)
+        return getattr(self, cle)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._CLES)
+
+    def __len__(self) -> int:
+        return len(self._CLES)
+
+    def __eq__(self, autre: object) -> bool:
+        if not isinstance(autre, ChunkCompact):
+            return NotImplemented
+        return (self.id, self.text, self.source, self.heading, self.sources) == (
+            autre.id, autre.text, autre.source, autre.heading, autre.sources
+        )
+
+    def __repr__(self) -> str:
+        return f"ChunkCompact(id={self.id!r}, source={self.source!r}, heading={self.heading!r})"
+
+    def __reduce__(self):
+        # Reconstruit via __init__ pour réinterner les chaînes côté parent.
+        return (ChunkCompact, (self.id, self.text, self.source, self.heading, self.sources))
+
+
+def dedupliquer_chunks(chunks: Iterable[ChunkCompact]) -> list[ChunkCompact]:
+    """Fusionne les chunks dont le contenu normalisé est identique.
+
+    Deux passes: la première regroupe les sources de chaque contenu, la
+    seconde produit un chunk par contenu, identifié par `id_contenu`, avec
+    toutes ses sources triées. Le texte et le titre gardés sont ceux de la
+    première occurrence dans la première source par ordre alphabétique:
+    la même règle que le manifeste (`iterer_diff`), donc le même chunk en
+    local et dans Upstash.
+
+    Args:
+        chunks (Iterable[ChunkCompact]): Chunks de la découpe.
+
+    Returns:
+        list[ChunkCompact]: Un chunk par contenu distinct, dans l'ordre de
+            première apparition du contenu.
+
+    Exemple:
+        >>> a = ChunkCompact("1", "Contact\\n\\n- Email : y@x.fr", "contact.md", "Contact")
+        >>> b = ChunkCompact("2", "Résumé > Contact\\n\\n- email : y@x.fr", "00_resume.md", "Résumé > Contact")
+        >>> [(c.source, c.sources) for c in dedupliquer_chunks([a, b])]
+        [('00_resume.md', ('00_resume.md', 'contact.md'))]
+    """
+    retenus: dict[str, ChunkCompact] = {}
+    sources: dict[str, set[str]] = {}
+    for chunk in chunks:
+        cle = chunk.id_contenu
+        retenu = retenus.get(cle)
+        if retenu is None or chunk.source < retenu.source:
+            retenus[cle] = chunk
+        sources.setdefault(cle, set()).add(chunk.source)
+    return [
+        ChunkCompact(cle, retenu.text, retenu.source, retenu.heading, tuple(sorted(sources[cle])))
+        for cle, retenu in retenus.items()
+    ]
+
+
+@dataclass(frozen=True)
+class DecoupeStricte:
+    """Découpe à taille garantie: aucun chunk ne dépasse `max_tokens`.
+
+    La découpe par défaut ne coupe qu'entre paragraphes: un long paragraphe
+    (ou une longue liste) donne un chunk plus grand que `max_chars`. En mode
+    strict, un morceau trop long est recoupé entre phrases, puis entre mots
+    (et un mot démesuré, une URL par exemple, par tranches de caractères).
+    Les tailles sont comptées avec `estimer_tokens`, titre de section compris:
+    le coût d'un chunk dans le prompt a un plafond.
+
+    Args:
+        max_tokens (int): Plafond d'un chunk, en tokens estimés.
+        chevauchement (int): Tokens de la fin d'un chunk repris au début du
+            suivant dans la même section (au plus la moitié de `max_tokens`).
+
+    Exemple:
+        >>> regles = DecoupeStricte(max_tokens=20, chevauchement=4)
+        >>> texte = "Une phrase assez longue pour le test. " * 10
+        >>> chunks = decouper_markdown(texte, "projet.md", stricte=regles)
+        >>> max(estimer_tokens(c.text) for c in chunks) <= 20
+        True
+    """
+
+    max_tokens: int
+    chevauchement: int = 0
+
+    def __post_init__(self) -> None:
+        if self.max_tokens < MIN_TOKENS_STRICT:
+            raise ValueError(f"max_tokens must be at least {MIN_TOKENS_STRICT}")
+        if not 0 <= self.chevauchement <= self.max_tokens // 2:
+            raise ValueError("overlap must be between 0 and half of max_tokens")
+
+    def signature(self) -> str:
+        """Résume les réglages (un changement invalide le manifeste).
+
+        Returns:
+            str: Réglages sous forme de texte.
+        """
+        return f"strict:{self.max_tokens}/{self.chevauchement}"
+
+
+def _mots_bornes(mots: list[str], budget: int) -> tuple[list[str], int]:
+    """Garde les premiers mots d'une liste qui tiennent dans un budget.
+
+    Args:
+        mots (list[str]): Mots candidats, dans l'ordre de priorité.
+        budget (int): Tokens disponibles.
+
+    Returns:
+        tuple[list[str], int]: (mots gardés, tokens utilisés).
+    """
+    gardes: list[str] = []
+    cout = 0
+    for mot in mots:
+        cout_mot = estimer_tokens(mot)
+        if cout + cout_mot > budget:
+            break
+        gardes.append(mot)
+        cout += cout_mot
+    return gardes, cout
+
+
+def _morceaux_bornes(texte: str, budget: int, niveau: int = 0) -> Iterator[tuple[str, str]]:
+    """Coupe un texte en morceaux qui tiennent chacun dans le budget.
+
+    Args:
+        texte (str): Texte à couper.
+        budget (int): Tokens maximum par morceau.
+        niveau (int): Niveau de repli courant (`_NIVEAUX_DECOUPE`).
+
+    Returns:
+        Iterator[tuple[str, str]]: (séparateur à remettre avant, morceau).
+    """
+    if estimer_tokens(texte) <= budget:
+        yield "", texte
+        return
+    if niveau == len(_NIVEAUX_DECOUPE):
+        # Un caractère coûte au plus un token: `budget` caractères tiennent.
+        for debut in range(0, len(texte), budget):
+            yield "", texte[debut:debut + budget]
+        return
+
+    parties = _NIVEAUX_DECOUPE[niveau].split(texte)
+    separateur = ""
+    for position, partie in enumerate(parties):
+        if position % 2:
+            separateur = partie
+            continue
+        partie = partie.strip()
+        if not partie:
+            continue
+        for rang, (sous_separateur, morceau) in enumerate(_morceaux_bornes(partie, budget, niveau + 1)):
+            yield (separateur if rang == 0 else sous_separateur), morceau
+
+
+def _blocs_stricts(titre: str, contenu: str, regles: DecoupeStricte) -> list[str]:
+    """Regroupe le contenu d'une section en textes de chunk sous le plafond.
+
+    Le coût d'un texte est majoré par la somme des coûts de ses morceaux
+    (les séparateurs sont des blancs, ou rien entre deux tranches d'un mot).
+
+    Args:
+        titre (str): Chemin des titres de la section.
+        contenu (str): Contenu de la section.
+        regles (DecoupeStricte): Plafond et chevauchement.
+
+    Returns:
+        list[str]: Textes des chunks (titre compris).
+    """
+    entete = titre
+    if estimer_tokens(entete) > regles.max_tokens // 2:
+        # Un caractère coûte au plus un token: l'entête n'est jamais vide.
+        mots, _ = _mots_bornes(titre.split(), regles.max_tokens // 2)
+        entete = " ".join(mots) or titre[:regles.max_tokens // 2]
+    budget = regles.max_tokens - estimer_tokens(entete)
+
+    blocs: list[str] = []
+    bloc, cout = "", 0
+    for separateur, morceau in _morceaux_bornes(contenu, budget):
+        cout_morceau = estimer_tokens(morceau)
+        if bloc and cout + cout_morceau > budget:
+            blocs.append(bloc)
+            # La fin du bloc précédent est reprise, si elle laisse la place au morceau.
+            reprise, cout = _mots_bornes(bloc.split()[::-1], min(regles.chevauchement, budget - cout_morceau))
+            bloc = " ".join(reversed(reprise))
+            separateur = " "
+        bloc = f"{bloc}{separateur}{morceau}" if bloc else morceau
+        cout += cout_morceau
+    if bloc:
+        blocs.append(bloc)
+    return [f"{entete}\n\n{bloc}" for bloc in blocs]
+
+
+def decouper_markdown(
+    texte: str,
+    source: str,
+    max_chars: int = 1000,
+    stricte: DecoupeStricte | None = None,
+) -> list[ChunkCompact]:
     """Découpe un document Markdown en chunks.
 
     Args:
         texte (str): Contenu du fichier Markdown.
         source (str): Chemin relatif du fichier.
-        max_chars (int): Taille maximale d'un chunk.
+        max_chars (int): Taille maximale d'un chunk (découpe par défaut).
+        stricte (DecoupeStricte | None): Plafond en tokens garanti pour chaque
+            chunk, avec chevauchement (remplace `max_chars`).
 
     Returns:
-        list[dict]: Liste de dictionnaires avec id, text et metadata.
+        list[ChunkCompact]: Chunks (id, text, source, heading), lisibles
+            comme les anciens dictionnaires {"id", "text", "metadata"}.
     """
     lignes = texte.splitlines()
     regex_titre = re.compile(r"^(#{1,6})\s+(.*)$")
@@ -75,11 +438,16 @@ def decouper_markdown(texte: str, source: str, max_chars: int = 1000) -> list[di
         sections.append((chemin, "\n".join(buffer).strip()))
 
     # On crée des chunks en respectant la taille max
-    chunks: list[dict] = []
+    chunks: list[ChunkCompact] = []
     
     for chemin_titre, contenu in sections:
         if not contenu.strip():
             continue
+
+        if stricte is not None:
+            for index, bloc in enumerate(_blocs_stricts(chemin_titre, contenu, stricte)):
+                chunks.append(ChunkCompact(generer_id(source, chemin_titre, index), bloc, source, chemin_titre))
+            continue
             
         paragraphes = [p.strip() for p in re.split(r"\n\s*\n", contenu) if p.strip()]
         bloc = ""
@@ -87,48 +455,188 @@ def decouper_markdown(texte: str, source: str, max_chars: int = 1000) -> list[di
         
         for para in paragraphes:
             if bloc and len(bloc) + len(para) + 2 > max_chars:
-                chunks.append({
-                    "id": generer_id(source, chemin_titre, index),
-                    "text": f"{chemin_titre}\n\n{bloc}",
-                    "metadata": {"source": source, "heading": chemin_titre}
-                })
+                chunks.append(ChunkCompact(
+                    generer_id(source, chemin_titre, index),
+                    f"{chemin_titre}\n\n{bloc}",
+                    source,
+                    chemin_titre,
+                ))
                 index += 1
                 bloc = ""
             
             bloc = f"{bloc}\n\n{para}".strip() if bloc else para
         
         if bloc:
-            chunks.append({
-                "id": generer_id(source, chemin_titre, index),
-                "text": f"{chemin_titre}\n\n{bloc}",
-                "metadata": {"source": source, "heading": chemin_titre}
-            })
+            chunks.append(ChunkCompact(
+                generer_id(source, chemin_titre, index),
+                f"{chemin_titre}\n\n{bloc}",
+                source,
+                chemin_titre,
+            ))
 
     return chunks
 
 
-def decouper_tous_les_fichiers(dossier: str = "data", max_chars: int = 1000) -> list[dict]:
-    """Découpe tous les fichiers Markdown d'un dossier.
+@dataclass
+class FichierDecoupe:
+    """Résultat de la découpe d'un fichier.
 
     Args:
-        dossier (str): Chemin vers le dossier racine.
+        source (str): Chemin relatif du fichier.
+        empreinte (str): Empreinte du contenu du fichier.
+        chunks (list[ChunkCompact] | None): Chunks du fichier, ou None si son
+            empreinte était déjà connue (fichier inchangé, pas redécoupé).
+    """
+
+    source: str
+    empreinte: str
+    chunks: list[ChunkCompact] | None
+
+
+def _decouper_fichiers(
+    taches: list[tuple[str, str, str | None]],
+    max_chars: int,
+    stricte: DecoupeStricte | None = None,
+) -> list[FichierDecoupe]:
+    """Lit et découpe un groupe de fichiers (exécuté dans un worker).
+
+    Args:
+        taches (list[tuple[str, str, str | None]]): (chemin, source, empreinte connue).
         max_chars (int): Taille maximale d'un chunk.
+        stricte (DecoupeStricte | None): Réglages de la découpe stricte.
 
     Returns:
-        list[dict]: Liste de tous les chunks (dictionnaires).
+        list[FichierDecoupe]: Un résultat par fichier, dans l'ordre des tâches.
+    """
+    resultats = []
+    for chemin, source, empreinte_connue in taches:
+        texte = Path(chemin).read_text(encoding="utf-8")
+        empreinte = empreinte_texte(texte)
+        chunks = None if empreinte == empreinte_connue else decouper_markdown(texte, source, max_chars, stricte)
+        resultats.append(FichierDecoupe(source, empreinte, chunks))
+    return resultats
+
+
+def _grouper_taches(
+    dossier: str,
+    empreinte_connue: Callable[[str], str | None] | None,
+) -> Iterator[list[tuple[str, str, str | None]]]:
+    """Regroupe les fichiers du dossier en tâches de `FICHIERS_PAR_TACHE`.
+
+    Args:
+        dossier (str): Chemin vers le dossier racine.
+        empreinte_connue (Callable | None): Empreinte déjà indexée d'une source.
+
+    Returns:
+        Iterator[list[tuple[str, str, str | None]]]: Groupes de tâches.
     """
     base = Path(dossier)
-    chunks: list[dict] = []
-    
-    for fichier in charger_fichiers_markdown(dossier):
-        texte = fichier.read_text(encoding="utf-8")
+    groupe: list[tuple[str, str, str | None]] = []
+    for fichier in iterer_fichiers_markdown(dossier):
         source = str(fichier.relative_to(base)).replace("\\", "/")
-        chunks.extend(decouper_markdown(texte, source, max_chars))
-    
-    return chunks
+        connue = empreinte_connue(source) if empreinte_connue else None
+        groupe.append((str(fichier), source, connue))
+        if len(groupe) >= FICHIERS_PAR_TACHE:
+            yield groupe
+            groupe = []
+    if groupe:
+        yield groupe
+
+
+def iterer_fichiers_decoupes(
+    dossier: str = "data",
+    max_chars: int = 1000,
+    *,
+    jobs: int = 1,
+    empreinte_connue: Callable[[str], str | None] | None = None,
+    stricte: DecoupeStricte | None = None,
+) -> Iterator[FichierDecoupe]:
+    """Lit et découpe les fichiers d'un dossier, éventuellement sur plusieurs cœurs.
+
+    Avec `jobs > 1`, les fichiers sont répartis par groupes sur un pool de
+    processus. Les résultats sortent dans l'ordre du parcours (identique au
+    mode série, mêmes ids) et le nombre de groupes en vol est borné.
+
+    Args:
+        dossier (str): Chemin vers le dossier racine.
+        max_chars (int): Taille maximale d'un chunk.
+        jobs (int): Nombre de processus (1 = dans le processus courant).
+        empreinte_connue (Callable | None): Retourne l'empreinte déjà indexée
+            d'une source; un fichier qui a toujours cette empreinte n'est pas
+            redécoupé.
+        stricte (DecoupeStricte | None): Réglages de la découpe stricte.
+
+    Returns:
+        Iterator[FichierDecoupe]: Fichiers découpés, dans l'ordre.
+    """
+    taches = _grouper_taches(dossier, empreinte_connue)
+    if jobs <= 1:
+        for groupe in taches:
+            yield from _decouper_fichiers(groupe, max_chars, stricte)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executeur:
+        en_vol: deque[Future] = deque()
+        for groupe in taches:
+            en_vol.append(executeur.submit(_decouper_fichiers, groupe, max_chars, stricte))
+            # Quelques groupes d'avance par worker suffisent à les occuper.
+            if len(en_vol) >= 2 * jobs:
+                yield from en_vol.popleft().result()
+        while en_vol:
+            yield from en_vol.popleft().result()
+
+
+def iterer_chunks(
+    dossier: str = "data",
+    max_chars: int = 1000,
+    *,
+    jobs: int = 1,
+    stricte: DecoupeStricte | None = None,
+) -> Iterator[ChunkCompact]:
+    """Découpe les fichiers Markdown d'un dossier au fil de la lecture.
+
+    Un seul fichier (ou un groupe borné par worker) est en mémoire à la fois:
+    c'est l'entrée du pipeline d'indexation en flux.
+
+    Args:
+        dossier (str): Chemin vers le dossier racine.
+        max_chars (int): Taille maximale d'un chunk.
+        jobs (int): Nombre de processus de découpe.
+        stricte (DecoupeStricte | None): Réglages de la découpe stricte.
+
+    Returns:
+        Iterator[ChunkCompact]: Chunks, fichier par fichier.
+    """
+    for fichier in iterer_fichiers_decoupes(dossier, max_chars, jobs=jobs, stricte=stricte):
+        yield from fichier.chunks or []
+
+
+def decouper_tous_les_fichiers(
+    dossier: str = "data",
+    max_chars: int = 1000,
+    *,
+    jobs: int = 1,
+    stricte: DecoupeStricte | None = None,
+) -> list[ChunkCompact]:
+    """Découpe tous les fichiers Markdown d'un dossier.
+
+    Args:
+        dossier (str): Chemin vers le dossier racine.
+        max_chars (int): Taille maximale d'un chunk.
+        jobs (int): Nombre de processus de découpe.
+        stricte (DecoupeStricte | None): Réglages de la découpe stricte.
+
+    Returns:
+        list[ChunkCompact]: Liste de tous les chunks.
+    """
+    return list(iterer_chunks(dossier, max_chars, jobs=jobs, stricte=stricte))
 
 
 # Alias
+CompactChunk = ChunkCompact
+StrictChunking = DecoupeStricte
+deduplicate_chunks = dedupliquer_chunks
 load_markdown_files = charger_fichiers_markdown
 chunk_markdown = decouper_markdown
-chunk_markdown_files = decouper_tous_les_fichiers
\ No newline at end of file
+chunk_markdown_files = decouper_tous_les_fichiers
+iter_markdown_chunks = iterer_chunks
\ No newline at end of file
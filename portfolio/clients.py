@@ -0,0 +1,332 @@
+"""Registre partagé des clients Upstash Vector.
+
+Un `Index` Upstash garde un client HTTP (httpx) avec des connexions keep-alive.
+En le recréant à chaque recherche, on repayait la lecture du `.env` et une
+connexion froide (TLS compris). Ce module garde un client par couple
+(url, token) pour tout le processus:
+- Accès thread-safe (Streamlit exécute chaque session dans son propre thread)
+- Rechargement / invalidation explicites
+- Statistiques du pool
+
+Les clients asynchrones (`AsyncIndex`) sont liés à la boucle asyncio qui les a
+créés: ils sont regroupés dans un registre par boucle, oublié avec elle.
+
+Les recherches avec délai ont leurs propres clients (`delai_http`): timeout
+HTTP proche du délai et aucune nouvelle tentative interne. Le client par
+défaut garde le timeout de la bibliothèque (600 s): un upsert volumineux
+peut prendre du temps.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import httpx
+from dotenv import load_dotenv
+from upstash_vector import AsyncIndex, Index
+
+
+@dataclass
+class StatsPool:
+    """Compteurs du registre de clients.
+
+    Args:
+        clients (int): Nombre de clients actuellement ouverts.
+        reutilisations (int): Demandes servies par un client existant.
+        creations (int): Clients créés depuis le démarrage.
+        invalidations (int): Clients fermés via invalidation ou rechargement.
+        rechargements_env (int): Nombre de lectures du fichier `.env`.
+    """
+
+    clients: int = 0
+    reutilisations: int = 0
+    creations: int = 0
+    invalidations: int = 0
+    rechargements_env: int = 0
+
+
+# Timeout maximal d'établissement de connexion d'un client borné (s)
+DELAI_CONNEXION_MAX = 10.0
+
+
+def _borner_client(client: Any, delai_http: float) -> Any:
+    """Borne la durée des requêtes d'un client Upstash.
+
+    Args:
+        client (Any): Client Upstash (ou objet compatible).
+        delai_http (float): Timeout HTTP, en secondes.
+
+    Returns:
+        Any: Le même client, sans nouvelles tentatives internes (la
+            relance est faite par l'appelant).
+    """
+    if hasattr(client, "_retries"):
+        client._retries = 0
+    http = getattr(client, "_client", None)
+    if http is not None:
+        http.timeout = httpx.Timeout(delai_http, connect=min(delai_http, DELAI_CONNEXION_MAX))
+    return client
+
+
+def _fermer_client(client: Any) -> None:
+    """Ferme proprement la connexion HTTP d'un client Upstash.
+
+    Args:
+        client (Any): Client Upstash (ou objet compatible).
+
+    Returns:
+        None
+    """
+    http = getattr(client, "_client", None)
+    fermer = getattr(http, "close", None)
+    if callable(fermer):
+        try:
+            fermer()
+        except Exception:
+            # Une connexion déjà cassée ne doit pas bloquer l'invalidation.
+            pass
+
+
+class RegistreClients:
+    """Registre thread-safe de clients Upstash, indexé par (url, token).
+
+    Args:
+        fabrique (Callable[..., Any]): Constructeur de client (par défaut `Index`).
+    """
+
+    def __init__(self, fabrique: Callable[..., Any] = Index) -> None:
+        self._fabrique = fabrique
+        self._clients: dict[tuple[str, str], Any] = {}
+        self._verrou = threading.Lock()
+        self._env_charge = False
+        self._stats = StatsPool()
+
+    def charger_environnement(self, *, forcer: bool = False) -> None:
+        """Lit le `.env` une seule fois par processus (ou à la demande).
+
+        Args:
+            forcer (bool): Relire le fichier même s'il a déjà été chargé.
+
+        Returns:
+            None
+        """
+        with self._verrou:
+            if self._env_charge and not forcer:
+                return
+            load_dotenv(override=True)
+            self._env_charge = True
+            self._stats.rechargements_env += 1
+
+    def obtenir(self, url: str, token: str, *, delai_http: float | None = None) -> Any:
+        """Retourne le client associé à (url, token), en le créant si besoin.
+
+        Args:
+            url (str): URL REST Upstash.
+            token (str): Token Upstash.
+            delai_http (float | None): Timeout HTTP des requêtes, en secondes
+                (None: celui de la bibliothèque). Un client par valeur.
+
+        Returns:
+            Any: Client partagé.
+        """
+        cle = (url, token, delai_http)
+        with self._verrou:
+            client = self._clients.get(cle)
+            if client is not None:
+                self._stats.reutilisations += 1
+                return client
+            client = self._fabrique(url=url, token=token)
+            if delai_http is not None:
+                client = _borner_client(client, delai_http)
+            self._clients[cle] = client
+            self._stats.creations += 1
+            return client
+
+    def invalider(self, url: str | None = None, token: str | None = None) -> int:
+        """Ferme et oublie des clients.
+
+        Sans argument, tous les clients sont invalidés. Avec une URL (et
+        éventuellement un token), seuls les clients correspondants le sont.
+
+        Args:
+            url (str | None): URL à invalider.
+            token (str | None): Token à invalider.
+
+        Returns:
+            int: Nombre de clients fermés.
+        """
+        with self._verrou:
+            cles = [
+                cle for cle in self._clients
+                if (url is None or cle[0] == url) and (token is None or cle[1] == token)
+            ]
+            clients = [self._clients.pop(cle) for cle in cles]
+            self._stats.invalidations += len(clients)
+
+        # On ferme hors du verrou: la fermeture réseau peut être lente.
+        for client in clients:
+            _fermer_client(client)
+        return len(clients)
+
+    def recharger(self) -> None:
+        """Relit le `.env` et ferme tous les clients existants.
+
+        Returns:
+            None
+        """
+        self.invalider()
+        self.charger_environnement(forcer=True)
+
+    def stats(self) -> StatsPool:
+        """Retourne une copie des compteurs du registre.
+
+        Returns:
+            StatsPool: Statistiques courantes.
+        """
+        with self._verrou:
+            return StatsPool(
+                clients=len(self._clients),
+                reutilisations=self._stats.reutilisations,
+                creations=self._stats.creations,
+                invalidations=self._stats.invalidations,
+                rechargements_env=self._stats.rechargements_env,
+            )
+
+
+# Registre unique pour tout le processus (CLI, Streamlit, scripts).
+REGISTRE = RegistreClients()
+
+# Clients asynchrones: un registre par boucle asyncio (un client httpx
+# asynchrone ne peut pas servir depuis une autre boucle).
+_REGISTRES_ASYNC: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, RegistreClients] = (
+    weakref.WeakKeyDictionary()
+)
+_verrou_async = threading.Lock()
+
+
+def lire_config_upstash() -> tuple[str | None, str | None]:
+    """Lit les variables d'environnement nécessaires à Upstash.
+
+    Returns:
+        tuple[str | None, str | None]: URL et token Upstash.
+    """
+    url = os.getenv("UPSTASH_VECTOR_REST_URL")
+    token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
+    return url, token
+
+
+def charger_environnement(*, forcer: bool = False) -> None:
+    """Charge le `.env` une fois pour tout le processus.
+
+    Args:
+        forcer (bool): Relire le fichier même s'il a déjà été chargé.
+
+    Returns:
+        None
+    """
+    REGISTRE.charger_environnement(forcer=forcer)
+
+
+def obtenir_index_partage(*, delai_http: float | None = None) -> Index:
+    """Retourne le client Upstash partagé pour la configuration courante.
+
+    Le `.env` n'est lu qu'au premier appel; les variables sont ensuite relues
+    dans `os.environ` à chaque appel (coût négligeable), donc un changement de
+    configuration donne naturellement un nouveau client.
+
+    Args:
+        delai_http (float | None): Timeout HTTP (recherches avec délai), en
+            secondes; None garde le client par défaut.
+
+    Returns:
+        Index: Client Upstash Vector partagé.
+    """
+    REGISTRE.charger_environnement()
+    url, token = lire_config_upstash()
+    if not url or not token:
+        raise RuntimeError("Missing UPSTASH_VECTOR_REST_URL or UPSTASH_VECTOR_REST_TOKEN")
+    return REGISTRE.obtenir(url, token, delai_http=delai_http)
+
+
+def obtenir_index_async_partage(*, delai_http: float | None = None) -> AsyncIndex:
+    """Retourne le client Upstash asynchrone partagé de la boucle courante.
+
+    À appeler depuis une coroutine: le client est réutilisé par toutes les
+    recherches lancées sur la même boucle.
+
+    Args:
+        delai_http (float | None): Timeout HTTP (recherches avec délai), en
+            secondes; None garde le client par défaut.
+
+    Returns:
+        AsyncIndex: Client Upstash Vector asynchrone partagé.
+    """
+    REGISTRE.charger_environnement()
+    url, token = lire_config_upstash()
+    if not url or not token:
+        raise RuntimeError("Missing UPSTASH_VECTOR_REST_URL or UPSTASH_VECTOR_REST_TOKEN")
+
+    boucle = asyncio.get_running_loop()
+    with _verrou_async:
+        registre = _REGISTRES_ASYNC.get(boucle)
+        if registre is None:
+            registre = _REGISTRES_ASYNC[boucle] = RegistreClients(fabrique=AsyncIndex)
+    return registre.obtenir(url, token, delai_http=delai_http)
+
+
+def _registres_async() -> list[RegistreClients]:
+    with _verrou_async:
+        return list(_REGISTRES_ASYNC.values())
+
+
+def recharger_clients() -> None:
+    """Relit le `.env` et ferme tous les clients partagés.
+
+    Returns:
+        None
+    """
+    REGISTRE.recharger()
+    for registre in _registres_async():
+        registre.invalider()
+
+
+def invalider_clients(url: str | None = None, token: str | None = None) -> int:
+    """Invalide les clients partagés (tous, ou ceux d'une URL / d'un token).
+
+    Les clients asynchrones sont seulement oubliés: leur connexion se ferme
+    avec leur boucle.
+
+    Args:
+        url (str | None): URL à invalider.
+        token (str | None): Token à invalider.
+
+    Returns:
+        int: Nombre de clients fermés.
+    """
+    total = REGISTRE.invalider(url, token)
+    for registre in _registres_async():
+        total += registre.invalider(url, token)
+    return total
+
+
+def stats_pool() -> StatsPool:
+    """Retourne les statistiques du registre partagé.
+
+    Returns:
+        StatsPool: Statistiques courantes.
+    """
+    return REGISTRE.stats()
+
+
+# Alias
+load_environment = charger_environnement
+get_shared_index = obtenir_index_partage
+get_shared_async_index = obtenir_index_async_partage
+reload_clients = recharger_clients
+invalidate_clients = invalider_clients
+pool_stats = stats_pool
@@ -0,0 +1,154 @@
+"""Détection des commandes du chat en une seule passe.
+
+Les commandes étaient reconnues par une suite de `any(x in t for x in [...])`:
+chaque message parcourait autant de fois le texte qu'il y avait de mots-clés,
+et les sous-chaînes déclenchaient des commandes par erreur ("git" dans
+"digital", "teste" dans "je teste ton chatbot").
+
+Ici la table des commandes est compilée une fois en automate d'Aho-Corasick:
+le message est lu une seule fois, caractère par caractère, et un mot-clé ne
+compte que s'il est délimité par des frontières de mots. Quand plusieurs
+commandes correspondent, la première de la table l'emporte (même priorité
+que l'ancienne chaîne de `if`).
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable, Sequence
+
+
+# Commandes déclenchées par un mot-clé, par ordre de priorité
+MOTS_CLES_COMMANDES: list[tuple[str, tuple[str, ...]]] = [
+    ("42", ("42",)),
+    ("matrix", ("matrix",)),
+    ("hello_world", ("hello world",)),
+    ("konami", ("konami",)),
+    ("github", ("github", "git", "repo", "repos")),
+    ("linkedin", ("linkedin", "profil pro")),
+    ("liens", ("liens", "réseaux", "reseaux", "contact", "contacter")),
+    ("anecdote", ("fun fact", "anecdote", "truc marrant")),
+    ("stats", ("stats", "statistiques")),
+    ("reset", ("reset", "recommencer", "effacer")),
+    ("quiz", ("quiz", "quizz", "teste-moi", "teste moi")),
+]
+
+# Commandes reconnues seulement si le message entier est le mot-clé
+COMMANDES_EXACTES: dict[str, str] = {"help": "aide", "aide": "aide", "?": "aide"}
+
+
+def _est_mot(caractere: str) -> bool:
+    return caractere.isalnum() or caractere == "_"
+
+
+class AutomateCommandes:
+    """Automate d'Aho-Corasick sur des mots-clés, avec frontières de mots.
+
+    Args:
+        table (Sequence[tuple[str, Iterable[str]]]): (commande, mots-clés), par
+            ordre de priorité décroissante. Les mots-clés sont en minuscules.
+    """
+
+    def __init__(self, table: Sequence[tuple[str, Iterable[str]]]) -> None:
+        self.noms = [nom for nom, _ in table]
+        # Noeud 0 = racine. Pour chaque noeud: transitions, lien d'échec et
+        # mots-clés reconnus en y arrivant (longueur, priorité).
+        self._transitions: list[dict[str, int]] = [{}]
+        self._echecs: list[int] = [0]
+        self._sorties: list[list[tuple[int, int]]] = [[]]
+        for priorite, (_, mots_cles) in enumerate(table):
+            for mot_cle in mots_cles:
+                self._ajouter(mot_cle, priorite)
+        self._construire_echecs()
+
+    def _ajouter(self, mot_cle: str, priorite: int) -> None:
+        noeud = 0
+        for caractere in mot_cle:
+            suivant = self._transitions[noeud].get(caractere)
+            if suivant is None:
+                suivant = len(self._transitions)
+                self._transitions[noeud][caractere] = suivant
+                self._transitions.append({})
+                self._echecs.append(0)
+                self._sorties.append([])
+            noeud = suivant
+        self._sorties[noeud].append((len(mot_cle), priorite))
+
+    def _construire_echecs(self) -> None:
+        # Parcours en largeur: le lien d'échec d'un noeud est le plus long
+        # suffixe propre de son préfixe qui est aussi un préfixe de l'automate.
+        file = deque(self._transitions[0].values())
+        while file:
+            noeud = file.popleft()
+            for caractere, enfant in self._transitions[noeud].items():
+                echec = self._echecs[noeud]
+                while echec and caractere not in self._transitions[echec]:
+                    echec = self._echecs[echec]
+                self._echecs[enfant] = self._transitions[echec].get(caractere, 0)
+                self._sorties[enfant].extend(self._sorties[self._echecs[enfant]])
+                file.append(enfant)
+
+    def trouver(self, texte: str) -> str | None:
+        """Retourne la commande prioritaire présente dans un texte.
+
+        Args:
+            texte (str): Message en minuscules.
+
+        Returns:
+            str | None: Nom de la commande, ou None si aucun mot-clé n'est présent.
+
+        Exemple:
+            >>> automate = AutomateCommandes([("github", ["git"]), ("quiz", ["quiz"])])
+            >>> automate.trouver("un quiz sur git ?")
+            'github'
+            >>> automate.trouver("le digital") is None
+            True
+        """
+        transitions, echecs, sorties = self._transitions, self._echecs, self._sorties
+        meilleure = len(self.noms)
+        noeud = 0
+        for fin, caractere in enumerate(texte):
+            while noeud and caractere not in transitions[noeud]:
+                noeud = echecs[noeud]
+            noeud = transitions[noeud].get(caractere, 0)
+            for longueur, priorite in sorties[noeud]:
+                if priorite >= meilleure:
+                    continue
+                debut = fin - longueur + 1
+                if debut > 0 and _est_mot(texte[debut - 1]):
+                    continue
+                if fin + 1 < len(texte) and _est_mot(texte[fin + 1]):
+                    continue
+                meilleure = priorite
+        return self.noms[meilleure] if meilleure < len(self.noms) else None
+
+
+# Automate des commandes du chat, compilé une fois par processus
+AUTOMATE_COMMANDES = AutomateCommandes(MOTS_CLES_COMMANDES)
+
+
+def trouver_commande(texte: str) -> str | None:
+    """Identifie la commande d'un message du chat.
+
+    Args:
+        texte (str): Message de l'utilisateur.
+
+    Returns:
+        str | None: Nom de la commande (voir `MOTS_CLES_COMMANDES` et
+        `COMMANDES_EXACTES`), ou None.
+
+    Exemple:
+        >>> trouver_commande("Tu as un repo GitHub ?")
+        'github'
+        >>> trouver_commande("Je teste ton chatbot") is None
+        True
+    """
+    t = texte.lower().strip()
+    if t in COMMANDES_EXACTES:
+        return COMMANDES_EXACTES[t]
+    return AUTOMATE_COMMANDES.trouver(t)
+
+
+# Alias
+CommandMatcher = AutomateCommandes
+find_command = trouver_commande
@@ -2,13 +2,39 @@
 
 Usage:
 `python -m portfolio.index_data --data-dir data --namespace portfolio`
+
+L'indexation est incrémentale (manifeste local): `--dry-run` affiche ce qui
+serait envoyé / supprimé, `--full` renvoie tous les chunks.
+
+`--max-tokens` active la découpe stricte: aucun chunk ne dépasse ce nombre de
+tokens (titre compris), `--overlap` répète la fin d'un chunk au début du suivant.
 """
 
 from __future__ import annotations
 
 import argparse
 
-from .indexing import index_data_dir
+from .chunking import DecoupeStricte
+from .indexing import NB_ESSAIS, NB_WORKERS, OCTETS_LOT, TAILLE_LOT, indexer_dossier
+
+
+def entier_positif(valeur: str) -> int:
+    """Convertit un argument en entier strictement positif.
+
+    Args:
+        valeur (str): Valeur passée en ligne de commande.
+
+    Returns:
+        int: Entier supérieur ou égal à 1.
+
+    Exemple:
+        >>> entier_positif("3")
+        3
+    """
+    nombre = int(valeur)
+    if nombre < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {nombre}")
+    return nombre
 
 
 def construire_parser() -> argparse.ArgumentParser:
@@ -23,6 +49,43 @@ def construire_parser() -> argparse.ArgumentParser:
     parser.add_argument("--data-dir", default="data")
     parser.add_argument("--namespace", default="portfolio")
     parser.add_argument("--max-chars", type=int, default=1000)
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=0,
+        help="Strict mode: hard ceiling per chunk in estimated tokens, heading included "
+        "(long paragraphs are split by sentence, then by word)",
+    )
+    parser.add_argument(
+        "--overlap",
+        type=int,
+        default=0,
+        help="Strict mode: tokens from the end of a chunk repeated at the start of the next one",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=entier_positif,
+        default=1,
+        help="Chunk files on N processes (same ordered output and ids as 1)",
+    )
+    parser.add_argument("--batch-size", type=entier_positif, default=TAILLE_LOT, help="Max chunks per upsert request")
+    parser.add_argument(
+        "--batch-bytes", type=entier_positif, default=OCTETS_LOT, help="Max estimated bytes per upsert request"
+    )
+    parser.add_argument("--workers", type=entier_positif, default=NB_WORKERS, help="Concurrent upsert requests")
+    parser.add_argument(
+        "--retries", type=entier_positif, default=NB_ESSAIS, help="Attempts per batch, at least 1 (exponential backoff)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would be upserted/deleted without touching the index",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Upsert every chunk, even unchanged ones (stale chunks are still deleted)",
+    )
     return parser
 
 
@@ -35,15 +98,47 @@ def main() -> int:
     parser = construire_parser()
     args = parser.parse_args()
 
+    stricte = None
+    if args.max_tokens:
+        try:
+            stricte = DecoupeStricte(max_tokens=args.max_tokens, chevauchement=args.overlap)
+        except ValueError as erreur:
+            parser.error(str(erreur))
+    elif args.overlap:
+        parser.error("--overlap requires --max-tokens")
+
     # max_chars : taille max d'un chunk (plus petit = plus précis, mais plus de chunks)
-    ids = index_data_dir(
+    resultat = indexer_dossier(
         data_dir=args.data_dir,
         namespace=args.namespace,
         max_chars=args.max_chars,
+        complet=args.full,
+        dry_run=args.dry_run,
+        taille_lot=args.batch_size,
+        octets_lot=args.batch_bytes,
+        nb_workers=args.workers,
+        nb_essais=args.retries,
+        garder_ids=False,
+        jobs=args.jobs,
+        stricte=stricte,
     )
 
+    if args.dry_run:
+        print(f"Dry run for namespace '{args.namespace}':")
+        print(resultat.diff.resume())
+        return 0
+
     # Si relance de data, relancer cette commande pour mettre l'index à jour.
-    print(f"Indexed {len(ids)} chunks into namespace '{args.namespace}'.")
+    print(
+        f"Indexed {resultat.diff.nb_a_upserter} chunks into namespace '{args.namespace}' "
+        f"({len(resultat.supprimes)} deleted, {resultat.diff.inchanges} unchanged)."
+    )
+    print(
+        f"Dedup: {resultat.diff.nb_contenus} distinct chunks stored for {resultat.diff.nb_occurrences} "
+        f"chunked (ratio {resultat.diff.taux_dedup:.1%})."
+    )
+    if resultat.rapport is not None:
+        print(f"Throughput: {resultat.rapport.resume()}")
     return 0
 
 
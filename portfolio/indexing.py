@@ -1,24 +1,39 @@
 """Indexation des chunks dans Upstash Vector.
 
 Ce module:
-- Lit les identifiants Upstash via `.env`
+- Récupère le client Upstash partagé (voir `portfolio.clients`)
 - Transforme les chunks en `Vector`
 - Upsert dans un namespace (par défaut `portfolio`)
+- Ne renvoie que les chunks modifiés et supprime les chunks disparus
+  (manifeste local, voir `portfolio.manifest`)
 """
 
 from __future__ import annotations
 
-import os
-from typing import Iterable, List, TypedDict, cast
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, TypedDict, Union, cast
 
-from dotenv import load_dotenv
 from upstash_vector import Index, Vector
 
-from .chunking import chunk_markdown_files
+from .chunking import ChunkCompact, DecoupeStricte
+from .clients import lire_config_upstash, obtenir_index_partage  # noqa: F401 (réexport)
+from .manifest import DiffIndex, abandonner_manifeste, iterer_diff, valider_manifeste
+from .state import publier_version_corpus
 
 
-class Chunk(TypedDict):
-    """Structure minimale d'un chunk pour l'indexation.
+# Envoi par lots (limites de taille des requêtes Upstash, parallélisme)
+TAILLE_LOT = 100
+OCTETS_LOT = 512 * 1024
+NB_WORKERS = 4
+NB_ESSAIS = 4
+DELAI_INITIAL = 0.5  # secondes, doublé à chaque nouvel essai
+
+
+class ChunkDict(TypedDict):
+    """Chunk sous forme de dictionnaire (ancien format, toujours accepté).
 
     Args:
         id (str): Identifiant unique du chunk.
@@ -31,48 +46,211 @@ class Chunk(TypedDict):
     metadata: dict
 
 
+# Chunk accepté par l'indexation: `ChunkCompact` (produit par la découpe) ou dictionnaire
+Chunk = Union[ChunkCompact, ChunkDict]
+
+
 def get_upstash_index() -> Index:
-    """Construit un client Upstash Vector à partir des variables d'environnement.
+    """Retourne le client Upstash Vector partagé du processus.
+
+    Le client (et ses connexions keep-alive) est réutilisé d'un appel à
+    l'autre; utiliser `portfolio.clients.recharger_clients()` pour relire
+    le `.env` et repartir de clients neufs.
 
     Returns:
         Index: Client Upstash Vector prêt à l'emploi.
     """
-    # On recharge le .env pour que ça marche partout (CLI, tests, Streamlit).
-    load_dotenv(override=True)
-    url, token = lire_config_upstash()
-    if not url or not token:
-        raise RuntimeError("Missing UPSTASH_VECTOR_REST_URL or UPSTASH_VECTOR_REST_TOKEN")
-    return Index(url=url, token=token)
+    return obtenir_index_partage()
+
+
+@dataclass
+class RapportUpsert:
+    """Bilan (et débit) d'un envoi de chunks par lots.
+
+    Args:
+        ids (list[str]): Identifiants envoyés, dans l'ordre d'entrée.
+        nb_chunks (int): Nombre de chunks envoyés.
+        octets (int): Taille estimée des données envoyées.
+        lots (int): Nombre de requêtes d'upsert.
+        reessais (int): Nombre de nouvelles tentatives après une erreur.
+        duree (float): Durée totale, en secondes.
+    """
 
+    ids: List[str] = field(default_factory=list)
+    nb_chunks: int = 0
+    octets: int = 0
+    lots: int = 0
+    reessais: int = 0
+    duree: float = 0.0
 
-def lire_config_upstash() -> tuple[str | None, str | None]:
-    """Lit les variables d'environnement nécessaires à Upstash.
+    def resume(self) -> str:
+        """Formate le débit de l'envoi.
+
+        Returns:
+            str: Ligne lisible (chunks/s, octets/s).
+        """
+        duree = self.duree or 1e-9
+        return (
+            f"{self.nb_chunks} chunks, {self.octets} bytes in {self.lots} batches "
+            f"({self.reessais} retries) in {self.duree:.2f}s: "
+            f"{self.nb_chunks / duree:.1f} chunks/s, {self.octets / duree:.0f} bytes/s"
+        )
+
+
+def taille_chunk(chunk: Chunk) -> int:
+    """Estime la taille d'un chunk une fois sérialisé pour l'upsert.
+
+    Args:
+        chunk (Chunk): Chunk à envoyer.
 
     Returns:
-        tuple[str | None, str | None]: URL et token Upstash.
+        int: Taille approximative en octets.
     """
-    url = os.getenv("UPSTASH_VECTOR_REST_URL")
-    token = os.getenv("UPSTASH_VECTOR_REST_TOKEN")
-    return url, token
+    return (
+        len(chunk["id"])
+        + len(chunk["text"].encode())
+        + len(json.dumps(chunk["metadata"], ensure_ascii=False).encode())
+    )
 
 
-def upsert_chunks(index: Index, chunks: Iterable[Chunk], *, namespace: str = "portfolio") -> List[str]:
-    """Upsert une liste de chunks et retourne les IDs insérés.
+def decouper_en_lots(
+    chunks: Iterable[Chunk],
+    *,
+    taille_lot: int = TAILLE_LOT,
+    octets_lot: int = OCTETS_LOT,
+) -> Iterator[list[Chunk]]:
+    """Regroupe les chunks en lots bornés en nombre et en octets.
+
+    Un chunk plus gros que `octets_lot` forme un lot à lui seul.
+
+    Args:
+        chunks (Iterable[Chunk]): Chunks à regrouper.
+        taille_lot (int): Nombre maximal de chunks par lot.
+        octets_lot (int): Taille maximale estimée d'un lot.
+
+    Returns:
+        Iterator[list[Chunk]]: Lots successifs.
+    """
+    lot: list[Chunk] = []
+    octets = 0
+    for chunk in chunks:
+        taille = taille_chunk(chunk)
+        if lot and (len(lot) >= taille_lot or octets + taille > octets_lot):
+            yield lot
+            lot, octets = [], 0
+        lot.append(chunk)
+        octets += taille
+    if lot:
+        yield lot
+
+
+def _envoyer_lot(
+    index: Index,
+    lot: list[Chunk],
+    namespace: str,
+    nb_essais: int,
+    delai_initial: float,
+) -> int:
+    """Envoie un lot, avec nouvelles tentatives espacées exponentiellement.
 
     Args:
         index (Index): Client Upstash.
+        lot (list[Chunk]): Chunks du lot.
+        namespace (str): Namespace Upstash.
+        nb_essais (int): Nombre maximal de tentatives (au moins une).
+        delai_initial (float): Attente avant le 2e essai (doublée ensuite).
+
+    Returns:
+        int: Nombre de nouvelles tentatives utilisées.
+    """
+    vectors = construire_vecteurs(lot)
+    # Toujours au moins un envoi: sinon le manifeste serait validé sans upsert.
+    nb_essais = max(1, nb_essais)
+    for essai in range(nb_essais):
+        try:
+            index.upsert(vectors=vectors, namespace=namespace)
+            return essai
+        except Exception:
+            if essai == nb_essais - 1:
+                raise
+            time.sleep(delai_initial * 2 ** essai)
+    return 0
+
+
+def upsert_par_lots(
+    index: Index | None,
+    chunks: Iterable[Chunk],
+    *,
+    namespace: str = "portfolio",
+    taille_lot: int = TAILLE_LOT,
+    octets_lot: int = OCTETS_LOT,
+    nb_workers: int = NB_WORKERS,
+    nb_essais: int = NB_ESSAIS,
+    delai_initial: float = DELAI_INITIAL,
+    garder_ids: bool = True,
+) -> RapportUpsert:
+    """Upsert des chunks par lots, avec plusieurs envois en parallèle.
+
+    Au plus `nb_workers` lots sont en vol en même temps; chaque lot est
+    retenté avec un délai exponentiel en cas d'erreur.
+
+    Args:
+        index (Index | None): Client Upstash (client partagé si None).
         chunks (Iterable[Chunk]): Chunks à indexer.
         namespace (str): Namespace Upstash.
+        taille_lot (int): Nombre maximal de chunks par requête.
+        octets_lot (int): Taille maximale estimée d'une requête.
+        nb_workers (int): Nombre d'envois simultanés.
+        nb_essais (int): Nombre maximal de tentatives par lot.
+        delai_initial (float): Attente avant la 2e tentative, en secondes.
+        garder_ids (bool): Garder la liste des ids envoyés.
 
     Returns:
-        list[str]: Liste des identifiants insérés.
+        RapportUpsert: Identifiants envoyés et débit.
     """
-    liste_chunks = list(chunks)
-    vectors = construire_vecteurs(liste_chunks)
+    idx = index
+    rapport = RapportUpsert()
+    debut = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, nb_workers)) as executeur:
+        en_vol: set[Future] = set()
+        for lot in decouper_en_lots(chunks, taille_lot=taille_lot, octets_lot=octets_lot):
+            # Client résolu au premier lot: rien à envoyer, rien à configurer.
+            idx = idx or get_upstash_index()
+            # On borne le nombre de lots en vol (et donc la mémoire).
+            if len(en_vol) >= max(1, nb_workers):
+                termines, en_vol = wait(en_vol, return_when=FIRST_COMPLETED)
+                rapport.reessais += sum(f.result() for f in termines)
+            en_vol.add(executeur.submit(_envoyer_lot, idx, lot, namespace, nb_essais, delai_initial))
+            if garder_ids:
+                rapport.ids.extend(c["id"] for c in lot)
+            rapport.nb_chunks += len(lot)
+            rapport.octets += sum(taille_chunk(c) for c in lot)
+            rapport.lots += 1
+        rapport.reessais += sum(f.result() for f in en_vol)
 
+    rapport.duree = time.perf_counter() - debut
+    return rapport
+
+
+def upsert_chunks(
+    index: Index | None,
+    chunks: Iterable[Chunk],
+    *,
+    namespace: str = "portfolio",
+) -> List[str]:
+    """Upsert une liste de chunks et retourne les IDs insérés.
+
+    Args:
+        index (Index | None): Client Upstash (client partagé si None).
+        chunks (Iterable[Chunk]): Chunks à indexer.
+        namespace (str): Namespace Upstash.
+
+    Returns:
+        list[str]: Liste des identifiants insérés.
+    """
     # Les IDs sont stables, donc l'upsert met à jour proprement si un fichier change.
-    index.upsert(vectors=vectors, namespace=namespace)
-    return [c["id"] for c in liste_chunks]
+    return upsert_par_lots(index, chunks, namespace=namespace).ids
 
 
 def construire_vecteurs(chunks: Iterable[Chunk]) -> List[Vector]:
@@ -84,19 +262,126 @@ def construire_vecteurs(chunks: Iterable[Chunk]) -> List[Vector]:
     Returns:
         list[Vector]: Vecteurs prêts pour l'upsert.
     """
+    # `ChunkCompact.metadata` construit déjà un dictionnaire neuf: pas de copie.
     return [
-        Vector(id=c["id"], data=c["text"], metadata=dict(c["metadata"]))
+        Vector(
+            id=c["id"],
+            data=c["text"],
+            metadata=c.metadata if isinstance(c, ChunkCompact) else dict(c["metadata"]),
+        )
         for c in chunks
     ]
 
 
+@dataclass
+class ResultatIndexation:
+    """Bilan d'une indexation.
+
+    Args:
+        ids (list[str]): Identifiants des chunks envoyés.
+        supprimes (list[str]): Identifiants des chunks supprimés de l'index.
+        diff (DiffIndex): Différence calculée avant l'envoi.
+        rapport (RapportUpsert | None): Débit de l'envoi (None si rien envoyé).
+        dry_run (bool): True si rien n'a été envoyé.
+    """
+
+    ids: List[str] = field(default_factory=list)
+    supprimes: List[str] = field(default_factory=list)
+    diff: DiffIndex = field(default_factory=DiffIndex)
+    rapport: RapportUpsert | None = None
+    dry_run: bool = False
+
+
+def indexer_dossier(
+    *,
+    data_dir: str = "data",
+    namespace: str = "portfolio",
+    max_chars: int = 1000,
+    complet: bool = False,
+    dry_run: bool = False,
+    index: Index | None = None,
+    taille_lot: int = TAILLE_LOT,
+    octets_lot: int = OCTETS_LOT,
+    nb_workers: int = NB_WORKERS,
+    nb_essais: int = NB_ESSAIS,
+    garder_ids: bool = True,
+    jobs: int = 1,
+    stricte: DecoupeStricte | None = None,
+) -> ResultatIndexation:
+    """Met l'index à jour avec le contenu de `data_dir`, de façon incrémentale.
+
+    Le manifeste local indique ce qui a déjà été indexé: seuls les chunks
+    nouveaux ou modifiés sont envoyés, les chunks disparus sont supprimés.
+    Si quelque chose a changé, la nouvelle version du corpus est publiée
+    (ce qui invalide les caches de recherche).
+
+    Args:
+        data_dir (str): Dossier contenant les fichiers Markdown.
+        namespace (str): Namespace Upstash.
+        max_chars (int): Taille max d'un chunk.
+        complet (bool): Renvoyer tous les chunks, même inchangés.
+        dry_run (bool): Calculer la différence sans toucher à l'index.
+        index (Index | None): Client Upstash (client partagé si None).
+        taille_lot (int): Nombre maximal de chunks par requête.
+        octets_lot (int): Taille maximale estimée d'une requête.
+        nb_workers (int): Nombre d'envois simultanés.
+        nb_essais (int): Nombre maximal de tentatives par lot.
+        garder_ids (bool): Garder la liste des ids envoyés (sinon, seulement
+            leur nombre: mémoire constante sur un très gros corpus).
+        jobs (int): Nombre de processus pour la découpe des fichiers.
+        stricte (DecoupeStricte | None): Plafond en tokens garanti pour
+            chaque chunk, avec chevauchement (remplace `max_chars`).
+
+    Returns:
+        ResultatIndexation: Bilan de l'indexation.
+    """
+    diff = DiffIndex()
+    a_upserter = iterer_diff(
+        data_dir, namespace, diff, max_chars=max_chars, complet=complet, jobs=jobs, stricte=stricte
+    )
+    resultat = ResultatIndexation(diff=diff, dry_run=dry_run)
+    try:
+        if dry_run:
+            for _chunk in a_upserter:
+                pass
+            return resultat
+
+        # Les chunks sont lus, découpés et envoyés par lots au fil de l'eau:
+        # la mémoire ne dépend pas de la taille du corpus.
+        resultat.rapport = upsert_par_lots(
+            index,
+            cast(Iterator[Chunk], a_upserter),
+            namespace=namespace,
+            taille_lot=taille_lot,
+            octets_lot=octets_lot,
+            nb_workers=nb_workers,
+            nb_essais=nb_essais,
+            garder_ids=garder_ids,
+        )
+        resultat.ids = resultat.rapport.ids
+        if diff.a_supprimer:
+            idx = index or get_upstash_index()
+            for debut in range(0, len(diff.a_supprimer), taille_lot):
+                idx.delete(ids=diff.a_supprimer[debut:debut + taille_lot], namespace=namespace)
+        resultat.supprimes = list(diff.a_supprimer)
+
+        # Le manifeste n'est remplacé qu'une fois l'index réellement à jour.
+        valider_manifeste(namespace, diff)
+        if not diff.est_vide():
+            publier_version_corpus(namespace, diff.empreinte)
+        return resultat
+    finally:
+        abandonner_manifeste(diff)
+
+
 def index_data_dir(
     *,
     data_dir: str = "data",
     namespace: str = "portfolio",
     max_chars: int = 1000,
 ) -> List[str]:
-    """Découpe `data_dir` puis indexe dans Upstash (namespace).
+    """Découpe `data_dir` puis indexe dans Upstash (namespace), en n'envoyant
+    que les chunks nouveaux ou modifiés.
 
     Args:
         data_dir (str): Dossier contenant les fichiers Markdown.
@@ -104,11 +389,6 @@ def index_data_dir(
         max_chars (int): Taille max d'un chunk.
 
     Returns:
-        list[str]: IDs des chunks indexés.
+        list[str]: IDs des chunks envoyés.
     """
-    chunks = cast(List[Chunk], chunk_markdown_files(
-        data_dir,
-        max_chars=max_chars,
-    ))
-    index = get_upstash_index()
-    return upsert_chunks(index, chunks, namespace=namespace)
+    return indexer_dossier(data_dir=data_dir, namespace=namespace, max_chars=max_chars).ids
@@ -0,0 +1,304 @@
+"""Routeur d'intentions local, devant la recherche et le modèle.
+
+"bonjour", "merci" ou une question de cuisine passaient par toute la chaîne
+(recherche + `Runner.run_sync`) pour obtenir une réponse convenue. Le routeur
+reconnaît ces messages sans réseau et y répond depuis des modèles de phrases;
+tout le reste (et tout cas douteux) part vers le RAG.
+
+Classement:
+- small talk (salutation, remerciement, "ça va", au revoir): chaque mot du
+  message doit appartenir au vocabulaire du small talk, à une faute de
+  frappe près (similarité de trigrammes de caractères), et le message doit
+  contenir une ancre de l'intention ("bonjour", "merci", "ça va",
+  "revoir"...). Les mots outils ("comment", "quoi", "au", "tu"...) sont
+  neutres: seuls, ils partent vers le RAG. L'intention est celle dont les
+  ancres couvrent le plus de mots;
+- hors-sujet: un mot-clé hors-sujet, sans aucun mot-clé du portfolio ni
+  adresse directe ("tu", "ton"...): "tu cuisines ?" reste pour l'agent.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import threading
+from dataclasses import dataclass, field
+
+from .text import supprimer_accents
+
+
+# Intentions reconnues
+INTENTION_PORTFOLIO = "portfolio"
+INTENTION_SALUTATION = "salutation"
+INTENTION_REMERCIEMENT = "remerciement"
+INTENTION_CA_VA = "ca_va"
+INTENTION_AU_REVOIR = "au_revoir"
+INTENTION_HORS_SUJET = "hors_sujet"
+
+# Similarité minimale (trigrammes) pour accepter un mot mal orthographié
+SEUIL_SIMILARITE = 0.5
+# Similarité minimale à un mot-clé hors-sujet
+SEUIL_HORS_SUJET = 0.6
+
+_REGEX_MOT = re.compile(r"\w+")
+
+# Mots neutres acceptés dans un message de small talk ("bonjour à toi Yvan"):
+# ils ne désignent aucune intention à eux seuls.
+_MOTS_NEUTRES = {
+    "a", "toi", "vous", "yvan", "et", "tres", "bien", "beaucoup", "encore", "aussi",
+    "oui", "non", "ok", "okay", "super", "top", "cool", "genial", "parfait", "le", "la",
+    "les", "tout", "monde", "de", "rien", "bonne", "journee", "soiree", "c", "est",
+    "au", "plus", "ca", "va", "vas", "comment", "tu", "allez", "quoi", "en", "forme",
+    "neuf", "you", "nuit",
+}
+
+# Ancres de chaque intention: un mot, ou plusieurs mots consécutifs ("ca va").
+# Un message de small talk sans aucune ancre part vers le RAG.
+_ANCRES = {
+    INTENTION_SALUTATION: (
+        "bonjour", "salut", "coucou", "hello", "hey", "bonsoir", "hi", "yo", "slt", "wesh",
+    ),
+    INTENTION_REMERCIEMENT: (
+        "merci", "thanks", "thank", "thx", "remercie", "mercii",
+    ),
+    INTENTION_CA_VA: (
+        "ca va", "comment vas", "comment allez", "en forme", "de neuf",
+    ),
+    INTENTION_AU_REVOIR: (
+        "revoir", "bye", "ciao", "bientot", "adieu", "tchao", "a plus", "bonne soiree",
+        "bonne journee", "bonne nuit",
+    ),
+}
+
+_MOTS_CLES_HORS_SUJET = {
+    "recette", "recettes", "cuisine", "cuisiner", "meteo", "pluie", "horoscope",
+    "politique", "election", "bourse", "crypto", "bitcoin", "football", "match",
+    "blague", "film", "netflix", "restaurant", "voyage", "vacances",
+}
+
+_MOTS_CLES_PORTFOLIO = {
+    "projet", "projets", "alternance", "maif", "competence", "competences", "parcours",
+    "etude", "etudes", "but", "iut", "formation", "stage", "experience", "python", "sql",
+    "data", "donnees", "cv", "contact", "linkedin", "github", "musique", "sport",
+    "automobile", "voiture", "passion", "interets", "objectif", "objectifs", "diplome",
+}
+
+_ADRESSE_DIRECTE = {"tu", "ton", "ta", "tes", "toi", "te", "t", "vous", "votre", "vos"}
+
+REPONSES = {
+    INTENTION_SALUTATION: (
+        "Bonjour ! 👋 Je peux vous parler de mes projets, de mon alternance à la MAIF ou de mes compétences.",
+        "Salut ! Posez-moi une question sur mon parcours, mes projets ou mes compétences.",
+    ),
+    INTENTION_REMERCIEMENT: (
+        "Avec plaisir ! 😊 N'hésitez pas si vous voulez en savoir plus sur mes projets ou mon alternance.",
+        "Merci à vous ! Vous pouvez aussi lancer un quiz en tapant 'quiz'.",
+    ),
+    INTENTION_CA_VA: (
+        "Ça va très bien, merci ! Je suis en pleine alternance à la MAIF. Vous voulez que je vous en parle ?",
+        "Très bien, merci ! Je peux vous présenter mes projets ou mes compétences si vous voulez.",
+    ),
+    INTENTION_AU_REVOIR: (
+        "Au revoir et merci de votre visite ! 👋 Mes liens sont disponibles avec la commande 'liens'.",
+    ),
+    INTENTION_HORS_SUJET: (
+        "Je préfère parler de mon parcours 🙂 Je peux vous présenter mes projets, "
+        "mon alternance à la MAIF ou mes compétences en data.",
+    ),
+}
+
+
+def _trigrammes(mot: str) -> frozenset[str]:
+    mot = f" {mot} "
+    return frozenset(mot[i:i + 3] for i in range(len(mot) - 2))
+
+
+@dataclass(frozen=True)
+class Classement:
+    """Résultat du classement d'un message.
+
+    Args:
+        intention (str): Intention retenue.
+        confiance (float): Confiance entre 0 et 1 (1.0 pour le RAG par défaut).
+    """
+
+    intention: str
+    confiance: float
+
+
+@dataclass
+class StatsIntentions:
+    """Compteurs du routeur: nombre de messages par intention.
+
+    Args:
+        par_intention (dict[str, int]): Messages classés dans chaque intention.
+    """
+
+    par_intention: dict[str, int] = field(default_factory=dict)
+
+    def parts(self) -> dict[str, float]:
+        """Retourne la part de chaque intention.
+
+        Returns:
+            dict[str, float]: Fraction des messages (0 à 1) par intention.
+        """
+        total = sum(self.par_intention.values())
+        return {nom: n / total for nom, n in self.par_intention.items()} if total else {}
+
+
+class RouteurIntentions:
+    """Classifieur d'intentions local (mots-clés + trigrammes de caractères).
+
+    Args:
+        seuil_similarite (float): Similarité minimale pour un mot approché.
+    """
+
+    def __init__(self, seuil_similarite: float = SEUIL_SIMILARITE) -> None:
+        self.seuil_similarite = seuil_similarite
+        self._ancres = {
+            nom: [tuple((mot, _trigrammes(mot)) for mot in ancre.split()) for ancre in ancres]
+            for nom, ancres in _ANCRES.items()
+        }
+        # Un message de small talk ne contient que ces mots (à une faute près).
+        mots_ancres = {mot for ancres in _ANCRES.values() for ancre in ancres for mot in ancre.split()}
+        self._small_talk = [(mot, _trigrammes(mot)) for mot in _MOTS_NEUTRES | mots_ancres]
+        self._hors_sujet = [(mot, _trigrammes(mot)) for mot in _MOTS_CLES_HORS_SUJET]
+        self._verrou = threading.Lock()
+        self._stats = StatsIntentions()
+
+    @staticmethod
+    def _similarite(mot: str, vocabulaire: list[tuple[str, frozenset[str]]]) -> float:
+        """Similarité du mot au mot le plus proche d'un vocabulaire.
+
+        Args:
+            mot (str): Mot normalisé.
+            vocabulaire (list): Mots et leurs trigrammes.
+
+        Returns:
+            float: 1.0 si le mot y figure, sinon meilleure similarité de Jaccard.
+        """
+        trigrammes = _trigrammes(mot)
+        meilleure = 0.0
+        for candidat, tri in vocabulaire:
+            if candidat == mot:
+                return 1.0
+            meilleure = max(meilleure, len(trigrammes & tri) / len(trigrammes | tri))
+        return meilleure
+
+    def _mots_ancres(self, mots: list[str], ancres: list[tuple]) -> int:
+        """Compte les mots du message couverts par les ancres d'une intention.
+
+        Args:
+            mots (list[str]): Mots normalisés du message.
+            ancres (list[tuple]): Ancres de l'intention (mots et trigrammes).
+
+        Returns:
+            int: Nombre de mots couverts (0: intention absente).
+        """
+        couverts: set[int] = set()
+        for ancre in ancres:
+            for debut in range(len(mots) - len(ancre) + 1):
+                if all(
+                    self._similarite(mots[debut + i], [mot]) >= self.seuil_similarite
+                    for i, mot in enumerate(ancre)
+                ):
+                    couverts.update(range(debut, debut + len(ancre)))
+        return len(couverts)
+
+    def classer(self, texte: str) -> Classement:
+        """Classe un message.
+
+        Args:
+            texte (str): Message de l'utilisateur.
+
+        Returns:
+            Classement: Intention et confiance.
+        """
+        mots = _REGEX_MOT.findall(supprimer_accents(texte.lower()))
+        if not mots or any(mot in _MOTS_CLES_PORTFOLIO for mot in mots):
+            return Classement(INTENTION_PORTFOLIO, 1.0)
+
+        # Small talk: tous les mots sont du small talk; l'intention est celle
+        # dont les ancres couvrent le plus de mots ("bonjour, ça va ?" -> ça va).
+        similarites = [self._similarite(mot, self._small_talk) for mot in mots]
+        if min(similarites) >= self.seuil_similarite:
+            meilleure, nb_mots = None, 0
+            for nom, ancres in self._ancres.items():
+                n = self._mots_ancres(mots, ancres)
+                if n > nb_mots:
+                    meilleure, nb_mots = nom, n
+            if meilleure is not None:
+                return Classement(meilleure, sum(similarites) / len(similarites))
+
+        # Hors-sujet: mot-clé hors-sujet, sans adresse directe à Yvan.
+        if not any(mot in _ADRESSE_DIRECTE for mot in mots):
+            similarite = max(self._similarite(mot, self._hors_sujet) for mot in mots)
+            if similarite >= SEUIL_HORS_SUJET:
+                return Classement(INTENTION_HORS_SUJET, similarite)
+
+        return Classement(INTENTION_PORTFOLIO, 1.0)
+
+    def repondre(self, texte: str) -> tuple[str, str | None]:
+        """Classe un message et prépare la réponse du chemin rapide.
+
+        Args:
+            texte (str): Message de l'utilisateur.
+
+        Returns:
+            tuple[str, str | None]: (intention, réponse). La réponse vaut None
+            pour une question sur le portfolio (chemin RAG).
+        """
+        intention = self.classer(texte).intention
+        with self._verrou:
+            self._stats.par_intention[intention] = self._stats.par_intention.get(intention, 0) + 1
+        if intention == INTENTION_PORTFOLIO:
+            return intention, None
+        return intention, random.choice(REPONSES[intention])
+
+    def stats(self) -> StatsIntentions:
+        """Retourne une copie des compteurs.
+
+        Returns:
+            StatsIntentions: Messages par intention.
+        """
+        with self._verrou:
+            return StatsIntentions(dict(self._stats.par_intention))
+
+
+# Routeur partagé par tout le processus
+ROUTEUR = RouteurIntentions()
+
+
+def router_message(texte: str) -> tuple[str, str | None]:
+    """Classe un message avec le routeur partagé.
+
+    Args:
+        texte (str): Message de l'utilisateur.
+
+    Returns:
+        tuple[str, str | None]: (intention, réponse du chemin rapide ou None).
+
+    Exemple:
+        >>> router_message("Bonjour !")[0]
+        'salutation'
+        >>> router_message("Bonjour, quels sont tes projets ?")
+        ('portfolio', None)
+        >>> router_message("comment ?")
+        ('portfolio', None)
+    """
+    return ROUTEUR.repondre(texte)
+
+
+def stats_intentions() -> StatsIntentions:
+    """Retourne les compteurs du routeur partagé.
+
+    Returns:
+        StatsIntentions: Messages par intention.
+    """
+    return ROUTEUR.stats()
+
+
+# Alias
+IntentRouter = RouteurIntentions
+route_message = router_message
+intent_stats = stats_intentions
@@ -0,0 +1,227 @@
+"""Index de recherche local (en mémoire), sans appel réseau.
+
+Le corpus du portfolio tient en quelques dizaines de fichiers Markdown: on peut
+donc le chercher directement dans le processus, sans aller-retour vers Upstash.
+L'index reproduit le mode hybride d'Upstash:
+- Sparse: BM25 sur un index inversé
+- Dense: TF-IDF haché (feature hashing) dans une matrice NumPy normalisée
+- Fusion des deux classements par Reciprocal Rank Fusion (RRF)
+
+`IndexLocal.query(...)` accepte les mêmes arguments que `Index.query` et
+retourne des `QueryResult`, donc `search_portfolio` ne voit pas la différence.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import zlib
+from collections import Counter
+from typing import Iterable, List
+
+import numpy as np
+from upstash_vector.types import QueryResult
+
+from .chunking import ChunkCompact, chunk_markdown_files, deduplicate_chunks
+from .state import abonner_publication
+from .text import tokeniser
+
+
+# Paramètres classiques de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Constante de lissage de la fusion RRF (valeur usuelle)
+RRF_K = 60
+
+# Dimension des vecteurs denses hachés
+DIMENSION_DENSE = 4096
+
+
+def _bucket(token: str) -> int:
+    """Associe un token à une colonne de la matrice dense (hash stable).
+
+    Args:
+        token (str): Token normalisé.
+
+    Returns:
+        int: Indice de colonne.
+    """
+    return zlib.crc32(token.encode()) % DIMENSION_DENSE
+
+
+class IndexLocal:
+    """Index hybride BM25 + dense haché, compatible avec `Index.query`.
+
+    Args:
+        chunks (Iterable[ChunkCompact]): Chunks produits par `chunk_markdown_files`
+            (dédupliqués par `deduplicate_chunks`).
+    """
+
+    def __init__(self, chunks: Iterable[ChunkCompact]) -> None:
+        self._ids: list[str] = []
+        self._textes: list[str] = []
+        self._metadonnees: list[dict] = []
+        longueurs: list[int] = []
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+
+        for doc, chunk in enumerate(chunks):
+            self._ids.append(chunk["id"])
+            self._textes.append(chunk["text"])
+            self._metadonnees.append(dict(chunk["metadata"]))
+            compte = Counter(tokeniser(chunk["text"]))
+            longueurs.append(sum(compte.values()))
+            for token, tf in compte.items():
+                self._postings.setdefault(token, []).append((doc, tf))
+
+        nb_docs = len(self._ids)
+        self._longueurs = np.asarray(longueurs, dtype=np.float32)
+        self._longueur_moyenne = float(self._longueurs.mean()) if nb_docs else 0.0
+        self._idf = {
+            token: math.log(1 + (nb_docs - len(p) + 0.5) / (len(p) + 0.5))
+            for token, p in self._postings.items()
+        }
+
+        # Matrice dense: TF (log) x IDF, une ligne par chunk, normalisée L2.
+        self._dense = np.zeros((nb_docs, DIMENSION_DENSE), dtype=np.float32)
+        for token, postings in self._postings.items():
+            colonne = _bucket(token)
+            for doc, tf in postings:
+                self._dense[doc, colonne] += (1 + math.log(tf)) * self._idf[token]
+        normes = np.linalg.norm(self._dense, axis=1, keepdims=True)
+        self._dense /= np.where(normes == 0, 1, normes)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _scores_bm25(self, tokens: list[str]) -> np.ndarray:
+        """Calcule le score BM25 de chaque chunk pour les tokens de la requête.
+
+        Args:
+            tokens (list[str]): Tokens de la requête.
+
+        Returns:
+            np.ndarray: Score par chunk.
+        """
+        scores = np.zeros(len(self._ids), dtype=np.float32)
+        if not self._longueur_moyenne:
+            return scores
+        for token in set(tokens):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = self._idf[token]
+            for doc, tf in postings:
+                norme = 1 - BM25_B + BM25_B * self._longueurs[doc] / self._longueur_moyenne
+                scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norme)
+        return scores
+
+    def _scores_dense(self, tokens: list[str]) -> np.ndarray:
+        """Calcule la similarité cosinus entre la requête et chaque chunk.
+
+        Args:
+            tokens (list[str]): Tokens de la requête.
+
+        Returns:
+            np.ndarray: Similarité par chunk.
+        """
+        vecteur = np.zeros(DIMENSION_DENSE, dtype=np.float32)
+        for token, tf in Counter(tokens).items():
+            # Un token absent du corpus n'apporte rien (idf inconnu).
+            if token in self._idf:
+                vecteur[_bucket(token)] += (1 + math.log(tf)) * self._idf[token]
+        norme = np.linalg.norm(vecteur)
+        if norme == 0:
+            return np.zeros(len(self._ids), dtype=np.float32)
+        return self._dense @ (vecteur / norme)
+
+    def query(
+        self,
+        data: str | None = None,
+        top_k: int = 10,
+        include_metadata: bool = False,
+        include_data: bool = False,
+        **_options,
+    ) -> List[QueryResult]:
+        """Recherche hybride, avec la même signature utile que `Index.query`.
+
+        Les options propres à Upstash (namespace, query_mode, filtres...) sont
+        acceptées et ignorées: l'index local ne contient qu'un corpus.
+
+        Args:
+            data (str | None): Texte de la requête.
+            top_k (int): Nombre maximal de résultats.
+            include_metadata (bool): Inclure les métadonnées.
+            include_data (bool): Inclure le texte du chunk.
+
+        Returns:
+            list[QueryResult]: Résultats triés par score RRF décroissant.
+        """
+        tokens = tokeniser(data or "")
+        if not tokens or not self._ids:
+            return []
+
+        fusion = np.zeros(len(self._ids), dtype=np.float64)
+        for scores in (self._scores_bm25(tokens), self._scores_dense(tokens)):
+            # Seuls les chunks qui matchent participent au classement.
+            candidats = np.flatnonzero(scores > 0)
+            ordre = candidats[np.argsort(-scores[candidats], kind="stable")]
+            fusion[ordre] += 1.0 / (RRF_K + np.arange(1, len(ordre) + 1))
+
+        candidats = np.flatnonzero(fusion > 0)
+        meilleurs = candidats[np.argsort(-fusion[candidats], kind="stable")][:top_k]
+        return [
+            QueryResult(
+                id=self._ids[doc],
+                score=float(fusion[doc]),
+                metadata=dict(self._metadonnees[doc]) if include_metadata else None,
+                data=self._textes[doc] if include_data else None,
+            )
+            for doc in meilleurs
+        ]
+
+
+# Index locaux déjà construits, par (dossier, max_chars)
+_INDEX_LOCAUX: dict[tuple[str, int], IndexLocal] = {}
+_VERROU = threading.Lock()
+
+
+def obtenir_index_local(data_dir: str = "data", max_chars: int = 1000) -> IndexLocal:
+    """Retourne l'index local du dossier, construit au premier appel.
+
+    Les chunks sont dédupliqués par contenu, comme dans l'index Upstash.
+
+    Args:
+        data_dir (str): Dossier contenant les fichiers Markdown.
+        max_chars (int): Taille max d'un chunk.
+
+    Returns:
+        IndexLocal: Index prêt à être interrogé.
+    """
+    cle = (data_dir, max_chars)
+    with _VERROU:
+        index = _INDEX_LOCAUX.get(cle)
+        if index is None:
+            index = IndexLocal(deduplicate_chunks(chunk_markdown_files(data_dir, max_chars=max_chars)))
+            _INDEX_LOCAUX[cle] = index
+        return index
+
+
+def vider_index_locaux() -> None:
+    """Oublie les index locaux (ils seront reconstruits au prochain appel).
+
+    Returns:
+        None
+    """
+    with _VERROU:
+        _INDEX_LOCAUX.clear()
+
+
+# Une réindexation dans ce processus signale que les fichiers ont changé.
+abonner_publication(lambda _namespace, _version: vider_index_locaux())
+
+
+# Alias
+LocalIndex = IndexLocal
+get_local_index = obtenir_index_local
+clear_local_indexes = vider_index_locaux
@@ -0,0 +1,385 @@
+"""Manifeste local de l'indexation incrémentale.
+
+Le manifeste garde, pour chaque fichier indexé, l'empreinte de son contenu et
+celle de chacun de ses chunks. À la relance de l'indexation:
+- un fichier inchangé n'est même pas redécoupé;
+- seuls les chunks nouveaux ou modifiés sont envoyés (et ré-embeddés);
+- les chunks qui n'existent plus sont supprimés de l'index.
+
+Les chunks sont dédupliqués par contenu: un paragraphe répété dans plusieurs
+fichiers n'est stocké (et embeddé) qu'une fois, sous l'identifiant de son
+contenu normalisé (`ChunkCompact.id_contenu`), avec la liste de ses sources.
+Le manifeste garde une ligne par occurrence (contenu, source).
+
+Un manifeste par namespace, dans le dossier d'état (`.portfolio/` par défaut).
+C'est une petite base SQLite: le diff se fait par requêtes indexées, sans
+charger le manifeste en mémoire, quelle que soit la taille du corpus. Le
+nouveau manifeste est écrit à côté de l'ancien et ne le remplace qu'une fois
+l'index réellement à jour.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from .chunking import ChunkCompact, DecoupeStricte, decouper_markdown, empreinte_texte, iterer_fichiers_decoupes
+from .state import dossier_etat
+
+
+# Nombre de sources gardées pour l'affichage du diff (le reste est compté)
+LIMITE_DETAIL = 50
+
+# Format du manifeste (2: une ligne par occurrence, ids de contenu)
+FORMAT_MANIFESTE = "2"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (cle TEXT PRIMARY KEY, valeur TEXT);
+CREATE TABLE IF NOT EXISTS fichiers (source TEXT PRIMARY KEY, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS chunks (
+    id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (id, source)
+);
+CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source);
+"""
+
+# Textes des occurrences redécoupées pendant le diff (table temporaire)
+SCHEMA_TEXTES = """
+CREATE TEMP TABLE textes (
+    id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    heading TEXT NOT NULL,
+    texte TEXT NOT NULL,
+    PRIMARY KEY (id, source)
+);
+"""
+
+# Signature de chaque contenu: ses occurrences (source, empreinte du texte)
+_SIGNATURES = """
+SELECT id, group_concat(source || ' ' || hash, ';') AS signature
+FROM (SELECT id, source, hash FROM {table} ORDER BY id, source)
+GROUP BY id
+"""
+
+
+@dataclass
+class DiffIndex:
+    """Différence entre le dossier de données et le manifeste.
+
+    Args:
+        nb_a_upserter (int): Nombre de chunks nouveaux ou modifiés.
+        a_supprimer (list[str]): Identifiants de chunks disparus.
+        inchanges (int): Nombre de chunks déjà à jour.
+        nb_occurrences (int): Chunks issus de la découpe, avant déduplication.
+        nb_contenus (int): Chunks stockés (contenus distincts).
+        nb_fichiers_modifies (int): Nombre de sources nouvelles ou modifiées.
+        fichiers_modifies (list[str]): Premières sources modifiées (affichage).
+        fichiers_supprimes (list[str]): Sources disparues.
+        empreinte (str): Empreinte du nouveau corpus.
+        nouveau_manifeste (Path | None): Manifeste en attente de validation.
+    """
+
+    nb_a_upserter: int = 0
+    a_supprimer: list[str] = field(default_factory=list)
+    inchanges: int = 0
+    nb_occurrences: int = 0
+    nb_contenus: int = 0
+    nb_fichiers_modifies: int = 0
+    fichiers_modifies: list[str] = field(default_factory=list)
+    fichiers_supprimes: list[str] = field(default_factory=list)
+    empreinte: str = ""
+    nouveau_manifeste: Path | None = None
+
+    def est_vide(self) -> bool:
+        """Indique si l'index est déjà à jour.
+
+        Returns:
+            bool: True si rien n'est à envoyer ni à supprimer.
+        """
+        return not self.nb_a_upserter and not self.a_supprimer
+
+    @property
+    def taux_dedup(self) -> float:
+        """Part des occurrences évitées par la déduplication (0 à 1)."""
+        if not self.nb_occurrences:
+            return 0.0
+        return 1 - self.nb_contenus / self.nb_occurrences
+
+    def resume(self) -> str:
+        """Formate un résumé lisible de la différence.
+
+        Returns:
+            str: Texte multi-lignes (fichiers et chunks concernés).
+        """
+        lignes = [
+            f"{self.nb_a_upserter} chunks to upsert, {len(self.a_supprimer)} to delete, "
+            f"{self.inchanges} unchanged.",
+            f"{self.nb_contenus} distinct chunks from {self.nb_occurrences} chunked "
+            f"(dedup ratio {self.taux_dedup:.1%}).",
+        ]
+        lignes += [f"  ~ {source}" for source in self.fichiers_modifies]
+        if self.nb_fichiers_modifies > len(self.fichiers_modifies):
+            lignes.append(f"  ~ ... and {self.nb_fichiers_modifies - len(self.fichiers_modifies)} more")
+        lignes += [f"  - {source}" for source in self.fichiers_supprimes]
+        return "\n".join(lignes)
+
+
+def chemin_manifeste(namespace: str) -> Path:
+    """Retourne le chemin du manifeste d'un namespace.
+
+    Args:
+        namespace (str): Namespace Upstash.
+
+    Returns:
+        Path: Chemin de la base SQLite.
+    """
+    return dossier_etat() / f"manifest-{namespace}.sqlite"
+
+
+def _ouvrir(chemin: Path) -> sqlite3.Connection:
+    """Ouvre (ou crée) une base de manifeste.
+
+    Args:
+        chemin (Path): Chemin de la base.
+
+    Returns:
+        sqlite3.Connection: Connexion prête à l'emploi.
+    """
+    connexion = sqlite3.connect(chemin)
+    connexion.executescript(SCHEMA)
+    return connexion
+
+
+def iterer_diff(
+    data_dir: str,
+    namespace: str,
+    diff: DiffIndex,
+    *,
+    max_chars: int = 1000,
+    complet: bool = False,
+    jobs: int = 1,
+    stricte: DecoupeStricte | None = None,
+) -> Iterator[ChunkCompact]:
+    """Parcourt le dossier et produit au fil de l'eau les chunks à envoyer.
+
+    Deux passes: les fichiers sont d'abord lus et découpés un par un, leurs
+    occurrences (contenu, source) notées dans le nouveau manifeste; puis
+    chaque contenu nouveau ou modifié (texte changé, source ajoutée ou
+    retirée) est produit une fois, avec toutes ses sources. `diff`
+    (compteurs, chunks à supprimer, nouveau manifeste) n'est complet qu'une
+    fois le générateur épuisé. Le nouveau manifeste doit ensuite être validé
+    (`valider_manifeste`) ou abandonné (`abandonner_manifeste`).
+
+    Args:
+        data_dir (str): Dossier contenant les fichiers Markdown.
+        namespace (str): Namespace Upstash.
+        diff (DiffIndex): Différence à remplir pendant le parcours.
+        max_chars (int): Taille max d'un chunk.
+        complet (bool): Tout renvoyer, même les chunks inchangés (les chunks
+            disparus sont quand même supprimés).
+        jobs (int): Nombre de processus de découpe.
+        stricte (DecoupeStricte | None): Réglages de la découpe stricte.
+
+    Returns:
+        Iterator[ChunkCompact]: Chunks dédupliqués nouveaux ou modifiés.
+    """
+    ancien = chemin_manifeste(namespace)
+    nouveau = ancien.with_name(ancien.name + ".tmp")
+    nouveau.parent.mkdir(parents=True, exist_ok=True)
+    nouveau.unlink(missing_ok=True)
+    diff.nouveau_manifeste = nouveau
+
+    connexion = _ouvrir(nouveau)
+    try:
+        # L'ancien manifeste est attaché (créé vide s'il n'existe pas encore).
+        connexion.execute("ATTACH DATABASE ? AS ancien", (str(ancien),))
+        connexion.executescript(SCHEMA.replace("EXISTS ", "EXISTS ancien."))
+        connexion.executescript(SCHEMA_TEXTES)
+        # Changer la taille des chunks, le mode de découpe ou le format du
+        # manifeste invalide tout le manifeste. La découpe stricte ignore
+        # `max_chars`: seule sa signature compte.
+        reglages = str(max_chars) if stricte is None else stricte.signature()
+        meta = dict(connexion.execute("SELECT cle, valeur FROM ancien.meta"))
+        garder = meta.get("max_chars") == reglages and meta.get("format") == FORMAT_MANIFESTE and not complet
+        connexion.executemany(
+            "INSERT INTO meta VALUES (?, ?)", [("max_chars", reglages), ("format", FORMAT_MANIFESTE)]
+        )
+
+        def empreinte_connue(source: str) -> str | None:
+            ligne = connexion.execute(
+                "SELECT hash FROM ancien.fichiers WHERE source = ?", (source,)
+            ).fetchone()
+            return ligne[0] if ligne else None
+
+        fichiers = iterer_fichiers_decoupes(
+            data_dir,
+            max_chars,
+            jobs=jobs,
+            empreinte_connue=empreinte_connue if garder else None,
+            stricte=stricte,
+        )
+        # Passe 1: occurrences de chaque contenu, fichier par fichier.
+        for fichier in fichiers:
+            source = fichier.source
+            connexion.execute("INSERT INTO fichiers VALUES (?, ?)", (source, fichier.empreinte))
+
+            if fichier.chunks is None:
+                # Fichier inchangé: pas redécoupé, ses occurrences sont recopiées.
+                connexion.execute(
+                    "INSERT OR IGNORE INTO chunks SELECT id, source, hash FROM ancien.chunks WHERE source = ?",
+                    (source,),
+                )
+                continue
+
+            diff.nb_fichiers_modifies += 1
+            if len(diff.fichiers_modifies) < LIMITE_DETAIL:
+                diff.fichiers_modifies.append(source)
+            _noter_occurrences(connexion, fichier.chunks)
+
+        diff.nb_occurrences, diff.nb_contenus = connexion.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT id) FROM chunks"
+        ).fetchone()
+
+        # Passe 2: contenus nouveaux ou dont une occurrence a changé. Le texte
+        # envoyé est celui de la première source par ordre alphabétique, comme
+        # dans `dedupliquer_chunks` (index local).
+        connexion.execute(
+            "CREATE TEMP TABLE a_envoyer AS "
+            "SELECT n.id, (SELECT MIN(source) FROM chunks c WHERE c.id = n.id) AS source "
+            f"FROM ({_SIGNATURES.format(table='chunks')}) n "
+            f"LEFT JOIN ({_SIGNATURES.format(table='ancien.chunks')}) a USING (id) "
+            "WHERE ? OR a.signature IS NULL OR a.signature != n.signature",
+            (not garder,),
+        )
+        # Première source inchangée (donc pas redécoupée): relue pour son texte.
+        a_relire = [r[0] for r in connexion.execute(
+            "SELECT DISTINCT source FROM a_envoyer e WHERE NOT EXISTS "
+            "(SELECT 1 FROM textes t WHERE t.id = e.id AND t.source = e.source) ORDER BY source"
+        )]
+        for source in a_relire:
+            texte = (Path(data_dir) / source).read_text(encoding="utf-8")
+            _noter_occurrences(connexion, decouper_markdown(texte, source, max_chars, stricte), textes_seuls=True)
+
+        diff.inchanges = diff.nb_contenus - connexion.execute("SELECT COUNT(*) FROM a_envoyer").fetchone()[0]
+        lignes = connexion.execute(
+            "SELECT e.id, e.source, t.heading, t.texte, "
+            "(SELECT group_concat(source, char(10)) FROM "
+            "(SELECT source FROM chunks c WHERE c.id = e.id ORDER BY source)) "
+            "FROM a_envoyer e JOIN textes t ON t.id = e.id AND t.source = e.source ORDER BY e.id"
+        )
+        for cid, source, titre, texte, sources in lignes:
+            diff.nb_a_upserter += 1
+            yield ChunkCompact(cid, texte, source, titre, tuple(sources.split("\n")))
+
+        diff.fichiers_supprimes = [r[0] for r in connexion.execute(
+            "SELECT source FROM ancien.fichiers WHERE source NOT IN (SELECT source FROM fichiers) "
+            "ORDER BY source"
+        )]
+        diff.a_supprimer = [r[0] for r in connexion.execute(
+            "SELECT DISTINCT id FROM ancien.chunks WHERE id NOT IN (SELECT id FROM chunks) ORDER BY id"
+        )]
+
+        # Empreinte stable du corpus, calculée en flux dans l'ordre des ids.
+        empreinte = hashlib.sha1()
+        for cid, source, hash_chunk in connexion.execute("SELECT id, source, hash FROM chunks ORDER BY id, source"):
+            empreinte.update(f"{cid}:{source}:{hash_chunk};".encode())
+        diff.empreinte = empreinte.hexdigest()[:20]
+        connexion.commit()
+    finally:
+        connexion.close()
+
+
+def _noter_occurrences(
+    connexion: sqlite3.Connection,
+    chunks: list[ChunkCompact],
+    *,
+    textes_seuls: bool = False,
+) -> None:
+    """Note les occurrences d'un fichier redécoupé et garde leur texte.
+
+    Args:
+        connexion (sqlite3.Connection): Nouveau manifeste (table `textes` créée).
+        chunks (list[ChunkCompact]): Chunks d'un fichier.
+        textes_seuls (bool): Ne garder que les textes (occurrences déjà notées).
+
+    Returns:
+        None
+    """
+    cles = [chunk.id_contenu for chunk in chunks]
+    if not textes_seuls:
+        connexion.executemany(
+            "INSERT OR IGNORE INTO chunks VALUES (?, ?, ?)",
+            [(cle, chunk.source, empreinte_texte(chunk.text)) for cle, chunk in zip(cles, chunks)],
+        )
+    connexion.executemany(
+        "INSERT OR IGNORE INTO textes VALUES (?, ?, ?, ?)",
+        [(cle, chunk.source, chunk.heading, chunk.text) for cle, chunk in zip(cles, chunks)],
+    )
+
+
+def valider_manifeste(namespace: str, diff: DiffIndex) -> None:
+    """Remplace le manifeste par celui calculé pendant le diff.
+
+    Args:
+        namespace (str): Namespace Upstash.
+        diff (DiffIndex): Diff entièrement parcouru.
+
+    Returns:
+        None
+    """
+    if diff.nouveau_manifeste is not None:
+        os.replace(diff.nouveau_manifeste, chemin_manifeste(namespace))
+        diff.nouveau_manifeste = None
+
+
+def abandonner_manifeste(diff: DiffIndex) -> None:
+    """Supprime le manifeste calculé sans le valider (dry-run, erreur).
+
+    Args:
+        diff (DiffIndex): Diff dont on abandonne le manifeste.
+
+    Returns:
+        None
+    """
+    if diff.nouveau_manifeste is not None:
+        diff.nouveau_manifeste.unlink(missing_ok=True)
+        diff.nouveau_manifeste = None
+
+
+def calculer_diff(
+    data_dir: str,
+    namespace: str,
+    *,
+    max_chars: int = 1000,
+    complet: bool = False,
+    jobs: int = 1,
+    stricte: DecoupeStricte | None = None,
+) -> DiffIndex:
+    """Compare le dossier de données au manifeste, sans rien envoyer.
+
+    Args:
+        data_dir (str): Dossier contenant les fichiers Markdown.
+        namespace (str): Namespace Upstash.
+        max_chars (int): Taille max d'un chunk.
+        complet (bool): Compter tous les chunks comme à renvoyer.
+        jobs (int): Nombre de processus de découpe.
+        stricte (DecoupeStricte | None): Réglages de la découpe stricte.
+
+    Returns:
+        DiffIndex: Différence complète (compteurs, sources, chunks à supprimer).
+    """
+    diff = DiffIndex()
+    try:
+        for _chunk in iterer_diff(
+            data_dir, namespace, diff, max_chars=max_chars, complet=complet, jobs=jobs, stricte=stricte
+        ):
+            pass
+    finally:
+        abandonner_manifeste(diff)
+    return diff
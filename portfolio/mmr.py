@@ -0,0 +1,100 @@
+"""Diversification des extraits par pertinence marginale maximale (MMR).
+
+Les résultats d'une recherche contiennent souvent plusieurs extraits presque
+identiques (un fichier de synthèse et le fichier de détail du même projet,
+deux morceaux de la même section). Ils coûtent des tokens sans rien apporter.
+
+MMR choisit les extraits un par un: à chaque étape, celui qui maximise
+`λ · pertinence − (1 − λ) · similarité au plus proche déjà choisi`, avec en
+plus un plafond d'extraits par fichier source. La similarité est calculée
+localement sur les mots des extraits (aucun vecteur à rapatrier).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+from .text import tokeniser
+
+
+# Poids de la pertinence face à la diversité (1.0 = classement d'origine)
+LAMBDA_MMR = 0.7
+# Nombre maximal d'extraits venant du même fichier
+MAX_PAR_SOURCE = 2
+# Candidats demandés à l'index pour chaque extrait gardé
+FACTEUR_CANDIDATS = 3
+
+
+def similarite_jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    """Calcule la similarité de Jaccard entre deux ensembles de mots.
+
+    Args:
+        a (frozenset[str]): Premier ensemble.
+        b (frozenset[str]): Second ensemble.
+
+    Returns:
+        float: |a ∩ b| / |a ∪ b| (0.0 si les deux sont vides).
+    """
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def selectionner_mmr(
+    chunks: Sequence[Any],
+    k: int,
+    *,
+    lambda_mmr: float = LAMBDA_MMR,
+    max_par_source: int = MAX_PAR_SOURCE,
+) -> list[Any]:
+    """Choisit `k` extraits pertinents et peu redondants.
+
+    Args:
+        chunks (Sequence[Any]): Candidats (`RetrievedChunk` ou objet avec
+            `score`, `text` et `metadata`), dans n'importe quel ordre.
+        k (int): Nombre d'extraits à garder.
+        lambda_mmr (float): Poids de la pertinence (entre 0 et 1).
+        max_par_source (int): Plafond par `metadata["source"]` (0 = aucun).
+
+    Returns:
+        list[Any]: Extraits choisis, dans l'ordre de sélection.
+    """
+    if k <= 0 or not chunks:
+        return []
+
+    scores = [c.score for c in chunks]
+    bas, haut = min(scores), max(scores)
+    etendue = (haut - bas) or 1.0
+    # Pertinence ramenée entre 0 et 1 pour être comparable à la similarité.
+    pertinences = [(s - bas) / etendue for s in scores]
+    mots = [frozenset(tokeniser(c.text or "")) for c in chunks]
+
+    restants = list(range(len(chunks)))
+    choisis: list[int] = []
+    par_source: dict[str, int] = {}
+    proximite = [0.0] * len(chunks)  # similarité au plus proche extrait choisi
+
+    while restants and len(choisis) < k:
+        meilleur, meilleure_valeur = None, float("-inf")
+        for i in restants:
+            source = (chunks[i].metadata or {}).get("source", "")
+            if max_par_source and par_source.get(source, 0) >= max_par_source:
+                continue
+            valeur = lambda_mmr * pertinences[i] - (1 - lambda_mmr) * proximite[i]
+            if valeur > meilleure_valeur:
+                meilleur, meilleure_valeur = i, valeur
+        if meilleur is None:
+            break
+
+        choisis.append(meilleur)
+        restants.remove(meilleur)
+        source = (chunks[meilleur].metadata or {}).get("source", "")
+        par_source[source] = par_source.get(source, 0) + 1
+        for i in restants:
+            proximite[i] = max(proximite[i], similarite_jaccard(mots[i], mots[meilleur]))
+
+    return [chunks[i] for i in choisis]
+
+
+# Alias
+select_mmr = selectionner_mmr
@@ -0,0 +1,318 @@
+"""Préchargement spéculatif des recherches pendant que le visiteur lit.
+
+À l'ouverture d'une conversation, la première question est très souvent une
+des suggestions; après une réponse, une des questions fréquentes proches de
+cette réponse. Ces recherches sont lancées en arrière-plan sur un petit pool
+de threads: leurs résultats vont dans le cache partagé (`CACHE_RECHERCHE`),
+où `injecter_contexte_rag` les trouve au tour suivant.
+
+Chaque session a ses préchargements. Une nouvelle vague remplace la
+précédente, et tout est annulé quand la conversation se termine (nouvelle
+conversation, reset, session Streamlit disparue). Les compteurs distinguent
+les préchargements utilisés, ceux qui n'ont rien laissé en cache (expirés)
+et les requêtes gaspillées.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+import weakref
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as DelaiDepasse
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from .rag import lire_delai_recherche, lire_diversification, normaliser_requete, search_portfolio
+from .text import tokeniser
+
+
+# Threads du pool de préchargement (partagé par toutes les sessions)
+NB_THREADS_PRECHARGEMENT = 2
+# Préchargements en attente ou en cours, toutes sessions confondues
+MAX_EN_VOL = 16
+# Attente maximale d'un préchargement encore en cours au moment de la question (s)
+ATTENTE_MAX = 1.5
+# Questions de relance préchargées après une réponse
+NB_RELANCES = 3
+# Mêmes paramètres que `enrichir_question`: même clé dans le cache partagé
+TOP_K_PRECHARGEMENT = 8
+
+
+@dataclass
+class StatsPrechargement:
+    """Compteurs du préchargeur.
+
+    Args:
+        lances (int): Recherches soumises au pool.
+        refuses (int): Recherches non soumises (trop de préchargements en vol).
+        utilises (int): Questions posées servies par leur préchargement.
+        manques (int): Questions posées qui n'avaient pas été préchargées.
+        expires (int): Questions posées préchargées sans rien laisser en cache
+            (délai dépassé, recherche vide ou pas finie à temps).
+        gaspilles (int): Recherches exécutées mais jamais utilisées.
+        annules (int): Recherches annulées avant d'avoir commencé.
+        erreurs (int): Recherches terminées en erreur.
+    """
+
+    lances: int = 0
+    refuses: int = 0
+    utilises: int = 0
+    manques: int = 0
+    expires: int = 0
+    gaspilles: int = 0
+    annules: int = 0
+    erreurs: int = 0
+
+    @property
+    def taux_succes(self) -> float:
+        """Part des questions posées servies par un préchargement (0 à 1)."""
+        demandes = self.utilises + self.manques + self.expires
+        return self.utilises / demandes if demandes else 0.0
+
+    @property
+    def taux_gaspillage(self) -> float:
+        """Part des recherches exécutées qui n'ont servi à rien (0 à 1)."""
+        inutiles = self.gaspilles + self.expires
+        executees = self.utilises + inutiles
+        return inutiles / executees if executees else 0.0
+
+
+def _rechercher(question: str, namespace: str) -> object:
+    # Même délai qu'une recherche du tour: un index lent n'immobilise pas le pool.
+    return search_portfolio(
+        question,
+        top_k=TOP_K_PRECHARGEMENT,
+        namespace=namespace,
+        diversifier=lire_diversification(),
+        delai=lire_delai_recherche(),
+    )
+
+
+class SessionPrechargement:
+    """Jeton d'une session: ses préchargements sont annulés à sa disparition.
+
+    Args:
+        prechargeur (Prechargeur): Préchargeur de la session.
+    """
+
+    def __init__(self, prechargeur: "Prechargeur") -> None:
+        self.id = uuid.uuid4().hex
+        # Le jeton vit dans st.session_state: quand Streamlit oublie la
+        # session, le ramasse-miettes annule ce qui reste en attente.
+        weakref.finalize(self, prechargeur.annuler, self.id)
+
+
+class Prechargeur:
+    """Pool de recherches spéculatives, par session, thread-safe.
+
+    Args:
+        rechercher (Callable[[str, str], object]): Recherche (question,
+            namespace) qui remplit le cache partagé et renvoie ses chunks.
+        nb_threads (int): Threads du pool.
+        max_en_vol (int): Recherches en attente ou en cours au maximum.
+    """
+
+    def __init__(
+        self,
+        rechercher: Callable[[str, str], object] = _rechercher,
+        nb_threads: int = NB_THREADS_PRECHARGEMENT,
+        max_en_vol: int = MAX_EN_VOL,
+    ) -> None:
+        self._rechercher = rechercher
+        self.nb_threads = nb_threads
+        self.max_en_vol = max_en_vol
+        self._executeur: ThreadPoolExecutor | None = None
+        self._sessions: dict[str, dict[str, Future]] = {}
+        # Une place par recherche en attente ou en cours, rendue à sa fin.
+        self._places = threading.BoundedSemaphore(max_en_vol)
+        # Réentrant: le finaliseur d'un jeton (`annuler`) peut être appelé par
+        # le ramasse-miettes pendant que ce thread tient déjà le verrou.
+        self._verrou = threading.RLock()
+        self._stats = StatsPrechargement()
+
+    def ouvrir_session(self) -> SessionPrechargement:
+        """Crée le jeton d'une nouvelle session.
+
+        Returns:
+            SessionPrechargement: Jeton à garder dans l'état de la session.
+        """
+        return SessionPrechargement(self)
+
+    def _terminer(self, _future: Future) -> None:
+        self._places.release()
+
+    def _oublier(self, future: Future) -> None:
+        # Appelé verrou tenu: une recherche remplacée ou annulée.
+        if future.cancel():
+            self._stats.annules += 1
+        else:
+            self._stats.gaspilles += 1
+
+    def precharger(self, session: str, questions: Iterable[str], *, namespace: str = "portfolio") -> int:
+        """Lance en arrière-plan les recherches d'une nouvelle vague.
+
+        Les préchargements précédents de la session qui ne font pas partie
+        de la vague sont abandonnés.
+
+        Args:
+            session (str): Identifiant de la session.
+            questions (Iterable[str]): Questions probables, par priorité.
+            namespace (str): Namespace Upstash.
+
+        Returns:
+            int: Nombre de recherches lancées.
+        """
+        cles = {normaliser_requete(q): q for q in questions if q.strip()}
+        lances = 0
+        with self._verrou:
+            anciens = self._sessions.pop(session, {})
+            vague = {cle: anciens.pop(cle) for cle in list(anciens) if cle in cles}
+            for future in anciens.values():
+                self._oublier(future)
+            for cle, question in cles.items():
+                if cle in vague:
+                    continue
+                if not self._places.acquire(blocking=False):
+                    self._stats.refuses += 1
+                    continue
+                if self._executeur is None:
+                    self._executeur = ThreadPoolExecutor(
+                        max_workers=self.nb_threads, thread_name_prefix="prechargement"
+                    )
+                future = self._executeur.submit(self._rechercher, question, namespace)
+                future.add_done_callback(self._terminer)
+                vague[cle] = future
+                self._stats.lances += 1
+                lances += 1
+            if vague:
+                self._sessions[session] = vague
+        return lances
+
+    def consommer(self, session: str, question: str, *, attente: float = ATTENTE_MAX) -> bool:
+        """Indique si la question posée a été préchargée (et attend sa fin).
+
+        Une recherche préchargée encore en cours est attendue au plus
+        `attente` secondes: mieux vaut finir celle-ci qu'en lancer une seconde.
+        Une recherche qui n'a rien renvoyé (délai dépassé: rien en cache) ne
+        compte pas comme servie.
+
+        Args:
+            session (str): Identifiant de la session.
+            question (str): Question posée.
+            attente (float): Attente maximale d'une recherche en cours (s).
+
+        Returns:
+            bool: True si le résultat est dans le cache partagé.
+        """
+        with self._verrou:
+            future = self._sessions.get(session, {}).pop(normaliser_requete(question), None)
+            if future is None:
+                self._stats.manques += 1
+                return False
+        try:
+            chunks = future.result(timeout=attente)
+        except (DelaiDepasse, CancelledError):
+            chunks = None
+        except Exception:
+            with self._verrou:
+                self._stats.erreurs += 1
+            return False
+        with self._verrou:
+            if not chunks:
+                self._stats.expires += 1
+                return False
+            self._stats.utilises += 1
+        return True
+
+    def annuler(self, session: str) -> None:
+        """Abandonne les préchargements d'une session qui se termine.
+
+        Args:
+            session (str): Identifiant de la session.
+
+        Returns:
+            None
+        """
+        with self._verrou:
+            for future in self._sessions.pop(session, {}).values():
+                self._oublier(future)
+
+    def stats(self) -> StatsPrechargement:
+        """Retourne une copie des compteurs.
+
+        Returns:
+            StatsPrechargement: Compteurs courants.
+        """
+        with self._verrou:
+            return StatsPrechargement(**vars(self._stats))
+
+    def arreter(self) -> None:
+        """Annule tout et arrête le pool (il sera recréé au besoin).
+
+        Returns:
+            None
+        """
+        with self._verrou:
+            for session in list(self._sessions):
+                for future in self._sessions.pop(session).values():
+                    self._oublier(future)
+            executeur, self._executeur = self._executeur, None
+        if executeur is not None:
+            executeur.shutdown(wait=False, cancel_futures=True)
+
+
+def questions_de_relance(
+    reponse: str,
+    candidates: Iterable[str],
+    deja_posees: Iterable[str] = (),
+    nb: int = NB_RELANCES,
+) -> list[str]:
+    """Choisit les questions fréquentes les plus proches d'une réponse.
+
+    Args:
+        reponse (str): Dernière réponse de l'assistant.
+        candidates (Iterable[str]): Questions fréquentes.
+        deja_posees (Iterable[str]): Questions déjà posées (écartées).
+        nb (int): Nombre maximal de questions.
+
+    Returns:
+        list[str]: Questions qui partagent au moins un mot avec la réponse,
+            de la plus proche à la moins proche.
+
+    Exemple:
+        >>> questions_de_relance(
+        ...     "En alternance à la MAIF, je migre des traitements SAS vers Python.",
+        ...     ["Quels sont tes projets ?", "Parle-moi de ton alternance", "Quelles compétences en Python ?"],
+        ... )
+        ['Parle-moi de ton alternance', 'Quelles compétences en Python ?']
+    """
+    mots_reponse = set(tokeniser(reponse))
+    posees = {normaliser_requete(q) for q in deja_posees}
+    scores = [
+        (len(mots_reponse & set(tokeniser(q))), rang, q)
+        for rang, q in enumerate(candidates)
+        if normaliser_requete(q) not in posees
+    ]
+    return [q for score, _, q in sorted(scores, key=lambda s: (-s[0], s[1])) if score > 0][:nb]
+
+
+# Préchargeur partagé par tout le processus (toutes les sessions Streamlit)
+PRECHARGEUR = Prechargeur()
+
+
+def stats_prechargement() -> StatsPrechargement:
+    """Retourne les compteurs du préchargeur partagé.
+
+    Returns:
+        StatsPrechargement: Compteurs courants.
+    """
+    return PRECHARGEUR.stats()
+
+
+# Alias
+Prefetcher = Prechargeur
+PrefetchSession = SessionPrechargement
+PrefetchStats = StatsPrechargement
+follow_up_questions = questions_de_relance
+prefetch_stats = stats_prechargement
@@ -2,20 +2,70 @@
 - Interroger Upstash Vector avec un texte
 - Retourner des extraits pertinents
 - Fournir un contexte neutre à l'agent
+
+`search_portfolio` et `asearch_portfolio` partagent tout (mémoïsation du tour,
+cache, conversion, délai): seul l'appel à l'index diffère.
+
+Avec un délai (`delai`), l'appel à l'index est borné: si la requête tarde
+au-delà d'un percentile des latences mesurées, une seconde requête identique
+part en parallèle et la première réponse l'emporte; au délai, la recherche
+renvoie une liste vide (pas de contexte) au lieu de bloquer le tour. Le
+client Upstash de ces recherches a un timeout HTTP égal au délai: une
+requête abandonnée se termine d'elle-même. Tant que trop de requêtes
+abandonnées occupent le pool, les relances sont suspendues.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import inspect
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Any, Callable, Hashable, Iterable, List
 
 from upstash_vector import Index
 from upstash_vector.types import QueryMode
 
+from .clients import charger_environnement, obtenir_index_async_partage, obtenir_index_partage
 from .indexing import get_upstash_index
+from .mmr import FACTEUR_CANDIDATS, selectionner_mmr
+from .state import abonner_publication, lire_version_corpus
+from .text import estimer_tokens, supprimer_accents
+from .tracing import TRACEUR, tracer
+from .turn import contexte_tour_courant
+
+
+# Backends de recherche disponibles (variable PORTFOLIO_RETRIEVAL_BACKEND)
+BACKEND_UPSTASH = "upstash"
+BACKEND_LOCAL = "local"
+
+# Cache des résultats: les visiteurs posent souvent les mêmes questions
+TAILLE_CACHE_RECHERCHE = 256
+TTL_CACHE_RECHERCHE = 600.0  # secondes
 
+# Budgets de tokens du contexte (0 = pas de limite), réglables par variable d'environnement
+BUDGET_CONTEXTE_INJECTE = 700  # PORTFOLIO_CONTEXT_TOKEN_BUDGET
+BUDGET_CONTEXTE_OUTIL = 500  # PORTFOLIO_TOOL_TOKEN_BUDGET
+SEPARATEUR_EXTRAITS = "\n\n---\n\n"
 
-@dataclass(frozen=True)
+# Recherche bornée (contexte injecté et outil de l'agent)
+DELAI_RECHERCHE = 2.0  # secondes, PORTFOLIO_SEARCH_DEADLINE_MS (0 = pas de délai)
+PERCENTILE_RELANCE = 95.0  # PORTFOLIO_HEDGE_PERCENTILE
+DELAI_RELANCE_DEFAUT = 0.3  # secondes, tant que les mesures sont trop peu nombreuses
+MIN_MESURES_RELANCE = 20
+NB_THREADS_RECHERCHE = 8
+# Requêtes abandonnées (délai dépassé, course perdue) encore en cours au-delà
+# desquelles aucune relance n'est envoyée; le pool a autant de threads en plus.
+MAX_REQUETES_ABANDONNEES = 4
+
+
+@dataclass(frozen=True, slots=True)
 class RetrievedChunk:
     """Résultat de recherche vectorielle.
 
@@ -32,47 +82,875 @@ class RetrievedChunk:
     metadata: dict
 
 
+@dataclass
+class StatsCache:
+    """Compteurs d'un cache de recherche.
+
+    Args:
+        hits (int): Requêtes servies depuis le cache.
+        misses (int): Requêtes absentes (ou expirées) du cache.
+        evictions (int): Entrées retirées car le cache était plein.
+        expirations (int): Entrées retirées car leur TTL était dépassé.
+        invalidations (int): Vidages complets (nouvelle version du corpus).
+        taille (int): Nombre d'entrées actuellement en cache.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    taille: int = 0
+
+
+class CacheRecherche:
+    """Cache LRU borné avec durée de vie (TTL), thread-safe.
+
+    Args:
+        taille_max (int): Nombre maximal d'entrées.
+        ttl (float): Durée de vie d'une entrée, en secondes.
+        horloge (Callable[[], float]): Source de temps (monotone).
+    """
+
+    def __init__(
+        self,
+        taille_max: int = TAILLE_CACHE_RECHERCHE,
+        ttl: float = TTL_CACHE_RECHERCHE,
+        horloge: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self._horloge = horloge
+        self._entrees: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._verrou = threading.Lock()
+        self._stats = StatsCache()
+
+    def lire(self, cle: Hashable) -> Any | None:
+        """Retourne la valeur en cache, ou None si absente / expirée.
+
+        Args:
+            cle (Hashable): Clé de l'entrée.
+
+        Returns:
+            Any | None: Valeur en cache.
+        """
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                self._stats.misses += 1
+                return None
+            expiration, valeur = entree
+            if expiration <= self._horloge():
+                del self._entrees[cle]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self._stats.hits += 1
+            return valeur
+
+    def ecrire(self, cle: Hashable, valeur: Any) -> None:
+        """Ajoute (ou remplace) une entrée, en évinçant la plus ancienne si besoin.
+
+        Args:
+            cle (Hashable): Clé de l'entrée.
+            valeur (Any): Valeur à garder.
+
+        Returns:
+            None
+        """
+        if self.taille_max <= 0:
+            return
+        with self._verrou:
+            self._entrees[cle] = (self._horloge() + self.ttl, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+                self._stats.evictions += 1
+
+    def vider(self) -> None:
+        """Vide le cache (les compteurs sont conservés).
+
+        Returns:
+            None
+        """
+        with self._verrou:
+            self._entrees.clear()
+            self._stats.invalidations += 1
+
+    def stats(self) -> StatsCache:
+        """Retourne une copie des compteurs.
+
+        Returns:
+            StatsCache: Compteurs courants.
+        """
+        with self._verrou:
+            return StatsCache(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                invalidations=self._stats.invalidations,
+                taille=len(self._entrees),
+            )
+
+
+# Cache partagé par tout le processus (toutes les sessions Streamlit)
+CACHE_RECHERCHE = CacheRecherche()
+
+# Une indexation lancée dans ce processus vide le cache immédiatement; depuis
+# un autre processus, la version du corpus fait partie de la clé.
+abonner_publication(lambda _namespace, _version: CACHE_RECHERCHE.vider())
+
+
+@dataclass
+class StatsRechercheBornee:
+    """Compteurs des appels à l'index faits avec un délai.
+
+    Args:
+        appels (int): Appels à l'index avec un délai.
+        relances (int): Secondes requêtes envoyées (la première tardait ou
+            avait échoué).
+        gagnees_par_relance (int): Appels dont la seconde requête a répondu
+            la première.
+        delais_depasses (int): Appels abandonnés au délai (sans contexte).
+        relances_evitees (int): Relances non envoyées (trop de requêtes
+            abandonnées encore en cours).
+        abandonnees_en_cours (int): Requêtes abandonnées pas encore terminées.
+    """
+
+    appels: int = 0
+    relances: int = 0
+    gagnees_par_relance: int = 0
+    delais_depasses: int = 0
+    relances_evitees: int = 0
+    abandonnees_en_cours: int = 0
+
+
+_STATS_BORNEES = StatsRechercheBornee()
+_VERROU_BORNEES = threading.Lock()
+_EXECUTEUR_RECHERCHE: ThreadPoolExecutor | None = None
+
+
+def _compter(**increments: int) -> None:
+    with _VERROU_BORNEES:
+        for nom, n in increments.items():
+            setattr(_STATS_BORNEES, nom, getattr(_STATS_BORNEES, nom) + n)
+
+
+def stats_recherches_bornees() -> StatsRechercheBornee:
+    """Retourne les compteurs des recherches avec délai.
+
+    Returns:
+        StatsRechercheBornee: Copie des compteurs du processus.
+    """
+    with _VERROU_BORNEES:
+        return StatsRechercheBornee(**vars(_STATS_BORNEES))
+
+
+def lire_delai_recherche() -> float:
+    """Lit le délai des recherches (PORTFOLIO_SEARCH_DEADLINE_MS).
+
+    Returns:
+        float: Délai en secondes (0 = pas de délai).
+    """
+    try:
+        return max(0.0, float(os.getenv("PORTFOLIO_SEARCH_DEADLINE_MS", ""))) / 1000
+    except ValueError:
+        return DELAI_RECHERCHE
+
+
+def lire_diversification() -> bool:
+    """Lit l'option de diversification MMR des extraits (PORTFOLIO_DIVERSIFY).
+
+    Désactivée par défaut: `benchmarks/bench_mmr.py` ne montre pas une
+    couverture égale aux 8 premiers extraits avec moins d'extraits.
+
+    Returns:
+        bool: True si PORTFOLIO_DIVERSIFY vaut "1".
+    """
+    return os.getenv("PORTFOLIO_DIVERSIFY", "0").strip().lower() in {"1", "true", "oui"}
+
+
+def delai_relance() -> float:
+    """Calcule l'attente avant d'envoyer une seconde requête.
+
+    C'est un percentile (PORTFOLIO_HEDGE_PERCENTILE, 95 par défaut) des
+    latences de l'index mesurées par le traceur (étape "recherche.index"):
+    seule la fraction la plus lente des requêtes est doublée.
+
+    Returns:
+        float: Attente en secondes.
+    """
+    try:
+        percentile = float(os.getenv("PORTFOLIO_HEDGE_PERCENTILE", ""))
+    except ValueError:
+        percentile = PERCENTILE_RELANCE
+    mesure = TRACEUR.percentile("recherche.index", percentile, min_mesures=MIN_MESURES_RELANCE)
+    return DELAI_RELANCE_DEFAUT if mesure is None else mesure / 1000
+
+
+def _executeur_recherche() -> ThreadPoolExecutor:
+    global _EXECUTEUR_RECHERCHE
+    with _VERROU_BORNEES:
+        if _EXECUTEUR_RECHERCHE is None:
+            _EXECUTEUR_RECHERCHE = ThreadPoolExecutor(
+                max_workers=NB_THREADS_RECHERCHE + MAX_REQUETES_ABANDONNEES, thread_name_prefix="recherche"
+            )
+        return _EXECUTEUR_RECHERCHE
+
+
+def normaliser_requete(query: str) -> str:
+    """Normalise une requête pour la comparer à d'autres (casse, accents, espaces).
+
+    Args:
+        query (str): Texte saisi.
+
+    Returns:
+        str: Texte normalisé.
+
+    Exemple:
+        >>> normaliser_requete("  Quels sont tes PROJETS  ? ")
+        'quels sont tes projets?'
+    """
+    texte = " ".join(supprimer_accents(query.lower()).split())
+    # "projets ?" et "projets?" désignent la même question
+    return re.sub(r"\s+([?!.,;:])", r"\1", texte)
+
+
+def stats_cache_recherche() -> StatsCache:
+    """Retourne les compteurs du cache de recherche partagé.
+
+    Returns:
+        StatsCache: Compteurs courants.
+    """
+    return CACHE_RECHERCHE.stats()
+
+
+def lire_backend_recherche() -> str:
+    """Lit le backend de recherche configuré.
+
+    Returns:
+        str: "upstash" (par défaut) ou "local".
+    """
+    charger_environnement()
+    backend = (os.getenv("PORTFOLIO_RETRIEVAL_BACKEND") or BACKEND_UPSTASH).strip().lower()
+    if backend not in {BACKEND_UPSTASH, BACKEND_LOCAL}:
+        raise RuntimeError(f"Unknown PORTFOLIO_RETRIEVAL_BACKEND: {backend!r}")
+    return backend
+
+
+# Index imposé à la place du backend configuré (tests de charge hors ligne)
+_INDEX_IMPOSE: Any | None = None
+
+
+def imposer_index_recherche(index: Any | None) -> None:
+    """Remplace l'index du backend configuré pour tout le processus.
+
+    Les caches de résultats sont vidés pour ne pas servir de résultats de
+    l'index précédent.
+
+    Args:
+        index (Any | None): Objet exposant `query(...)`, ou None pour revenir
+            au backend configuré.
+
+    Returns:
+        None
+    """
+    global _INDEX_IMPOSE
+    _INDEX_IMPOSE = index
+    CACHE_RECHERCHE.vider()
+
+
+def _index_local() -> Any:
+    # Import local: NumPy n'est chargé que si le backend est utilisé.
+    from .local_index import obtenir_index_local
+
+    return obtenir_index_local(os.getenv("PORTFOLIO_DATA_DIR") or "data")
+
+
+def obtenir_index_recherche(delai: float | None = None) -> Any:
+    """Retourne l'index à interroger selon la configuration.
+
+    - "upstash": client Upstash Vector partagé (mode hybride distant)
+    - "local": index BM25 + dense construit en mémoire depuis
+      `PORTFOLIO_DATA_DIR` (par défaut `data`)
+
+    Args:
+        delai (float | None): Délai de la recherche: le client Upstash a un
+            timeout HTTP égal, sans nouvelles tentatives internes.
+
+    Returns:
+        Any: Objet exposant `query(...)` comme `Index`.
+    """
+    if _INDEX_IMPOSE is not None:
+        return _INDEX_IMPOSE
+    if lire_backend_recherche() == BACKEND_LOCAL:
+        return _index_local()
+    if delai:
+        return obtenir_index_partage(delai_http=delai)
+    return get_upstash_index()
+
+
+def obtenir_index_recherche_async(delai: float | None = None) -> Any:
+    """Retourne l'index à interroger depuis une coroutine.
+
+    - "upstash": client `AsyncIndex` partagé de la boucle courante
+    - "local": le même index en mémoire qu'en synchrone (pas d'I/O)
+
+    Args:
+        delai (float | None): Délai de la recherche (timeout HTTP du client).
+
+    Returns:
+        Any: Objet exposant `query(...)` (coroutine ou non).
+    """
+    if _INDEX_IMPOSE is not None:
+        return _INDEX_IMPOSE
+    if lire_backend_recherche() == BACKEND_LOCAL:
+        return _index_local()
+    return obtenir_index_async_partage(delai_http=delai or None)
+
+
+@dataclass
+class _Requete:
+    """Recherche en cours: ce qui est partagé entre les versions sync et async.
+
+    Args:
+        query (str): Texte de recherche.
+        top_k (int): Nombre maximal de résultats.
+        namespace (str): Namespace Upstash.
+        cle (tuple | None): Clé du cache partagé (None: pas de cache).
+        resultat (list[RetrievedChunk] | None): Résultat déjà connu (tour, cache).
+    """
+
+    query: str
+    top_k: int
+    namespace: str
+    cle: tuple | None = None
+    resultat: List[RetrievedChunk] | None = None
+
+    def parametres(self) -> dict[str, Any]:
+        """Arguments de `query(...)` pour l'index.
+
+        Returns:
+            dict[str, Any]: Paramètres de la requête.
+        """
+        # Mode hybride = dense + sparse, pratique pour les noms propres et requêtes courtes.
+        return {
+            "data": self.query,
+            "top_k": self.top_k,
+            "include_metadata": True,
+            "include_data": True,
+            "namespace": self.namespace,
+            "query_mode": QueryMode.HYBRID,
+        }
+
+    def mettre_en_cache(self, results: Iterable) -> List[RetrievedChunk]:
+        """Convertit la réponse de l'index et la met en cache.
+
+        Args:
+            results (Iterable): Résultats bruts de l'index.
+
+        Returns:
+            list[RetrievedChunk]: Liste des chunks pertinents.
+        """
+        chunks = convertir_resultats(results)
+        if self.cle is not None:
+            CACHE_RECHERCHE.ecrire(self.cle, tuple(chunks))
+        return chunks
+
+    def terminer(self, results: Iterable) -> List[RetrievedChunk]:
+        """Convertit la réponse de l'index, la met en cache et l'enregistre dans le tour.
+
+        Args:
+            results (Iterable): Résultats bruts de l'index.
+
+        Returns:
+            list[RetrievedChunk]: Liste des chunks pertinents.
+        """
+        chunks = self.mettre_en_cache(results)
+        tour = contexte_tour_courant()
+        if tour is not None:
+            tour.enregistrer(self.query, self.top_k, self.namespace, chunks)
+        return chunks
+
+
+def _preparer_requete(
+    query: str,
+    top_k: int,
+    namespace: str,
+    index: Any | None,
+    utiliser_cache: bool,
+) -> _Requete:
+    """Cherche un résultat déjà connu (requête vide, tour, cache partagé).
+
+    Args:
+        query (str): Texte de recherche.
+        top_k (int): Nombre maximal de résultats.
+        namespace (str): Namespace Upstash.
+        index (Any | None): Index explicite (désactive le cache partagé).
+        utiliser_cache (bool): Passer par le cache de résultats.
+
+    Returns:
+        _Requete: Requête avec `resultat` rempli s'il n'y a pas d'appel à faire.
+    """
+    requete = _Requete(query, top_k, namespace)
+    if est_requete_vide(query):
+        requete.resultat = []
+        return requete
+
+    tour = contexte_tour_courant()
+    if tour is not None:
+        deja_recuperes = tour.chercher(query, top_k, namespace)
+        if deja_recuperes is not None:
+            requete.resultat = deja_recuperes
+            return requete
+
+    if index is None and utiliser_cache:
+        requete.cle = (
+            lire_backend_recherche(),
+            namespace,
+            lire_version_corpus(namespace),
+            normaliser_requete(query),
+            top_k,
+        )
+        en_cache = CACHE_RECHERCHE.lire(requete.cle)
+        if en_cache is not None:
+            requete.resultat = list(en_cache)
+            if tour is not None:
+                tour.enregistrer(query, top_k, namespace, requete.resultat)
+    return requete
+
+
+def _signaler_recherche_degradee() -> None:
+    # Le tour le sait: sa réponse, faite sans contexte, n'ira pas en cache.
+    tour = contexte_tour_courant()
+    if tour is not None:
+        tour.recherche_degradee = True
+
+
+def _interroger(idx: Any, parametres: dict[str, Any]) -> Any:
+    with tracer("recherche.index"):
+        return idx.query(**parametres)
+
+
+def _fin_abandon(futur: Future, requete: _Requete | None) -> None:
+    with _VERROU_BORNEES:
+        _STATS_BORNEES.abandonnees_en_cours -= 1
+    # Une requête abandonnée au délai qui finit par répondre remplit le cache.
+    if requete is not None and not futur.cancelled() and futur.exception() is None:
+        requete.mettre_en_cache(futur.result())
+
+
+def _abandonner(futur: Future, requete: _Requete | None = None) -> None:
+    """Abandonne une requête: annulée si elle attend encore, suivie sinon.
+
+    Args:
+        futur (Future): Requête soumise au pool.
+        requete (_Requete | None): Requête dont la réponse tardive doit aller
+            en cache (None: une autre requête a déjà répondu).
+
+    Returns:
+        None
+    """
+    if futur.cancel():
+        return
+    with _VERROU_BORNEES:
+        _STATS_BORNEES.abandonnees_en_cours += 1
+    futur.add_done_callback(lambda f: _fin_abandon(f, requete))
+
+
+def _relance_permise() -> bool:
+    # Sinon, les requêtes abandonnées finiraient par occuper tout le pool.
+    with _VERROU_BORNEES:
+        if _STATS_BORNEES.abandonnees_en_cours < MAX_REQUETES_ABANDONNEES:
+            return True
+        _STATS_BORNEES.relances_evitees += 1
+        return False
+
+
+def _interroger_avec_delai(idx: Any, requete: _Requete, delai: float) -> Any | None:
+    """Interroge l'index avec relance et délai (threads).
+
+    Args:
+        idx (Any): Index synchrone.
+        requete (_Requete): Requête à envoyer.
+        delai (float): Délai total, en secondes.
+
+    Returns:
+        Any | None: Résultats bruts de la première requête qui répond, ou
+            None si le délai est dépassé.
+    """
+    executeur = _executeur_recherche()
+    parametres = requete.parametres()
+
+    def envoyer() -> Future:
+        # Chaque requête garde la trace (et le tour) de l'appelant.
+        return executeur.submit(contextvars.copy_context().run, _interroger, idx, parametres)
+
+    _compter(appels=1)
+    debut = time.monotonic()
+    fin = debut + delai
+    relance: float | None = debut + delai_relance()
+    en_cours = {envoyer()}
+    seconde: Future | None = None
+    erreur: BaseException | None = None
+    while True:
+        maintenant = time.monotonic()
+        if maintenant >= fin:
+            break
+        if seconde is None and not en_cours:
+            # La première a échoué: son thread est libre, on réessaie aussitôt.
+            seconde = envoyer()
+            en_cours.add(seconde)
+            _compter(relances=1)
+        elif seconde is None and relance is not None and maintenant >= relance:
+            relance = None
+            if _relance_permise():
+                seconde = envoyer()
+                en_cours.add(seconde)
+                _compter(relances=1)
+        if not en_cours:
+            raise erreur
+        echeance = fin if relance is None or seconde is not None else min(fin, relance)
+        faits, en_cours = wait(en_cours, timeout=echeance - maintenant, return_when=FIRST_COMPLETED)
+        for futur in faits:
+            if futur.exception() is None:
+                for perdant in en_cours:
+                    _abandonner(perdant)
+                if futur is seconde:
+                    _compter(gagnees_par_relance=1)
+                return futur.result()
+            erreur = erreur or futur.exception()
+
+    _compter(delais_depasses=1)
+    for futur in en_cours:
+        _abandonner(futur, requete)
+    return None
+
+
+async def _ainterroger(idx: Any, parametres: dict[str, Any]) -> Any:
+    """Interroge un index depuis une coroutine, sans bloquer la boucle.
+
+    Un index synchrone (client `Index`, index local) est appelé dans le pool
+    de recherche; annulée, la coroutine y abandonne sa requête.
+
+    Args:
+        idx (Any): Index, synchrone ou asynchrone.
+        parametres (dict[str, Any]): Paramètres de `query`.
+
+    Returns:
+        Any: Résultats bruts.
+    """
+    if inspect.iscoroutinefunction(idx.query):
+        with tracer("recherche.index"):
+            return await idx.query(**parametres)
+    futur = _executeur_recherche().submit(contextvars.copy_context().run, _interroger, idx, parametres)
+    try:
+        results = await asyncio.wrap_future(futur)
+    except asyncio.CancelledError:
+        _abandonner(futur)
+        raise
+    # `query` synchrone en apparence mais qui rend une coroutine.
+    return await results if inspect.isawaitable(results) else results
+
+
+async def _ainterroger_avec_delai(idx: Any, requete: _Requete, delai: float) -> Any | None:
+    """Interroge l'index avec relance et délai (tâches asyncio).
+
+    Args:
+        idx (Any): Index, synchrone ou asynchrone.
+        requete (_Requete): Requête à envoyer.
+        delai (float): Délai total, en secondes.
+
+    Returns:
+        Any | None: Résultats bruts de la première requête qui répond, ou
+            None si le délai est dépassé.
+    """
+    parametres = requete.parametres()
+
+    def envoyer() -> asyncio.Task:
+        return asyncio.ensure_future(_ainterroger(idx, parametres))
+
+    _compter(appels=1)
+    boucle = asyncio.get_running_loop()
+    debut = boucle.time()
+    fin = debut + delai
+    relance: float | None = debut + delai_relance()
+    en_cours = {envoyer()}
+    seconde: asyncio.Task | None = None
+    erreur: BaseException | None = None
+    while True:
+        maintenant = boucle.time()
+        if maintenant >= fin:
+            break
+        if seconde is None and not en_cours:
+            seconde = envoyer()
+            en_cours.add(seconde)
+            _compter(relances=1)
+        elif seconde is None and relance is not None and maintenant >= relance:
+            relance = None
+            if _relance_permise():
+                seconde = envoyer()
+                en_cours.add(seconde)
+                _compter(relances=1)
+        if not en_cours:
+            raise erreur
+        echeance = fin if relance is None or seconde is not None else min(fin, relance)
+        faits, en_cours = await asyncio.wait(
+            en_cours, timeout=echeance - maintenant, return_when=asyncio.FIRST_COMPLETED
+        )
+        for tache in faits:
+            if tache.exception() is None:
+                for perdante in en_cours:
+                    perdante.cancel()
+                if tache is seconde:
+                    _compter(gagnees_par_relance=1)
+                return tache.result()
+            erreur = erreur or tache.exception()
+
+    _compter(delais_depasses=1)
+    # La boucle du tour peut se terminer avant elles: les requêtes sont annulées.
+    for tache in en_cours:
+        tache.cancel()
+    return None
+
+
 def search_portfolio(
     query: str,
     *,
     top_k: int = 5,
     namespace: str = "portfolio",
     index: Index | None = None,
+    utiliser_cache: bool = True,
+    diversifier: bool = False,
+    delai: float | None = None,
 ) -> List[RetrievedChunk]:
     """Recherche des chunks pertinents pour une requête.
 
+    Pendant un tour de conversation (`portfolio.turn`), une requête déjà
+    couverte par une recherche du tour est servie sans nouvel appel. Sans
+    index explicite, les résultats passent aussi par le cache partagé, indexé
+    sur la requête normalisée, `top_k`, le namespace et la version du corpus.
+
+    Avec `diversifier`, `FACTEUR_CANDIDATS × top_k` candidats sont récupérés
+    (mêmes caches) puis `top_k` sont choisis par MMR (`portfolio.mmr`).
+
     Args:
         query (str): Texte de recherche.
         top_k (int): Nombre maximal de résultats.
         namespace (str): Namespace Upstash.
-        index (Index | None): Index Upstash optionnel.
+        index (Index | None): Index optionnel (sinon, backend configuré).
+        utiliser_cache (bool): Passer par le cache de résultats.
+        diversifier (bool): Écarter les extraits redondants (MMR).
+        delai (float | None): Délai de l'appel à l'index, en secondes (None
+            ou 0: pas de délai). Au-delà, la liste est vide (pas de contexte).
 
     Returns:
         list[RetrievedChunk]: Liste des chunks pertinents.
     """
-    if est_requete_vide(query):
-        return []
+    if diversifier:
+        candidats = search_portfolio(
+            query,
+            top_k=top_k * FACTEUR_CANDIDATS,
+            namespace=namespace,
+            index=index,
+            utiliser_cache=utiliser_cache,
+            delai=delai,
+        )
+        return selectionner_mmr(candidats, top_k)
+
+    with tracer("recherche"):
+        requete = _preparer_requete(query, top_k, namespace, index, utiliser_cache)
+        if requete.resultat is not None:
+            return requete.resultat
+        try:
+            idx = index or obtenir_index_recherche(delai)
+            if delai:
+                results = _interroger_avec_delai(idx, requete, delai)
+            else:
+                with tracer("recherche.index"):
+                    results = idx.query(**requete.parametres())
+        except Exception:
+            _signaler_recherche_degradee()
+            raise
+        if results is None:
+            _signaler_recherche_degradee()
+            return []
+        return requete.terminer(results)
+
+
+async def asearch_portfolio(
+    query: str,
+    *,
+    top_k: int = 5,
+    namespace: str = "portfolio",
+    index: Any | None = None,
+    utiliser_cache: bool = True,
+    diversifier: bool = False,
+    delai: float | None = None,
+) -> List[RetrievedChunk]:
+    """Version asynchrone de `search_portfolio` (mêmes caches, même résultat).
+
+    Sans index explicite, la requête Upstash passe par le client `AsyncIndex`
+    partagé de la boucle courante: plusieurs tours peuvent attendre le réseau
+    en même temps sur une seule boucle.
+
+    Args:
+        query (str): Texte de recherche.
+        top_k (int): Nombre maximal de résultats.
+        namespace (str): Namespace Upstash.
+        index (Any | None): Index optionnel, synchrone ou asynchrone.
+        utiliser_cache (bool): Passer par le cache de résultats.
+        diversifier (bool): Écarter les extraits redondants (MMR).
+        delai (float | None): Délai de l'appel à l'index, en secondes (None
+            ou 0: pas de délai). Au-delà, la liste est vide (pas de contexte).
+
+    Returns:
+        list[RetrievedChunk]: Liste des chunks pertinents.
+    """
+    if diversifier:
+        candidats = await asearch_portfolio(
+            query,
+            top_k=top_k * FACTEUR_CANDIDATS,
+            namespace=namespace,
+            index=index,
+            utiliser_cache=utiliser_cache,
+            delai=delai,
+        )
+        return selectionner_mmr(candidats, top_k)
+
+    with tracer("recherche"):
+        requete = _preparer_requete(query, top_k, namespace, index, utiliser_cache)
+        if requete.resultat is not None:
+            return requete.resultat
+        try:
+            idx = index or obtenir_index_recherche_async(delai)
+            if delai:
+                results = await _ainterroger_avec_delai(idx, requete, delai)
+            else:
+                results = await _ainterroger(idx, requete.parametres())
+        except Exception:
+            _signaler_recherche_degradee()
+            raise
+        if results is None:
+            _signaler_recherche_degradee()
+            return []
+        return requete.terminer(results)
+
+
+@dataclass
+class ContexteEmballe:
+    """Contexte prêt pour le prompt, avec sa taille.
+
+    Args:
+        texte (str): Extraits séparés par `SEPARATEUR_EXTRAITS`.
+        tokens (int): Tokens estimés du texte.
+        nb_extraits (int): Nombre d'extraits gardés (même partiellement).
+        tronque (bool): Le dernier extrait a été coupé pour tenir dans le budget.
+    """
+
+    texte: str = ""
+    tokens: int = 0
+    nb_extraits: int = 0
+    tronque: bool = False
+
+
+def lire_budget_tokens(variable: str, defaut: int) -> int:
+    """Lit un budget de tokens dans l'environnement.
+
+    Args:
+        variable (str): Nom de la variable.
+        defaut (int): Valeur si la variable est absente ou invalide.
+
+    Returns:
+        int: Budget (0 = pas de limite).
+    """
+    try:
+        return max(0, int(os.getenv(variable, "")))
+    except ValueError:
+        return defaut
+
+
+def _tronquer_paragraphes(texte: str, budget_tokens: int) -> str:
+    """Garde le début d'un texte qui tient dans le budget, coupé entre paragraphes.
+
+    Si même le premier paragraphe est trop long, la coupe se fait entre lignes.
 
-    idx = index or get_upstash_index()
+    Args:
+        texte (str): Texte à couper.
+        budget_tokens (int): Tokens disponibles.
 
-    # Mode hybride = dense + sparse, pratique pour les noms propres et requêtes courtes.
-    results = idx.query(
-        data=query,
-        top_k=top_k,
-        include_metadata=True,
-        include_data=True,
-        namespace=namespace,
-        query_mode=QueryMode.HYBRID,
-    )
-    return convertir_resultats(results)
+    Returns:
+        str: Début du texte (vide si rien ne tient).
+    """
+    for separateur in ("\n\n", "\n"):
+        gardes: list[str] = []
+        for partie in texte.split(separateur):
+            candidat = separateur.join(gardes + [partie]).strip()
+            if estimer_tokens(candidat) > budget_tokens:
+                break
+            gardes.append(partie)
+        debut = separateur.join(gardes).strip()
+        if debut:
+            return debut
+    return ""
 
 
-def format_context(chunks: List[RetrievedChunk], *, max_items: int = 5) -> str:
+def emballer_contexte(
+    chunks: List[RetrievedChunk],
+    *,
+    max_items: int = 5,
+    budget_tokens: int = 0,
+) -> ContexteEmballe:
+    """Emballe les meilleurs extraits dans un budget de tokens.
+
+    Les extraits sont pris par score décroissant tant qu'ils tiennent; le
+    premier qui dépasse est coupé à une frontière de paragraphe, puis on
+    s'arrête.
+
+    Args:
+        chunks (list[RetrievedChunk]): Extraits candidats.
+        max_items (int): Nombre maximal d'extraits.
+        budget_tokens (int): Budget en tokens (0 = pas de limite).
+
+    Returns:
+        ContexteEmballe: Texte et taille du contexte.
+    """
+    extraits = sorted(
+        (c for c in chunks if (c.text or "").strip()),
+        key=lambda c: c.score,
+        reverse=True,
+    )[:max_items]
+    cout_separateur = estimer_tokens(SEPARATEUR_EXTRAITS)
+
+    gardes: list[str] = []
+    tokens = 0
+    tronque = False
+    for chunk in extraits:
+        texte = chunk.text.strip()
+        cout = estimer_tokens(texte) + (cout_separateur if gardes else 0)
+        if budget_tokens and tokens + cout > budget_tokens:
+            reste = budget_tokens - tokens - (cout_separateur if gardes else 0)
+            debut = _tronquer_paragraphes(texte, reste) if reste > 0 else ""
+            if debut:
+                gardes.append(debut)
+                tokens += estimer_tokens(debut) + (cout_separateur if len(gardes) > 1 else 0)
+                tronque = True
+            break
+        gardes.append(texte)
+        tokens += cout
+
+    return ContexteEmballe(SEPARATEUR_EXTRAITS.join(gardes), tokens, len(gardes), tronque)
+
+
+def format_context(chunks: List[RetrievedChunk], *, max_items: int = 5, budget_tokens: int = 0) -> str:
     """Formate un contexte compact pour l'agent.
 
     Args:
         chunks (list[RetrievedChunk]): Chunks à formatter.
         max_items (int): Limite du nombre d'extraits.
+        budget_tokens (int): Budget en tokens (0 = pas de limite).
 
     Returns:
         str: Contexte prêt à être injecté dans le prompt.
@@ -80,13 +958,76 @@ def format_context(chunks: List[RetrievedChunk], *, max_items: int = 5) -> str:
     if not chunks:
         return ""
 
+    if budget_tokens:
+        return emballer_contexte(chunks, max_items=max_items, budget_tokens=budget_tokens).texte
+
     # On garde le texte brut et on sépare légèrement les extraits.
     extraits = [
         (c.text or "").strip()
         for c in chunks[:max_items]
         if (c.text or "").strip()
     ]
-    return "\n\n---\n\n".join(extraits)
+    return SEPARATEUR_EXTRAITS.join(extraits)
+
+
+def enrichir_question(
+    texte: str,
+    *,
+    namespace: str = "portfolio",
+    top_k: int = 8,
+    budget_tokens: int | None = None,
+    diversifier: bool | None = None,
+    delai: float | None = None,
+) -> str:
+    """Ajoute à la question les extraits trouvés pour elle.
+
+    L'agent peut alors répondre sans appeler son outil de recherche. En cas
+    d'erreur de recherche (ou de délai dépassé), la question est renvoyée
+    telle quelle. Les tokens injectés sont comptés dans le tour en cours.
+
+    Args:
+        texte (str): Question de l'utilisateur.
+        namespace (str): Namespace Upstash.
+        top_k (int): Nombre d'extraits candidats.
+        budget_tokens (int | None): Budget du contexte (par défaut
+            PORTFOLIO_CONTEXT_TOKEN_BUDGET, sinon `BUDGET_CONTEXTE_INJECTE`).
+        diversifier (bool | None): Choisir les extraits par MMR (par défaut
+            PORTFOLIO_DIVERSIFY, désactivé).
+        delai (float | None): Délai de la recherche, en secondes (par défaut
+            PORTFOLIO_SEARCH_DEADLINE_MS, sinon `DELAI_RECHERCHE`).
+
+    Returns:
+        str: Question enrichie, ou `texte` si aucun extrait n'a été trouvé.
+    """
+    if delai is None:
+        delai = lire_delai_recherche()
+    if diversifier is None:
+        diversifier = lire_diversification()
+    try:
+        chunks = search_portfolio(texte, top_k=top_k, namespace=namespace, diversifier=diversifier, delai=delai)
+    except Exception:
+        return texte
+    if budget_tokens is None:
+        budget_tokens = lire_budget_tokens("PORTFOLIO_CONTEXT_TOKEN_BUDGET", BUDGET_CONTEXTE_INJECTE)
+    contexte = emballer_contexte(chunks, max_items=top_k, budget_tokens=budget_tokens)
+    if not contexte.texte:
+        return texte
+    compter_tokens_contexte(contexte)
+    return f"Infos sur moi:\n{contexte.texte}\n\nQuestion:\n{texte}"
+
+
+def compter_tokens_contexte(contexte: ContexteEmballe) -> None:
+    """Ajoute les tokens d'un contexte aux compteurs du tour en cours.
+
+    Args:
+        contexte (ContexteEmballe): Contexte envoyé au modèle.
+
+    Returns:
+        None
+    """
+    tour = contexte_tour_courant()
+    if tour is not None:
+        tour.stats.tokens_contexte += contexte.tokens
 
 
 def est_requete_vide(query: str) -> bool:
@@ -0,0 +1,242 @@
+"""Cache persistant des réponses aux questions fréquentes.
+
+Les suggestions de l'app et quelques questions récurrentes donnent à peu près
+la même réponse pour tous les visiteurs: au premier tour d'une conversation,
+la réponse déjà calculée est servie sans recherche ni appel au modèle.
+
+La clé comprend la question normalisée, le style, l'empreinte du prompt et la
+version publiée du corpus (`portfolio.state`): une réindexation qui change le
+corpus rend les anciennes entrées inaccessibles, puis elles sont purgées.
+
+Le cache se remplit au déploiement (`python -m portfolio.warm_answers`, qui
+peut ajouter d'autres questions) et au fil de l'eau avec les réponses des
+premiers tours aux questions fréquentes. Au premier tour, toute question
+présente dans le cache est servie, fréquente ou non.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .agent import empreinte_instructions
+from .rag import normaliser_requete
+from .state import abonner_publication, dossier_etat, lire_version_corpus
+
+
+# Boutons de suggestion affichés par l'app
+SUGGESTIONS = [
+    "Quels sont tes projets ?",
+    "Parle-moi de ton alternance",
+    "Quelles compétences maîtrises-tu ?",
+    "C'est quoi ton parcours ?",
+]
+
+# Questions dont la réponse est mise en cache (suggestions comprises)
+QUESTIONS_FREQUENTES = SUGGESTIONS + [
+    "Qui es-tu ?",
+    "Présente-toi",
+    "Quelles sont tes études ?",
+    "Quels sont tes centres d'intérêt ?",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reponses (
+    question TEXT NOT NULL,
+    style TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    version TEXT NOT NULL,
+    reponse TEXT NOT NULL,
+    cree_le REAL NOT NULL,
+    PRIMARY KEY (question, style, prompt, namespace, version)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class StatsReponses:
+    """Compteurs du cache de réponses.
+
+    Args:
+        hits (int): Réponses servies depuis le cache.
+        misses (int): Questions absentes du cache.
+        ecritures (int): Réponses ajoutées.
+        purges (int): Entrées supprimées (ancienne version du corpus).
+    """
+
+    hits: int = 0
+    misses: int = 0
+    ecritures: int = 0
+    purges: int = 0
+
+
+class CacheReponses:
+    """Réponses persistées dans une base SQLite, thread-safe.
+
+    Args:
+        chemin (Path | str | None): Fichier de la base (par défaut dans le dossier d'état).
+    """
+
+    def __init__(self, chemin: Path | str | None = None) -> None:
+        self.chemin = Path(chemin) if chemin is not None else dossier_etat() / "reponses.sqlite"
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self._connexion = sqlite3.connect(self.chemin, check_same_thread=False)
+        self._verrou = threading.Lock()
+        self._stats = StatsReponses()
+        with self._verrou, self._connexion:
+            self._connexion.execute("PRAGMA journal_mode=WAL")
+            self._connexion.executescript(SCHEMA)
+
+    @staticmethod
+    def _cle(question: str, style: str, namespace: str) -> tuple[str, str, str, str, str]:
+        return (
+            normaliser_requete(question),
+            style,
+            empreinte_instructions(style),
+            namespace,
+            lire_version_corpus(namespace),
+        )
+
+    def lire(self, question: str, *, style: str = "concis", namespace: str = "portfolio") -> str | None:
+        """Retourne la réponse en cache pour la version courante du corpus.
+
+        Args:
+            question (str): Question posée.
+            style (str): Style de réponse.
+            namespace (str): Namespace Upstash.
+
+        Returns:
+            str | None: Réponse, ou None si absente.
+        """
+        with self._verrou:
+            ligne = self._connexion.execute(
+                "SELECT reponse FROM reponses WHERE question = ? AND style = ? AND prompt = ? "
+                "AND namespace = ? AND version = ?",
+                self._cle(question, style, namespace),
+            ).fetchone()
+            if ligne is None:
+                self._stats.misses += 1
+                return None
+            self._stats.hits += 1
+            return ligne[0]
+
+    def contient(self, question: str, *, style: str = "concis", namespace: str = "portfolio") -> bool:
+        """Indique si une réponse est en cache, sans compter de hit ni de miss.
+
+        Args:
+            question (str): Question posée.
+            style (str): Style de réponse.
+            namespace (str): Namespace Upstash.
+
+        Returns:
+            bool: True si la réponse est en cache pour la version courante.
+        """
+        with self._verrou:
+            return self._connexion.execute(
+                "SELECT 1 FROM reponses WHERE question = ? AND style = ? AND prompt = ? "
+                "AND namespace = ? AND version = ?",
+                self._cle(question, style, namespace),
+            ).fetchone() is not None
+
+    def ecrire(self, question: str, reponse: str, *, style: str = "concis", namespace: str = "portfolio") -> None:
+        """Ajoute (ou remplace) la réponse à une question.
+
+        Args:
+            question (str): Question posée.
+            reponse (str): Réponse de l'agent.
+            style (str): Style de réponse.
+            namespace (str): Namespace Upstash.
+
+        Returns:
+            None
+        """
+        with self._verrou, self._connexion:
+            self._connexion.execute(
+                "INSERT OR REPLACE INTO reponses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*self._cle(question, style, namespace), reponse, time.time()),
+            )
+            self._stats.ecritures += 1
+
+    def purger(self, namespace: str = "portfolio", version: str | None = None) -> int:
+        """Supprime les réponses calculées sur une autre version du corpus.
+
+        Args:
+            namespace (str): Namespace Upstash.
+            version (str | None): Version à garder (par défaut, la version publiée).
+
+        Returns:
+            int: Nombre d'entrées supprimées.
+        """
+        if version is None:
+            version = lire_version_corpus(namespace)
+        with self._verrou, self._connexion:
+            curseur = self._connexion.execute(
+                "DELETE FROM reponses WHERE namespace = ? AND version != ?", (namespace, version)
+            )
+            self._stats.purges += curseur.rowcount
+            return curseur.rowcount
+
+    def stats(self) -> StatsReponses:
+        """Retourne une copie des compteurs.
+
+        Returns:
+            StatsReponses: Compteurs courants.
+        """
+        with self._verrou:
+            return StatsReponses(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                ecritures=self._stats.ecritures,
+                purges=self._stats.purges,
+            )
+
+
+def est_question_frequente(question: str) -> bool:
+    """Indique si une question fait partie des questions mises en cache.
+
+    Args:
+        question (str): Question posée.
+
+    Returns:
+        bool: True si sa forme normalisée est celle d'une question fréquente.
+    """
+    return normaliser_requete(question) in _QUESTIONS_NORMALISEES
+
+
+_QUESTIONS_NORMALISEES = frozenset(normaliser_requete(q) for q in QUESTIONS_FREQUENTES)
+
+_CACHE: CacheReponses | None = None
+_VERROU = threading.Lock()
+
+
+def obtenir_cache_reponses() -> CacheReponses:
+    """Retourne le cache de réponses du processus, ouvert au premier appel.
+
+    Returns:
+        CacheReponses: Cache partagé.
+    """
+    global _CACHE
+    with _VERROU:
+        if _CACHE is None:
+            _CACHE = CacheReponses()
+        return _CACHE
+
+
+def _purger_apres_publication(namespace: str, version: str) -> None:
+    with _VERROU:
+        cache = _CACHE
+    if cache is not None:
+        cache.purger(namespace, version)
+
+
+# Une indexation lancée dans ce processus purge aussitôt les anciennes réponses.
+abonner_publication(_purger_apres_publication)
+
+
+# Alias
+AnswerCache = CacheReponses
+get_answer_cache = obtenir_cache_reponses
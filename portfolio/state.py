@@ -0,0 +1,118 @@
+"""État local partagé entre la CLI d'indexation et l'application.
+
+L'indexation tourne dans un autre processus que Streamlit: pour que les caches
+de l'application sachent que le corpus a changé, `index_data_dir` publie une
+version par namespace dans un petit fichier JSON. La lecture ne coûte qu'un
+`stat` tant que le fichier n'a pas bougé.
+
+Le dossier d'état vaut `.portfolio/` par défaut (variable PORTFOLIO_STATE_DIR).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+
+NOM_FICHIER_VERSIONS = "versions.json"
+
+_verrou = threading.Lock()
+_abonnes: list[Callable[[str, str], None]] = []
+# Dernière lecture du fichier: (mtime_ns, versions)
+_lecture: tuple[int, dict[str, str]] | None = None
+
+
+def dossier_etat() -> Path:
+    """Retourne le dossier où sont stockés les fichiers d'état.
+
+    Returns:
+        Path: Dossier d'état (non créé).
+    """
+    return Path(os.getenv("PORTFOLIO_STATE_DIR") or ".portfolio")
+
+
+def _fichier_versions() -> Path:
+    return dossier_etat() / NOM_FICHIER_VERSIONS
+
+
+def lire_versions() -> dict[str, str]:
+    """Lit les versions publiées de tous les namespaces.
+
+    Returns:
+        dict[str, str]: Version par namespace (vide si rien n'a été publié).
+    """
+    global _lecture
+    fichier = _fichier_versions()
+    try:
+        mtime = fichier.stat().st_mtime_ns
+    except OSError:
+        return {}
+
+    with _verrou:
+        if _lecture is not None and _lecture[0] == mtime:
+            return _lecture[1]
+        try:
+            versions = json.loads(fichier.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        _lecture = (mtime, versions)
+        return versions
+
+
+def lire_version_corpus(namespace: str = "portfolio") -> str:
+    """Retourne la version publiée du corpus d'un namespace.
+
+    Args:
+        namespace (str): Namespace Upstash.
+
+    Returns:
+        str: Version publiée, ou "" si inconnue.
+    """
+    return lire_versions().get(namespace, "")
+
+
+def publier_version_corpus(namespace: str, version: str) -> None:
+    """Enregistre la nouvelle version du corpus et prévient les abonnés.
+
+    Args:
+        namespace (str): Namespace qui vient d'être indexé.
+        version (str): Empreinte du corpus indexé.
+
+    Returns:
+        None
+    """
+    versions = dict(lire_versions())
+    versions[namespace] = version
+
+    fichier = _fichier_versions()
+    fichier.parent.mkdir(parents=True, exist_ok=True)
+    # Écriture atomique: un lecteur ne voit jamais un fichier à moitié écrit.
+    temporaire = fichier.with_suffix(".tmp")
+    temporaire.write_text(json.dumps(versions, indent=2), encoding="utf-8")
+    os.replace(temporaire, fichier)
+
+    with _verrou:
+        abonnes = list(_abonnes)
+    for callback in abonnes:
+        callback(namespace, version)
+
+
+def abonner_publication(callback: Callable[[str, str], None]) -> None:
+    """Enregistre une fonction appelée à chaque publication dans ce processus.
+
+    Args:
+        callback (Callable[[str, str], None]): Reçoit (namespace, version).
+
+    Returns:
+        None
+    """
+    with _verrou:
+        _abonnes.append(callback)
+
+
+# Alias
+get_corpus_version = lire_version_corpus
+publish_corpus_version = publier_version_corpus
@@ -0,0 +1,373 @@
+"""Stockage local des conversations (SQLite).
+
+L'ancien `data/conversations.json` était relu en entier puis réécrit à chaque
+message, et relu encore à chaque rerun Streamlit pour lister les
+conversations: un coût qui grandit avec tout l'historique. Ici:
+- un message ajouté = une ligne insérée (les messages déjà stockés ne sont
+  ni relus ni réécrits);
+- chaque ligne garde une empreinte chaînée de la conversation jusqu'à elle:
+  une conversation réinitialisée est réécrite à partir du premier message
+  qui diffère, sans relire le contenu des messages;
+- la liste des conversations ne lit que la table des conversations, jamais
+  le contenu des messages;
+- une conversation n'est chargée que quand on la reprend.
+
+L'ancien fichier JSON est importé une fois, puis renommé en `.json.migre`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+
+FICHIER_CONVERSATIONS = Path("data") / "conversations.sqlite"
+SUFFIXE_MIGRE = ".migre"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    cree_le TEXT NOT NULL,
+    previous_response_id TEXT,
+    stats TEXT NOT NULL DEFAULT '{}',
+    nb_messages INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS conversations_cree_le ON conversations (cree_le);
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    empreinte TEXT,
+    PRIMARY KEY (conversation_id, position)
+) WITHOUT ROWID;
+"""
+
+
+def nouvel_id_conversation() -> str:
+    """Génère un identifiant de conversation unique.
+
+    La date garde les identifiants lisibles et triables; le suffixe aléatoire
+    évite les collisions entre deux visiteurs qui commencent dans la même
+    seconde.
+
+    Returns:
+        str: Identifiant, par exemple "20260115-142301-3f9a1c2e".
+    """
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+def empreintes_chainees(messages: list[dict], depart: str = "") -> list[str]:
+    """Calcule l'empreinte de chaque préfixe d'une conversation.
+
+    L'empreinte d'une position dépend de tous les messages jusqu'à elle:
+    deux conversations ont la même empreinte en position `i` si et seulement
+    si leurs `i + 1` premiers messages sont identiques.
+
+    Args:
+        messages (list[dict]): Messages à chaîner.
+        depart (str): Empreinte du message qui précède `messages` ("" pour
+            le début de la conversation).
+
+    Returns:
+        list[str]: Une empreinte par message.
+
+    Exemple:
+        >>> a = empreintes_chainees([{"role": "user", "content": "q1"}, {"role": "assistant", "content": "r1"}])
+        >>> b = empreintes_chainees([{"role": "user", "content": "q1"}, {"role": "assistant", "content": "r2"}])
+        >>> a[0] == b[0], a[1] == b[1]
+        (True, False)
+        >>> empreintes_chainees([{"role": "assistant", "content": "r1"}], a[0]) == a[1:]
+        True
+    """
+    empreintes, precedente = [], bytes.fromhex(depart)
+    for message in messages:
+        hachage = hashlib.blake2b(precedente, digest_size=12)
+        hachage.update(f"{message.get('role', '')}\0{message.get('content', '')}".encode("utf-8"))
+        precedente = hachage.digest()
+        empreintes.append(hachage.hexdigest())
+    return empreintes
+
+
+def _stats_vers_json(stats: dict) -> str:
+    stats_serializables = dict(stats)
+    debut = stats_serializables.get("debut")
+    if isinstance(debut, datetime):
+        stats_serializables["debut"] = debut.isoformat()
+    return json.dumps(stats_serializables, ensure_ascii=False)
+
+
+def _stats_depuis_json(texte: str) -> dict:
+    stats = json.loads(texte or "{}")
+    if isinstance(stats.get("debut"), str):
+        try:
+            stats["debut"] = datetime.fromisoformat(stats["debut"])
+        except ValueError:
+            stats["debut"] = datetime.now()
+    return stats
+
+
+def _date_depuis_id(conversation_id: str) -> str:
+    try:
+        return datetime.strptime(conversation_id[:15], "%Y%m%d-%H%M%S").isoformat()
+    except ValueError:
+        return datetime.now().isoformat()
+
+
+class StockageConversations:
+    """Conversations persistées dans une base SQLite, thread-safe.
+
+    Args:
+        chemin (Path | str): Fichier de la base (créé si besoin).
+    """
+
+    def __init__(self, chemin: Path | str = FICHIER_CONVERSATIONS) -> None:
+        self.chemin = Path(chemin)
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        # Une connexion partagée par les sessions Streamlit (un thread chacune).
+        self._connexion = sqlite3.connect(self.chemin, check_same_thread=False)
+        self._verrou = threading.Lock()
+        with self._verrou, self._connexion:
+            # WAL: les lectures d'un autre processus ne bloquent pas les écritures.
+            self._connexion.execute("PRAGMA journal_mode=WAL")
+            self._connexion.executescript(SCHEMA)
+
+    def lister_ids(self) -> list[str]:
+        """Liste les conversations, de la plus ancienne à la plus récente.
+
+        Returns:
+            list[str]: Identifiants (aucun message n'est lu).
+        """
+        with self._verrou:
+            lignes = self._connexion.execute(
+                "SELECT id FROM conversations ORDER BY cree_le, id"
+            ).fetchall()
+        return [ligne[0] for ligne in lignes]
+
+    def charger(self, conversation_id: str) -> dict | None:
+        """Charge une conversation complète.
+
+        Args:
+            conversation_id (str): Identifiant de la conversation.
+
+        Returns:
+            dict | None: {"messages", "previous_response_id", "stats"}, ou None.
+        """
+        with self._verrou:
+            ligne = self._connexion.execute(
+                "SELECT previous_response_id, stats FROM conversations WHERE id = ?",
+                (conversation_id,),
+            ).fetchone()
+            if ligne is None:
+                return None
+            messages = [
+                {"role": role, "content": content}
+                for role, content in self._connexion.execute(
+                    "SELECT role, content FROM messages WHERE conversation_id = ? ORDER BY position",
+                    (conversation_id,),
+                )
+            ]
+        return {
+            "messages": messages,
+            "previous_response_id": ligne[0],
+            "stats": _stats_depuis_json(ligne[1]),
+        }
+
+    def sauvegarder(
+        self,
+        conversation_id: str,
+        messages: list[dict],
+        previous_response_id: str | None,
+        stats: dict,
+    ) -> int:
+        """Enregistre l'état d'une conversation en n'écrivant que les nouveaux messages.
+
+        Quand les messages stockés sont un préfixe de la liste (cas courant),
+        seuls les suivants sont hachés et insérés, en chaînant depuis
+        l'empreinte stockée du dernier. Sinon (conversation réinitialisée ou
+        modifiée), toutes les empreintes sont recalculées et les messages
+        stockés sont remplacés à partir du premier qui diffère.
+
+        Args:
+            conversation_id (str): Identifiant de la conversation.
+            messages (list[dict]): Tous les messages de la conversation.
+            previous_response_id (str | None): Dernière réponse de l'agent.
+            stats (dict): Statistiques de la conversation.
+
+        Returns:
+            int: Nombre de messages écrits.
+        """
+        with self._verrou, self._connexion:
+            ligne = self._connexion.execute(
+                "SELECT nb_messages FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+            deja_stockes = ligne[0] if ligne else 0
+            suite = self._suite_des_empreintes(conversation_id, messages, deja_stockes)
+            if suite is not None:
+                communs = deja_stockes
+            else:
+                empreintes = empreintes_chainees(messages)
+                communs = self._prefixe_commun(conversation_id, empreintes, deja_stockes)
+                suite = empreintes[communs:]
+            if communs < deja_stockes:
+                self._connexion.execute(
+                    "DELETE FROM messages WHERE conversation_id = ? AND position >= ?",
+                    (conversation_id, communs),
+                )
+
+            nouveaux = [
+                (conversation_id, position, m.get("role", ""), m.get("content", ""), empreinte)
+                for position, m, empreinte in zip(range(communs, len(messages)), messages[communs:], suite)
+            ]
+            self._connexion.executemany(
+                "INSERT INTO messages (conversation_id, position, role, content, empreinte) "
+                "VALUES (?, ?, ?, ?, ?)",
+                nouveaux,
+            )
+            self._connexion.execute(
+                "INSERT INTO conversations (id, cree_le, previous_response_id, stats, nb_messages) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET previous_response_id = excluded.previous_response_id, "
+                "stats = excluded.stats, nb_messages = excluded.nb_messages",
+                (
+                    conversation_id,
+                    datetime.now().isoformat(),
+                    previous_response_id,
+                    _stats_vers_json(stats),
+                    len(messages),
+                ),
+            )
+        return len(nouveaux)
+
+    def _suite_des_empreintes(self, conversation_id: str, messages: list[dict], deja_stockes: int) -> list[str] | None:
+        # Appelé verrou tenu. Si les messages stockés semblent être un préfixe
+        # de `messages`, renvoie les empreintes des messages suivants, chaînées
+        # depuis l'empreinte stockée du dernier; sinon None. L'application ne
+        # fait qu'ajouter des messages ou repartir d'une liste neuve: le premier
+        # et le dernier message stockés suffisent à distinguer les deux cas.
+        if deja_stockes == 0:
+            return empreintes_chainees(messages)
+        if deja_stockes > len(messages):
+            return None
+        stockees = dict(
+            self._connexion.execute(
+                "SELECT position, empreinte FROM messages WHERE conversation_id = ? AND position IN (0, ?, ?)",
+                (conversation_id, deja_stockes - 2, deja_stockes - 1),
+            ).fetchall()
+        )
+        derniere = stockees.get(deja_stockes - 1)
+        if derniere is None or stockees.get(0) != empreintes_chainees(messages[:1])[0]:
+            return None
+        if deja_stockes > 1:
+            avant = stockees.get(deja_stockes - 2)
+            if avant is None or empreintes_chainees(messages[deja_stockes - 1 : deja_stockes], avant)[0] != derniere:
+                return None
+        return empreintes_chainees(messages[deja_stockes:], derniere)
+
+    def _prefixe_commun(self, conversation_id: str, empreintes: list[str], deja_stockes: int) -> int:
+        # Appelé verrou tenu. Les empreintes étant chaînées, celle du dernier
+        # message stocké suffit à valider tout le préfixe.
+        limite = min(deja_stockes, len(empreintes))
+        if limite == 0:
+            return 0
+        ligne = self._connexion.execute(
+            "SELECT empreinte FROM messages WHERE conversation_id = ? AND position = ?",
+            (conversation_id, limite - 1),
+        ).fetchone()
+        if ligne is not None and ligne[0] == empreintes[limite - 1]:
+            return limite
+        stockees = self._connexion.execute(
+            "SELECT empreinte FROM messages WHERE conversation_id = ? AND position < ? ORDER BY position",
+            (conversation_id, limite),
+        ).fetchall()
+        for position, (empreinte,) in enumerate(stockees):
+            if empreinte != empreintes[position]:
+                return position
+        return len(stockees)
+
+    def migrer_json(self, fichier_json: Path | str) -> int:
+        """Importe un ancien `conversations.json`, puis le renomme.
+
+        Les conversations déjà présentes dans la base ne sont pas écrasées.
+
+        Args:
+            fichier_json (Path | str): Ancien fichier de conversations.
+
+        Returns:
+            int: Nombre de conversations importées (0 si pas de fichier).
+        """
+        fichier_json = Path(fichier_json)
+        if not fichier_json.exists():
+            return 0
+        try:
+            convs = json.loads(fichier_json.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            convs = {}
+
+        existants = set(self.lister_ids())
+        importees = 0
+        for cid, conv in convs.items():
+            if cid in existants:
+                continue
+            self.sauvegarder(
+                cid, conv.get("messages", []), conv.get("previous_response_id"), conv.get("stats", {})
+            )
+            # Garder l'ordre d'origine (l'id commence par la date de création).
+            with self._verrou, self._connexion:
+                self._connexion.execute(
+                    "UPDATE conversations SET cree_le = ? WHERE id = ?", (_date_depuis_id(cid), cid)
+                )
+            importees += 1
+
+        fichier_json.rename(fichier_json.with_name(fichier_json.name + SUFFIXE_MIGRE))
+        return importees
+
+    def fermer(self) -> None:
+        """Ferme la connexion à la base.
+
+        Returns:
+            None
+        """
+        with self._verrou:
+            self._connexion.close()
+
+
+_STOCKAGES: dict[Path, StockageConversations] = {}
+_VERROU = threading.Lock()
+
+
+def obtenir_stockage(
+    chemin: Path | str = FICHIER_CONVERSATIONS,
+    *,
+    ancien_json: Path | str | None = None,
+) -> StockageConversations:
+    """Retourne le stockage partagé d'un fichier, ouvert au premier appel.
+
+    Args:
+        chemin (Path | str): Fichier de la base.
+        ancien_json (Path | str | None): Ancien fichier JSON à importer à l'ouverture.
+
+    Returns:
+        StockageConversations: Stockage prêt à l'emploi.
+    """
+    cle = Path(chemin).resolve()
+    with _VERROU:
+        stockage = _STOCKAGES.get(cle)
+        if stockage is None:
+            stockage = StockageConversations(chemin)
+            if ancien_json is not None:
+                stockage.migrer_json(ancien_json)
+            _STOCKAGES[cle] = stockage
+        return stockage
+
+
+# Alias
+ConversationStore = StockageConversations
+get_conversation_store = obtenir_stockage
+new_conversation_id = nouvel_id_conversation
+chained_fingerprints = empreintes_chainees
@@ -0,0 +1,136 @@
+"""Réponse de l'agent en flux, consommable depuis du code synchrone.
+
+`Runner.run_sync` attend la réponse complète avant de rendre la main: le
+visiteur fixe un spinner pendant toute la génération. `FluxReponse` lance
+`Runner.run_streamed` et rend les morceaux de texte au fur et à mesure, via un
+simple itérateur (ce qu'attend `st.write_stream`).
+
+La boucle asyncio est avancée pas à pas dans le thread appelant: pas de thread
+supplémentaire, et le contexte de tour (`portfolio.turn`) suit naturellement.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Iterator
+
+from agents import Runner
+from openai.types.responses import ResponseTextDeltaEvent
+
+
+class FluxReponse:
+    """Itérateur sur les morceaux de texte d'un tour de l'agent.
+
+    Une fois l'itération terminée, `texte`, `last_response_id`, `ttft` et
+    `duree` sont renseignés.
+
+    Args:
+        agent (Any): Agent à exécuter.
+        entree (str | list[dict]): Message envoyé à l'agent (ou messages, le
+            dernier étant la question).
+        previous_response_id (str | None): Réponse précédente (suite de conversation).
+        max_turns (int): Nombre maximal d'étapes de l'agent.
+        horloge (Callable[[], float]): Source de temps (monotone).
+
+    Exemple:
+        >>> flux = FluxReponse(agent, "Parle-moi de ton alternance")  # doctest: +SKIP
+        >>> texte = "".join(flux)  # doctest: +SKIP
+        >>> flux.ttft, flux.duree  # doctest: +SKIP
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        entree: str | list[dict],
+        *,
+        previous_response_id: str | None = None,
+        max_turns: int = 6,
+        horloge: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.agent = agent
+        self.entree = entree
+        self.previous_response_id = previous_response_id
+        self.max_turns = max_turns
+        self._horloge = horloge
+        self.texte = ""
+        self.last_response_id: str | None = None
+        self.ttft: float | None = None  # secondes avant le premier morceau
+        self.duree: float | None = None  # secondes pour le tour complet
+
+    def __iter__(self) -> Iterator[str]:
+        debut = self._horloge()
+        boucle = asyncio.new_event_loop()
+        resultat = None
+        morceaux: list[str] = []
+        try:
+            resultat = boucle.run_until_complete(self._demarrer())
+            evenements = resultat.stream_events()
+            while True:
+                try:
+                    evenement = boucle.run_until_complete(evenements.__anext__())
+                except StopAsyncIteration:
+                    break
+                delta = _texte_evenement(evenement)
+                if not delta:
+                    continue
+                if self.ttft is None:
+                    self.ttft = self._horloge() - debut
+                morceaux.append(delta)
+                yield delta
+
+            # Le texte final fait foi (il peut différer des deltas concaténés).
+            self.texte = str(resultat.final_output or "".join(morceaux))
+            self.last_response_id = resultat.last_response_id
+        finally:
+            if resultat is not None and not resultat.is_complete:
+                # Itération abandonnée (rerun Streamlit, erreur): on arrête l'agent.
+                resultat.cancel()
+                boucle.run_until_complete(_attendre_fin(resultat))
+            boucle.run_until_complete(boucle.shutdown_asyncgens())
+            boucle.close()
+            self.duree = self._horloge() - debut
+
+    async def _demarrer(self) -> Any:
+        # `run_streamed` crée sa tâche de fond: il faut une boucle en cours.
+        return Runner.run_streamed(
+            self.agent,
+            self.entree,
+            previous_response_id=self.previous_response_id,
+            max_turns=self.max_turns,
+        )
+
+
+def _texte_evenement(evenement: Any) -> str:
+    """Extrait le texte d'un événement de flux (vide s'il n'en porte pas).
+
+    Args:
+        evenement (Any): Événement de `stream_events()`.
+
+    Returns:
+        str: Morceau de texte généré.
+    """
+    if evenement.type == "raw_response_event" and isinstance(evenement.data, ResponseTextDeltaEvent):
+        return evenement.data.delta or ""
+    return ""
+
+
+async def _attendre_fin(resultat: Any) -> None:
+    """Vide le flux d'un résultat annulé pour laisser ses tâches se terminer.
+
+    Args:
+        resultat (Any): `RunResultStreaming` annulé.
+
+    Returns:
+        None
+    """
+    try:
+        async for _evenement in resultat.stream_events():
+            pass
+    except Exception:
+        # L'annulation peut remonter sous forme d'erreur: rien à faire de plus.
+        pass
+
+
+# Alias
+StreamedAnswer = FluxReponse
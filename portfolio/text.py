@@ -0,0 +1,73 @@
+"""Normalisation de texte partagée (accents, tokens, mots vides).
+
+Utilisé par l'index local, la mémoïsation des recherches et les caches pour
+comparer des requêtes formulées un peu différemment.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+
+MOTS_VIDES = {
+    "a", "au", "aux", "avec", "ce", "ces", "c", "d", "dans", "de", "des", "du",
+    "en", "est", "et", "il", "j", "je", "l", "la", "le", "les", "leur", "m",
+    "ma", "mais", "me", "mes", "mon", "n", "ne", "ou", "par", "pas", "pour",
+    "qu", "que", "qui", "s", "sa", "se", "ses", "son", "sur", "t", "ta", "te",
+    "tes", "ton", "tu", "un", "une", "vos", "votre", "vous", "y",
+}
+
+_REGEX_MOT = re.compile(r"\w+")
+_REGEX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Longueur moyenne d'un morceau de mot pour les tokenizers BPE des modèles GPT
+CARACTERES_PAR_TOKEN = 4
+
+
+def supprimer_accents(texte: str) -> str:
+    """Retire les accents d'un texte ("é" -> "e").
+
+    Args:
+        texte (str): Texte d'origine.
+
+    Returns:
+        str: Texte sans diacritiques.
+    """
+    decompose = unicodedata.normalize("NFKD", texte)
+    return "".join(c for c in decompose if not unicodedata.combining(c))
+
+
+def tokeniser(texte: str) -> list[str]:
+    """Découpe un texte en tokens normalisés (minuscules, sans accents).
+
+    Args:
+        texte (str): Texte à découper.
+
+    Returns:
+        list[str]: Tokens, sans les mots vides.
+    """
+    return [m for m in _REGEX_MOT.findall(supprimer_accents(texte.lower())) if m not in MOTS_VIDES]
+
+
+def estimer_tokens(texte: str) -> int:
+    """Estime le nombre de tokens d'un texte, sans tokenizer.
+
+    Chaque signe de ponctuation compte pour un token, chaque mot pour un token
+    par tranche de `CARACTERES_PAR_TOKEN` caractères. L'estimation est un peu
+    pessimiste sur du français courant, ce qui est le bon côté pour un budget.
+
+    Args:
+        texte (str): Texte à mesurer.
+
+    Returns:
+        int: Nombre de tokens estimé.
+
+    Exemple:
+        >>> estimer_tokens("Bonjour, je suis Yvan.")
+        7
+    """
+    return sum(
+        -(-len(morceau) // CARACTERES_PAR_TOKEN) if morceau[0].isalnum() or morceau[0] == "_" else 1
+        for morceau in _REGEX_TOKEN.findall(texte)
+    )
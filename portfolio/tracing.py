@@ -0,0 +1,283 @@
+"""Mesure de la durée des étapes d'un tour de conversation.
+
+Un tour lent peut venir de la recherche, du modèle, des appels d'outil ou de
+la sauvegarde. Chaque étape est entourée d'un span (`tracer("recherche")`):
+sa durée alimente un histogramme glissant par étape (p50 / p95 / p99 sur les
+`TAILLE_FENETRE` dernières mesures), affiché par la commande `stats`.
+
+Avec `PORTFOLIO_TRACE_FILE`, chaque span est aussi ajouté en JSONL à ce
+fichier pour une analyse hors ligne. L'écriture se fait dans un thread à
+part, par lots: un span ne fait qu'ajouter sa ligne à une file, sans attendre
+le disque ni bloquer les autres threads. Les spans d'un même tour partagent un
+identifiant de trace, porté par une `ContextVar` comme le contexte de tour
+(`portfolio.turn`): il suit les outils de l'agent dans la boucle asyncio.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+
+# Mesures gardées par étape pour les percentiles
+TAILLE_FENETRE = 1024
+# Attente maximale de l'écriture des lignes restantes à l'arrêt du processus (s)
+ATTENTE_EXPORT_SORTIE = 2.0
+
+
+@dataclass(frozen=True)
+class StatsEtape:
+    """Percentiles d'une étape sur la fenêtre glissante.
+
+    Args:
+        nb (int): Nombre total de mesures (fenêtre comprise ou non).
+        p50 (float): Médiane, en millisecondes.
+        p95 (float): 95e percentile, en millisecondes.
+        p99 (float): 99e percentile, en millisecondes.
+    """
+
+    nb: int
+    p50: float
+    p95: float
+    p99: float
+
+
+def _percentile(triees: list[float], p: float) -> float:
+    rang = (len(triees) - 1) * p / 100
+    bas = int(rang)
+    haut = min(bas + 1, len(triees) - 1)
+    return triees[bas] + (triees[haut] - triees[bas]) * (rang - bas)
+
+
+@dataclass(frozen=True)
+class _Span:
+    trace: str
+    etape: str
+
+
+# Span en cours (None hors de tout span)
+_SPAN_COURANT: ContextVar[_Span | None] = ContextVar("portfolio_span", default=None)
+
+
+class Traceur:
+    """Histogrammes glissants par étape, thread-safe, avec export JSONL.
+
+    Args:
+        taille_fenetre (int): Mesures gardées par étape.
+        fichier (Path | str | None): Fichier JSONL (par défaut PORTFOLIO_TRACE_FILE).
+    """
+
+    def __init__(self, taille_fenetre: int = TAILLE_FENETRE, fichier: Path | str | None = None) -> None:
+        self.taille_fenetre = taille_fenetre
+        self.fichier = Path(fichier) if fichier is not None else None
+        self._mesures: dict[str, deque[float]] = {}
+        self._totaux: dict[str, int] = {}
+        self._verrou = threading.Lock()
+        # Lignes JSONL en attente d'écriture, et le thread qui les écrit.
+        self._file_export: queue.Queue[tuple[Path, str]] = queue.Queue()
+        self._ecrivain: threading.Thread | None = None
+
+    def _chemin_export(self) -> Path | None:
+        if self.fichier is not None:
+            return self.fichier
+        chemin = os.getenv("PORTFOLIO_TRACE_FILE", "").strip()
+        return Path(chemin) if chemin else None
+
+    @contextmanager
+    def span(self, etape: str, **attributs: object) -> Iterator[None]:
+        """Mesure la durée d'un bloc, même s'il se termine par une exception.
+
+        Args:
+            etape (str): Nom de l'étape ("tour", "recherche", "agent"...).
+            **attributs (object): Champs ajoutés à la ligne JSONL.
+
+        Yields:
+            None
+        """
+        parent = _SPAN_COURANT.get()
+        span = _Span(parent.trace if parent else uuid.uuid4().hex[:12], etape)
+        jeton = _SPAN_COURANT.set(span)
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            duree_ms = (time.perf_counter() - debut) * 1000
+            _SPAN_COURANT.reset(jeton)
+            self.enregistrer(
+                etape,
+                duree_ms,
+                trace=span.trace,
+                parent=parent.etape if parent else None,
+                **attributs,
+            )
+
+    def enregistrer(self, etape: str, duree_ms: float, **attributs: object) -> None:
+        """Ajoute une mesure à l'histogramme d'une étape (et au JSONL).
+
+        Args:
+            etape (str): Nom de l'étape.
+            duree_ms (float): Durée en millisecondes.
+            **attributs (object): Champs ajoutés à la ligne JSONL.
+
+        Returns:
+            None
+        """
+        chemin = self._chemin_export()
+        ligne = None
+        if chemin is not None:
+            ligne = json.dumps(
+                {"ts": round(time.time(), 3), "etape": etape, "ms": round(duree_ms, 3), **attributs},
+                ensure_ascii=False,
+                default=str,
+            )
+        with self._verrou:
+            mesures = self._mesures.get(etape)
+            if mesures is None:
+                mesures = self._mesures[etape] = deque(maxlen=self.taille_fenetre)
+            mesures.append(duree_ms)
+            self._totaux[etape] = self._totaux.get(etape, 0) + 1
+            if ligne is not None and self._ecrivain is None:
+                self._ecrivain = threading.Thread(target=self._ecrire_en_continu, name="traces", daemon=True)
+                self._ecrivain.start()
+        if ligne is not None:
+            self._file_export.put((chemin, ligne))
+
+    def _ecrire_en_continu(self) -> None:
+        # Thread d'écriture: une ouverture de fichier par lot de lignes en attente.
+        while True:
+            lot = [self._file_export.get()]
+            while True:
+                try:
+                    lot.append(self._file_export.get_nowait())
+                except queue.Empty:
+                    break
+            par_fichier: dict[Path, list[str]] = {}
+            for chemin, ligne in lot:
+                par_fichier.setdefault(chemin, []).append(ligne)
+            for chemin, lignes in par_fichier.items():
+                try:
+                    chemin.parent.mkdir(parents=True, exist_ok=True)
+                    with chemin.open("a", encoding="utf-8") as fichier:
+                        fichier.write("\n".join(lignes) + "\n")
+                except OSError:
+                    # Un fichier de traces inaccessible ne doit pas arrêter l'export.
+                    pass
+            for _ in lot:
+                self._file_export.task_done()
+
+    def vider_export(self, attente: float | None = None) -> bool:
+        """Attend que les lignes JSONL en attente soient écrites.
+
+        Args:
+            attente (float | None): Attente maximale en secondes (None: sans limite).
+
+        Returns:
+            bool: True si tout a été écrit.
+        """
+        fin = None if attente is None else time.monotonic() + attente
+        with self._file_export.all_tasks_done:
+            while self._file_export.unfinished_tasks:
+                reste = None if fin is None else fin - time.monotonic()
+                if reste is not None and reste <= 0:
+                    return False
+                self._file_export.all_tasks_done.wait(reste)
+        return True
+
+    def stats(self) -> dict[str, StatsEtape]:
+        """Retourne les percentiles de chaque étape.
+
+        Returns:
+            dict[str, StatsEtape]: Percentiles, par étape (dans l'ordre d'apparition).
+        """
+        with self._verrou:
+            fenetres = {etape: sorted(mesures) for etape, mesures in self._mesures.items()}
+            totaux = dict(self._totaux)
+        return {
+            etape: StatsEtape(
+                nb=totaux[etape],
+                p50=_percentile(triees, 50),
+                p95=_percentile(triees, 95),
+                p99=_percentile(triees, 99),
+            )
+            for etape, triees in fenetres.items()
+        }
+
+    def percentile(self, etape: str, p: float, *, min_mesures: int = 1) -> float | None:
+        """Retourne un percentile d'une étape sur la fenêtre glissante.
+
+        Args:
+            etape (str): Nom de l'étape.
+            p (float): Percentile voulu (0 à 100).
+            min_mesures (int): Mesures nécessaires dans la fenêtre.
+
+        Returns:
+            float | None: Durée en millisecondes, ou None si trop peu de mesures.
+        """
+        with self._verrou:
+            mesures = self._mesures.get(etape)
+            if mesures is None or len(mesures) < max(1, min_mesures):
+                return None
+            triees = sorted(mesures)
+        return _percentile(triees, min(100.0, max(0.0, p)))
+
+    def vider(self) -> None:
+        """Oublie toutes les mesures.
+
+        Returns:
+            None
+        """
+        with self._verrou:
+            self._mesures.clear()
+            self._totaux.clear()
+
+
+# Traceur partagé par tout le processus
+TRACEUR = Traceur()
+# Les dernières lignes ne sont pas perdues à l'arrêt du processus.
+atexit.register(TRACEUR.vider_export, ATTENTE_EXPORT_SORTIE)
+
+
+def tracer(etape: str, **attributs: object):
+    """Ouvre un span sur le traceur partagé.
+
+    Args:
+        etape (str): Nom de l'étape.
+        **attributs (object): Champs ajoutés à la ligne JSONL.
+
+    Returns:
+        Context manager qui mesure le bloc.
+
+    Exemple:
+        >>> with tracer("exemple"):
+        ...     pass
+        >>> stats_etapes()["exemple"].nb
+        1
+    """
+    return TRACEUR.span(etape, **attributs)
+
+
+def stats_etapes() -> dict[str, StatsEtape]:
+    """Retourne les percentiles de chaque étape du traceur partagé.
+
+    Returns:
+        dict[str, StatsEtape]: Percentiles, par étape.
+    """
+    return TRACEUR.stats()
+
+
+# Alias
+Tracer = Traceur
+StageStats = StatsEtape
+trace_span = tracer
+stage_stats = stats_etapes
@@ -0,0 +1,196 @@
+"""Mémoïsation des recherches pendant un tour de conversation.
+
+Pendant un tour, `injecter_contexte_rag` cherche déjà des extraits pour la
+question et les place dans le prompt. L'agent rappelle ensuite souvent
+`retrieve_portfolio` avec la même question (ou une reformulation plus courte):
+le contexte de tour lui rend alors les extraits déjà récupérés au lieu de
+refaire une requête Upstash.
+
+Le contexte est porté par une `ContextVar`: il suit le tour dans la boucle
+asyncio de `Runner.run_sync` sans rien changer aux signatures.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from .text import tokeniser
+
+
+@dataclass
+class StatsTour:
+    """Compteurs d'un tour (ou cumulés sur plusieurs tours).
+
+    Args:
+        tours (int): Nombre de tours comptés.
+        recherches (int): Recherches effectuées (index ou cache partagé).
+        recherches_servies (int): Recherches servies par les extraits du tour.
+        appels_outil (int): Appels de `retrieve_portfolio` par l'agent.
+        tours_sans_outil (int): Tours avec contexte injecté où l'agent
+            a répondu sans rappeler l'outil (aller-retour LLM économisé).
+        tokens_contexte (int): Tokens d'extraits envoyés au modèle (estimés).
+    """
+
+    tours: int = 0
+    recherches: int = 0
+    recherches_servies: int = 0
+    appels_outil: int = 0
+    tours_sans_outil: int = 0
+    tokens_contexte: int = 0
+
+    def ajouter(self, autre: "StatsTour") -> None:
+        """Additionne les compteurs d'un autre tour.
+
+        Args:
+            autre (StatsTour): Compteurs à ajouter.
+
+        Returns:
+            None
+        """
+        self.tours += autre.tours
+        self.recherches += autre.recherches
+        self.recherches_servies += autre.recherches_servies
+        self.appels_outil += autre.appels_outil
+        self.tours_sans_outil += autre.tours_sans_outil
+        self.tokens_contexte += autre.tokens_contexte
+
+
+@dataclass
+class _Recherche:
+    namespace: str
+    tokens: frozenset[str]
+    top_k: int
+    chunks: list[Any]
+
+
+@dataclass
+class ContexteTour:
+    """Extraits déjà récupérés pendant le tour courant.
+
+    Args:
+        recherches (list): Recherches effectuées pendant le tour.
+        contexte_injecte (bool): Des extraits ont été placés dans le prompt.
+        recherche_degradee (bool): Une recherche du tour a échoué ou dépassé
+            son délai (réponse donnée sans tout le contexte).
+        stats (StatsTour): Compteurs du tour.
+    """
+
+    recherches: list[_Recherche] = field(default_factory=list)
+    contexte_injecte: bool = False
+    recherche_degradee: bool = False
+    stats: StatsTour = field(default_factory=lambda: StatsTour(tours=1))
+
+    @property
+    def contexte_complet(self) -> bool:
+        """Indique si la réponse du tour s'appuie sur un contexte complet.
+
+        Returns:
+            bool: True si des extraits ont été injectés et qu'aucune
+                recherche n'a échoué ni dépassé son délai.
+        """
+        return self.contexte_injecte and not self.recherche_degradee
+
+    def enregistrer(self, query: str, top_k: int, namespace: str, chunks: list[Any]) -> None:
+        """Garde les résultats d'une recherche effectuée pendant le tour.
+
+        Args:
+            query (str): Requête envoyée.
+            top_k (int): Nombre de résultats demandés.
+            namespace (str): Namespace interrogé.
+            chunks (list[Any]): Résultats obtenus.
+
+        Returns:
+            None
+        """
+        self.stats.recherches += 1
+        self.recherches.append(_Recherche(namespace, frozenset(tokeniser(query)), top_k, list(chunks)))
+
+    def chercher(self, query: str, top_k: int, namespace: str) -> list[Any] | None:
+        """Retourne des extraits déjà récupérés qui couvrent la requête.
+
+        Une requête est couverte si tous ses mots significatifs figurent dans
+        une recherche précédente du tour (même namespace) qui demandait au
+        moins autant de résultats.
+
+        Args:
+            query (str): Requête à servir.
+            top_k (int): Nombre de résultats voulus.
+            namespace (str): Namespace interrogé.
+
+        Returns:
+            list[Any] | None: Extraits couvrants, ou None s'il faut chercher.
+        """
+        tokens = frozenset(tokeniser(query))
+        if not tokens:
+            return None
+        for recherche in self.recherches:
+            if (
+                recherche.namespace == namespace
+                and recherche.top_k >= top_k
+                and tokens <= recherche.tokens
+            ):
+                self.stats.recherches_servies += 1
+                return recherche.chunks[:top_k]
+        return None
+
+
+_CONTEXTE: ContextVar[ContexteTour | None] = ContextVar("portfolio_contexte_tour", default=None)
+
+# Cumul sur tout le processus, pour suivre l'effet de la mémoïsation
+_STATS_GLOBALES = StatsTour()
+_VERROU = threading.Lock()
+
+
+def contexte_tour_courant() -> ContexteTour | None:
+    """Retourne le contexte du tour en cours, s'il y en a un.
+
+    Returns:
+        ContexteTour | None: Contexte courant.
+    """
+    return _CONTEXTE.get()
+
+
+@contextmanager
+def tour_de_conversation() -> Iterator[ContexteTour]:
+    """Ouvre un contexte de tour: les recherches du bloc sont mémoïsées.
+
+    Returns:
+        Iterator[ContexteTour]: Contexte du tour (ses stats sont à jour en sortie).
+
+    Exemple:
+        >>> with tour_de_conversation() as tour:
+        ...     pass  # injecter le contexte puis lancer l'agent
+        >>> tour.stats.tours
+        1
+    """
+    tour = ContexteTour()
+    jeton = _CONTEXTE.set(tour)
+    try:
+        yield tour
+    finally:
+        _CONTEXTE.reset(jeton)
+        if tour.contexte_injecte and tour.stats.appels_outil == 0:
+            tour.stats.tours_sans_outil += 1
+        with _VERROU:
+            _STATS_GLOBALES.ajouter(tour.stats)
+
+
+def stats_memoisation() -> StatsTour:
+    """Retourne les compteurs cumulés de tous les tours du processus.
+
+    Returns:
+        StatsTour: Copie des compteurs.
+    """
+    with _VERROU:
+        copie = StatsTour()
+        copie.ajouter(_STATS_GLOBALES)
+        return copie
+
+
+# Alias
+turn_context = tour_de_conversation
+current_turn = contexte_tour_courant
@@ -0,0 +1,96 @@
+"""CLI de préchauffage du cache de réponses.
+
+Usage:
+`python -m portfolio.warm_answers --namespace portfolio --style concis`
+
+À lancer au déploiement, après `portfolio.index_data`: chaque question
+fréquente (suggestions comprises) est posée une fois à l'agent, comme au
+premier tour d'une conversation, et sa réponse est gardée pour la version
+courante du corpus. Les réponses des anciennes versions sont purgées.
+
+`--question` préchauffe d'autres questions: l'app les sert elles aussi au
+premier tour d'une conversation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from agents import Runner
+
+from .agent import obtenir_agent_portfolio
+from .clients import charger_environnement
+from .rag import enrichir_question
+from .reponses import QUESTIONS_FREQUENTES, obtenir_cache_reponses
+from .state import lire_version_corpus
+from .turn import tour_de_conversation
+
+
+def construire_parser() -> argparse.ArgumentParser:
+    """Construit le parser d'arguments.
+
+    Returns:
+        argparse.ArgumentParser: Parser configuré pour la CLI.
+    """
+    parser = argparse.ArgumentParser(description="Precompute answers to frequent questions")
+    parser.add_argument("--namespace", default="portfolio")
+    parser.add_argument("--style", default="concis", help="Answer style used by the app")
+    parser.add_argument(
+        "--question",
+        action="append",
+        dest="questions",
+        help="Question to warm, served on the first turn like the frequent ones "
+        "(repeatable; default: the built-in frequent questions)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompute answers that are already cached for this corpus version",
+    )
+    return parser
+
+
+def main() -> int:
+    """Point d'entrée CLI.
+
+    Returns:
+        int: Code de sortie.
+    """
+    args = construire_parser().parse_args()
+    charger_environnement()
+
+    cache = obtenir_cache_reponses()
+    purgees = cache.purger(args.namespace)
+    agent = obtenir_agent_portfolio(args.namespace, args.style)
+    version = lire_version_corpus(args.namespace) or "(unpublished)"
+    print(f"Corpus version {version}: {purgees} stale answers purged.")
+
+    calculees = 0
+    for question in args.questions or QUESTIONS_FREQUENTES:
+        if not args.force and cache.lire(question, style=args.style, namespace=args.namespace):
+            print(f"  = {question}")
+            continue
+        debut = time.perf_counter()
+        with tour_de_conversation() as tour:
+            # Même entrée qu'au premier tour dans l'app: question enrichie, sans historique.
+            texte_enrichi = enrichir_question(question, namespace=args.namespace)
+            tour.contexte_injecte = texte_enrichi != question
+            result = Runner.run_sync(agent, texte_enrichi, max_turns=6)
+        reponse = (result.final_output or "").strip()
+        if not reponse:
+            print(f"  ! {question} (empty answer, not cached)")
+            continue
+        if not tour.contexte_complet:
+            print(f"  ! {question} (retrieval failed or returned nothing, not cached)")
+            continue
+        cache.ecrire(question, reponse, style=args.style, namespace=args.namespace)
+        calculees += 1
+        print(f"  + {question} ({time.perf_counter() - debut:.1f}s)")
+
+    print(f"Warmed {calculees} answers.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,18 +4,26 @@ Sans CSS ni HTML personnalisé, uniquement les composants natifs Streamlit.
 """
 
 from __future__ import annotations
-import json
 import os
 import random
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 import streamlit as st
-from dotenv import load_dotenv
 from agents import Runner
-from portfolio.agent import build_portfolio_agent
-from portfolio.rag import format_context, search_portfolio
+from portfolio.agent import empreinte_instructions, obtenir_agent_portfolio
+from portfolio.clients import charger_environnement
+from portfolio.commandes import trouver_commande
+from portfolio.intentions import router_message
+from portfolio.prefetch import PRECHARGEUR, questions_de_relance, stats_prechargement
+from portfolio.rag import enrichir_question, stats_recherches_bornees
+from portfolio.reponses import QUESTIONS_FREQUENTES, SUGGESTIONS, est_question_frequente, obtenir_cache_reponses
+from portfolio.stockage import StockageConversations, nouvel_id_conversation, obtenir_stockage
+from portfolio.streaming import FluxReponse
+from portfolio.tracing import stats_etapes, tracer
+from portfolio.turn import contexte_tour_courant, tour_de_conversation
 
 
 # Constantes de l'appli
@@ -23,6 +31,8 @@ from portfolio.rag import format_context, search_portfolio
 TITRE_APP = "Portfolio Yvan NEDELEC"
 NAMESPACE = "portfolio"
 VERSION = "2026-01-15-v12"
+STYLE_REPONSE = "concis"
+REPONSE_VIDE = "Hmm, je n'ai pas compris. Tape 'help' pour voir ce que je peux faire !"
 
 LIENS = {
     "github": "https://github.com/yvan-nedelec-etu",
@@ -30,13 +40,6 @@ LIENS = {
     "email": "yvan.nedelec@etu.univ-poitiers.fr",
 }
 
-SUGGESTIONS = [
-    "Quels sont tes projets ?",
-    "Parle-moi de ton alternance",
-    "Quelles compétences maîtrises-tu ?",
-    "C'est quoi ton parcours ?",
-]
-
 MESSAGE_REMERCIEMENT = f"""---
 
 **Merci d'avoir discuté avec moi !** 🙏
@@ -79,69 +82,29 @@ Je peux aussi vous proposer un quiz pour tester vos connaissances sur moi ! Tape
 """
 
 
-# Sauvegarde simple des conversations (JSON local)
+# Sauvegarde des conversations (SQLite local, l'ancien JSON est importé une fois)
 
 DATA_DIR = Path("data")
 CONV_FILE = DATA_DIR / "conversations.json"
+CONV_DB = DATA_DIR / "conversations.sqlite"
 
 
-def charger_conversations() -> dict:
-    """Charge toutes les conversations sauvegardées depuis le fichier JSON.
-
-    Returns:
-        dict: Dictionnaire des conversations indexées par identifiant.
-    """
-    DATA_DIR.mkdir(exist_ok=True)
-    if CONV_FILE.exists():
-        try:
-            with CONV_FILE.open("r", encoding="utf-8") as f:
-                convs = json.load(f)
-            for conv in convs.values():
-                stats = conv.get("stats")
-                if stats and isinstance(stats.get("debut"), str):
-                    try:
-                        stats["debut"] = datetime.fromisoformat(stats["debut"])
-                    except ValueError:
-                        stats["debut"] = datetime.now()
-            return convs
-        except json.JSONDecodeError:
-            return {}
-    return {}
-
-
-def sauver_conversations(convs: dict) -> None:
-    """Sauvegarde toutes les conversations dans le fichier JSON.
-
-    Args:
-        convs (dict): Conversations à persister.
+def stockage_conversations() -> StockageConversations:
+    """Retourne le stockage des conversations, partagé par toutes les sessions.
 
     Returns:
-        None
+        StockageConversations: Stockage ouvert (ancien JSON migré au premier appel).
     """
-    DATA_DIR.mkdir(exist_ok=True)
-    convs_serializables = {}
-    for cid, conv in convs.items():
-        stats = conv.get("stats", {})
-        debut = stats.get("debut")
-        stats_serializables = dict(stats)
-        if isinstance(debut, datetime):
-            stats_serializables["debut"] = debut.isoformat()
-        convs_serializables[cid] = {
-            "messages": conv.get("messages", []),
-            "previous_response_id": conv.get("previous_response_id"),
-            "stats": stats_serializables,
-        }
-    with CONV_FILE.open("w", encoding="utf-8") as f:
-        json.dump(convs_serializables, f, ensure_ascii=False, indent=2)
+    return obtenir_stockage(CONV_DB, ancien_json=CONV_FILE)
 
 
 def nouvelle_conversation_id() -> str:
-    """Génère un identifiant simple pour une nouvelle conversation.
+    """Génère un identifiant unique pour une nouvelle conversation.
 
     Returns:
-        str: Identifiant unique basé sur la date et l'heure.
+        str: Identifiant basé sur la date et l'heure, avec un suffixe aléatoire.
     """
-    return datetime.now().strftime("%Y%m%d-%H%M%S")
+    return nouvel_id_conversation()
 
 
 # Fonctions utilitaires
@@ -161,17 +124,56 @@ def initialiser_session() -> None:
         "quiz_score": 0,
         "stats": {"questions": 0, "debut": datetime.now()},
         "conversation_id": None,
+        "premier_tour": True,
+        "echanges_hors_chaine": [],
     }
     for cle, val in defauts.items():
         if cle not in st.session_state:
             st.session_state[cle] = val
+    if "prechargement" not in st.session_state:
+        # Jeton de la session: ses préchargements sont annulés quand elle disparaît.
+        st.session_state.prechargement = PRECHARGEUR.ouvrir_session()
     
     if st.session_state.version != VERSION:
         st.session_state.version = VERSION
         st.session_state.previous_response_id = None
+        st.session_state.premier_tour = True
+        st.session_state.echanges_hors_chaine = []
         st.session_state.messages = [{"role": "assistant", "content": MESSAGE_ACCUEIL}]
-        if not st.session_state.conversation_id:
-            st.session_state.conversation_id = nouvelle_conversation_id()
+        # Nouvel accueil, nouvelle conversation: l'ancienne reste dans l'historique.
+        st.session_state.conversation_id = nouvelle_conversation_id()
+        precharger_suggestions()
+
+
+def precharger_suggestions() -> None:
+    """Précharge les recherches des suggestions pendant la lecture de l'accueil.
+
+    Les suggestions dont la réponse est déjà en cache n'auront pas de recherche:
+    elles ne sont pas préchargées.
+
+    Returns:
+        None
+    """
+    cache = obtenir_cache_reponses()
+    questions = [q for q in SUGGESTIONS if not cache.contient(q, style=STYLE_REPONSE, namespace=NAMESPACE)]
+    PRECHARGEUR.precharger(st.session_state.prechargement.id, questions, namespace=NAMESPACE)
+
+
+def precharger_relances(reponse: str) -> None:
+    """Précharge les questions fréquentes proches de la dernière réponse.
+
+    Args:
+        reponse (str): Réponse que le visiteur est en train de lire.
+
+    Returns:
+        None
+    """
+    posees = [m["content"] for m in st.session_state.messages if m["role"] == "user"]
+    PRECHARGEUR.precharger(
+        st.session_state.prechargement.id,
+        questions_de_relance(reponse, QUESTIONS_FREQUENTES, posees),
+        namespace=NAMESPACE,
+    )
 
 
 def obtenir_stats() -> str:
@@ -186,7 +188,67 @@ def obtenir_stats() -> str:
     secs = int(duree.total_seconds() % 60)
     nb_messages = len(st.session_state.messages)
     nb_questions = stats["questions"]
-    return f"💬 {nb_messages} messages • ❓ {nb_questions} questions • ⏱️ {mins}m {secs}s"
+    texte = f"💬 {nb_messages} messages • ❓ {nb_questions} questions • ⏱️ {mins}m {secs}s"
+    recherches_evitees = stats.get("recherches_evitees", 0)
+    appels_evites = stats.get("appels_outil_evites", 0)
+    reponses_en_cache = stats.get("reponses_en_cache", 0)
+    if recherches_evitees or appels_evites or reponses_en_cache:
+        texte += (
+            f"\n\n🔁 {recherches_evitees} recherches réutilisées • ⚡ {appels_evites} appels d'outil évités"
+            f" • 📌 {reponses_en_cache} réponses déjà prêtes"
+        )
+    chemins = stats.get("chemins", {})
+    if chemins:
+        total = sum(chemins.values())
+        parts = sorted(chemins.items(), key=lambda item: -item[1])
+        texte += "\n\n🧭 " + " • ".join(f"{nom} {n / total:.0%}" for nom, n in parts)
+    if stats.get("tokens_contexte"):
+        texte += f"\n\n🧾 ~{stats['tokens_contexte']} tokens de contexte envoyés"
+    ttft, latences = stats.get("ttft_ms", []), stats.get("latence_ms", [])
+    if latences:
+        texte += (
+            f"\n\n⏳ premier mot en {mediane(ttft):.0f} ms • "
+            f"réponse complète en {mediane(latences):.0f} ms (médianes)"
+        )
+    etapes = stats_etapes()
+    prechargement = stats_prechargement()
+    if prechargement.lances:
+        # Compteurs du processus (toutes sessions).
+        texte += (
+            f"\n\n🔮 {prechargement.taux_succes:.0%} des questions déjà préchargées • "
+            f"{prechargement.gaspilles + prechargement.expires} recherches préchargées inutiles "
+            f"sur {prechargement.lances}"
+        )
+    bornees = stats_recherches_bornees()
+    if bornees.relances or bornees.delais_depasses:
+        texte += (
+            f"\n\n⏱️ {bornees.delais_depasses} recherches hors délai (sans contexte) • "
+            f"{bornees.gagnees_par_relance} gagnées par la relance sur {bornees.relances}"
+        )
+        if bornees.relances_evitees:
+            texte += f" • {bornees.relances_evitees} relances suspendues (index lent)"
+    if etapes:
+        # Percentiles du processus (toutes sessions), sur les dernières mesures.
+        texte += "\n\n🔬 Étapes — p50 / p95 / p99 (ms) :"
+        for etape, s in etapes.items():
+            texte += f"\n• {etape} : {s.p50:.0f} / {s.p95:.0f} / {s.p99:.0f} (n={s.nb})"
+    return texte
+
+
+def mediane(valeurs: list[float]) -> float:
+    """Calcule la médiane d'une liste non vide.
+
+    Args:
+        valeurs (list[float]): Valeurs à résumer.
+
+    Returns:
+        float: Médiane.
+    """
+    triees = sorted(valeurs)
+    milieu = len(triees) // 2
+    if len(triees) % 2:
+        return triees[milieu]
+    return (triees[milieu - 1] + triees[milieu]) / 2
 
 
 # Gestion des commandes et du quiz
@@ -266,47 +328,52 @@ def detecter_commande(texte: str) -> str | None:
         str | None: Réponse si une commande est reconnue, sinon None.
     """
     t = texte.lower().strip()
-    
+    commande = trouver_commande(t)
+
     # Petites réponses fun
-    if "42" in t:
+    if commande == "42":
         return "🌌 **42** — *La réponse à la grande question sur la vie, l'univers et le reste.*"
     
-    if "matrix" in t:
+    if commande == "matrix":
         return "💊 *Wake up, Neo... The Matrix has you.* — Pilule rouge ou bleue ?"
     
-    if "hello world" in t:
+    if commande == "hello_world":
         return "👨‍💻 `print('Hello, World!')` — Mon tout premier programme était en PHP, en 2020."
     
-    if "konami" in t:
+    if commande == "konami":
         return "🎮 **↑ ↑ ↓ ↓ ← → ← → B A** — Le légendaire Konami Code !"
     
     # Commandes simples
-    if t in ["help", "aide", "?"]:
+    if commande == "aide":
         return MESSAGE_ACCUEIL
     
-    if any(x in t for x in ["github", "git", "repo"]):
+    if commande == "github":
         return f"🐙 **GitHub** → {LIENS['github']}"
     
-    if any(x in t for x in ["linkedin", "profil pro"]):
+    if commande == "linkedin":
         return f"💼 **LinkedIn** → {LIENS['linkedin']}"
     
-    if any(x in t for x in ["liens", "réseaux", "contact"]):
+    if commande == "liens":
         return f"**🔗 Mes réseaux professionnels**\n\n• 🐙 GitHub : {LIENS['github']}\n• 💼 LinkedIn : {LIENS['linkedin']}"
     
-    if any(x in t for x in ["fun fact", "anecdote", "truc marrant"]):
+    if commande == "anecdote":
         return f"**✨ Le saviez-vous ?**\n\n{random.choice(ANECDOTES)}"
     
-    if any(x in t for x in ["stats", "statistiques"]):
+    if commande == "stats":
         return f"**📈 Statistiques de session**\n\n{obtenir_stats()}"
     
-    if any(x in t for x in ["reset", "recommencer", "effacer"]):
+    if commande == "reset":
+        st.session_state.conversation_id = nouvelle_conversation_id()
         st.session_state.previous_response_id = None
+        st.session_state.premier_tour = True
+        st.session_state.echanges_hors_chaine = []
         st.session_state.messages = [{"role": "assistant", "content": MESSAGE_ACCUEIL}]
         st.session_state.stats = {"questions": 0, "debut": datetime.now()}
         st.session_state.quiz_actif = False
+        precharger_suggestions()
         st.rerun()
     
-    if any(x in t for x in ["quiz", "quizz", "teste"]):
+    if commande == "quiz":
         st.session_state.quiz_actif = True
         st.session_state.quiz_index = 0
         st.session_state.quiz_score = 0
@@ -330,29 +397,31 @@ def injecter_contexte_rag(texte: str) -> str:
     Returns:
         str: Question enrichie avec du contexte si disponible.
     """
-    try:
-        chunks = search_portfolio(texte, top_k=8, namespace=NAMESPACE)
-        ctx = format_context(chunks, max_items=8)
-        if ctx.strip():
-            return f"Infos sur moi:\n{ctx}\n\nQuestion:\n{texte}"
-        return texte
-    except Exception:
-        return texte
+    session = st.session_state.get("prechargement")
+    with tracer("contexte"):
+        if session is not None:
+            # Une recherche préchargée encore en cours est attendue (brièvement).
+            PRECHARGEUR.consommer(session.id, texte)
+        texte_enrichi = enrichir_question(texte, namespace=NAMESPACE)
+    tour = contexte_tour_courant()
+    if tour is not None and texte_enrichi != texte:
+        tour.contexte_injecte = True
+    return texte_enrichi
 
 
 def sauvegarder_conversation_en_cours() -> None:
-    """Sauvegarde la conversation en cours dans le JSON.
+    """Sauvegarde la conversation en cours (seuls les nouveaux messages sont écrits).
 
     Returns:
         None
     """
-    convs = charger_conversations()
-    convs[st.session_state.conversation_id] = {
-        "messages": st.session_state.messages,
-        "previous_response_id": st.session_state.previous_response_id,
-        "stats": st.session_state.stats,
-    }
-    sauver_conversations(convs)
+    with tracer("sauvegarde"):
+        stockage_conversations().sauvegarder(
+            st.session_state.conversation_id,
+            st.session_state.messages,
+            st.session_state.previous_response_id,
+            st.session_state.stats,
+        )
 
 
 def appliquer_theme() -> None:
@@ -418,22 +487,30 @@ def afficher_sidebar_historique() -> None:
     """
     with st.sidebar:
         st.subheader("Historique")
-        convs = charger_conversations()
+        # Seuls les identifiants sont lus; la conversation choisie est chargée à part.
+        ids = stockage_conversations().lister_ids()
 
-        if convs:
-            choix = st.selectbox("Reprendre une conversation", ["(nouvelle)"] + list(convs.keys()))
+        if ids:
+            choix = st.selectbox("Reprendre une conversation", ["(nouvelle)"] + ids)
             if choix != "(nouvelle)" and choix != st.session_state.conversation_id:
-                st.session_state.conversation_id = choix
-                st.session_state.messages = convs[choix]["messages"]
-                st.session_state.previous_response_id = convs[choix].get("previous_response_id")
-                st.session_state.stats = convs[choix].get("stats", st.session_state.stats)
-                st.rerun()
+                conv = stockage_conversations().charger(choix)
+                if conv is not None:
+                    st.session_state.conversation_id = choix
+                    st.session_state.messages = conv["messages"]
+                    st.session_state.previous_response_id = conv["previous_response_id"]
+                    st.session_state.stats = conv["stats"] or st.session_state.stats
+                    reprendre_chaine(conv["messages"], conv["previous_response_id"])
+                    PRECHARGEUR.annuler(st.session_state.prechargement.id)
+                    st.rerun()
 
         if st.button("Nouvelle conversation"):
             st.session_state.conversation_id = nouvelle_conversation_id()
             st.session_state.previous_response_id = None
+            st.session_state.premier_tour = True
+            st.session_state.echanges_hors_chaine = []
             st.session_state.messages = [{"role": "assistant", "content": MESSAGE_ACCUEIL}]
             st.session_state.stats = {"questions": 0, "debut": datetime.now()}
+            precharger_suggestions()
             st.rerun()
 
 
@@ -508,6 +585,165 @@ def lire_message_utilisateur() -> str | None:
     return texte
 
 
+@st.cache_resource(show_spinner=False, max_entries=8)
+def agent_portfolio(namespace: str, style_reponse: str, version: str, empreinte: str) -> Any:
+    """Retourne l'agent partagé, sans le reconstruire à chaque rerun.
+
+    `version` et `empreinte` (prompt système) font partie de la clé du cache:
+    une nouvelle version de l'app ou un prompt modifié donne un nouvel agent.
+
+    Args:
+        namespace (str): Namespace Upstash.
+        style_reponse (str): Style de réponse.
+        version (str): Version de l'application.
+        empreinte (str): Empreinte du prompt (`empreinte_instructions`).
+
+    Returns:
+        Any: Agent prêt à l'emploi.
+    """
+    return obtenir_agent_portfolio(namespace, style_reponse, version=version)
+
+
+def reprendre_chaine(messages: list[dict], previous_response_id: str | None) -> None:
+    """Reconstruit l'état de la chaîne de réponses d'une conversation reprise.
+
+    Une réponse en cache n'entre pas dans la chaîne côté serveur: sans
+    `previous_response_id`, les échanges déjà affichés sont renvoyés à
+    l'agent au tour suivant.
+
+    Args:
+        messages (list[dict]): Messages de la conversation.
+        previous_response_id (str | None): Dernière réponse de l'agent.
+
+    Returns:
+        None
+    """
+    questions = [i for i, m in enumerate(messages) if m["role"] == "user"]
+    st.session_state.premier_tour = not questions
+    st.session_state.echanges_hors_chaine = []
+    if previous_response_id is None and questions:
+        st.session_state.echanges_hors_chaine = [
+            {"role": m["role"], "content": m["content"]} for m in messages[questions[0]:]
+        ]
+
+
+def entree_agent(texte_enrichi: str) -> str | list[dict]:
+    """Construit l'entrée de l'agent pour ce tour.
+
+    Les échanges servis par le cache de réponses sont rejoués avant la
+    question: l'agent (et la chaîne `previous_response_id`) les connaît ensuite.
+
+    Args:
+        texte_enrichi (str): Question, avec le contexte injecté.
+
+    Returns:
+        str | list[dict]: Question seule, ou messages à rejouer puis question.
+    """
+    hors_chaine = st.session_state.echanges_hors_chaine
+    if not hors_chaine:
+        return texte_enrichi
+    return [*hors_chaine, {"role": "user", "content": texte_enrichi}]
+
+
+def raccrocher_chaine(last_response_id: str | None) -> None:
+    """Note la dernière réponse de l'agent: les échanges rejoués sont dans la chaîne.
+
+    Args:
+        last_response_id (str | None): Identifiant de la réponse de l'agent.
+
+    Returns:
+        None
+    """
+    st.session_state.previous_response_id = last_response_id
+    if last_response_id is not None:
+        st.session_state.echanges_hors_chaine = []
+
+
+def streaming_active() -> bool:
+    """Indique si la réponse s'affiche au fil de la génération.
+
+    Returns:
+        bool: False si PORTFOLIO_STREAMING vaut "0" (réponse affichée d'un bloc).
+    """
+    return os.getenv("PORTFOLIO_STREAMING", "1").strip().lower() not in {"0", "false", "non"}
+
+
+def repondre_en_bloc(texte: str, agent: Any) -> tuple[str, float, float]:
+    """Attend la réponse complète de l'agent derrière un spinner, puis l'affiche.
+
+    Args:
+        texte (str): Message utilisateur.
+        agent (Any): Agent de génération de réponses.
+
+    Returns:
+        tuple[str, float, float]: (réponse, premier affichage en s, durée en s).
+    """
+    debut = time.perf_counter()
+    with st.spinner("Je réfléchis..."):
+        texte_enrichi = injecter_contexte_rag(texte)
+        with tracer("agent"):
+            result = Runner.run_sync(
+                agent,
+                entree_agent(texte_enrichi),
+                previous_response_id=st.session_state.previous_response_id,
+                max_turns=6
+            )
+    reponse = (result.final_output or "").strip()
+    if not reponse:
+        reponse = REPONSE_VIDE
+    st.markdown(reponse)
+    raccrocher_chaine(result.last_response_id)
+    # Sans flux, le premier mot apparaît avec la réponse complète.
+    duree = time.perf_counter() - debut
+    return reponse, duree, duree
+
+
+def repondre_en_flux(texte: str, agent: Any) -> tuple[str, float, float]:
+    """Affiche la réponse de l'agent au fur et à mesure de sa génération.
+
+    Args:
+        texte (str): Message utilisateur.
+        agent (Any): Agent de génération de réponses.
+
+    Returns:
+        tuple[str, float, float]: (réponse, premier mot en s, durée en s).
+    """
+    debut = time.perf_counter()
+    with st.spinner("Je réfléchis..."):
+        texte_enrichi = injecter_contexte_rag(texte)
+    flux = FluxReponse(
+        agent,
+        entree_agent(texte_enrichi),
+        previous_response_id=st.session_state.previous_response_id,
+        max_turns=6,
+    )
+    # La recherche du contexte fait partie de l'attente perçue.
+    avant_flux = time.perf_counter() - debut
+    with tracer("agent"):
+        st.write_stream(flux)
+    reponse = flux.texte.strip()
+    if not reponse:
+        reponse = REPONSE_VIDE
+        st.markdown(reponse)
+    raccrocher_chaine(flux.last_response_id)
+    duree = time.perf_counter() - debut
+    ttft = avant_flux + flux.ttft if flux.ttft is not None else duree
+    return reponse, ttft, duree
+
+
+def compter_chemin(chemin: str) -> None:
+    """Compte le chemin de réponse emprunté par un message.
+
+    Args:
+        chemin (str): "commande", "cache", "rag" ou une intention du routeur.
+
+    Returns:
+        None
+    """
+    chemins = st.session_state.stats.setdefault("chemins", {})
+    chemins[chemin] = chemins.get(chemin, 0) + 1
+
+
 def traiter_message_utilisateur(texte: str, agent: Any) -> None:
     """Traite un message utilisateur et met à jour l'UI.
 
@@ -524,6 +760,7 @@ def traiter_message_utilisateur(texte: str, agent: Any) -> None:
 
     reponse_commande = detecter_commande(texte)
     if reponse_commande:
+        compter_chemin("commande")
         with st.chat_message("assistant"):
             st.markdown(reponse_commande)
         st.session_state.messages.append({"role": "assistant", "content": reponse_commande})
@@ -531,25 +768,68 @@ def traiter_message_utilisateur(texte: str, agent: Any) -> None:
         st.rerun()
 
     st.session_state.stats["questions"] += 1
+    stats = st.session_state.stats
 
-    with st.chat_message("assistant"):
-        with st.spinner("Je réfléchis..."):
-            texte_enrichi = injecter_contexte_rag(texte)
-            result = Runner.run_sync(
-                agent,
-                texte_enrichi,
-                previous_response_id=st.session_state.previous_response_id,
-                max_turns=6
-            )
+    # Small talk et hors-sujet: réponse toute prête, sans recherche ni modèle.
+    intention, reponse_rapide = router_message(texte)
+    if reponse_rapide is not None:
+        compter_chemin(intention)
+        with st.chat_message("assistant"):
+            st.markdown(reponse_rapide)
+        st.session_state.messages.append({"role": "assistant", "content": reponse_rapide})
+        sauvegarder_conversation_en_cours()
+        st.rerun()
 
-        reponse = (result.final_output or "").strip()
-        if not reponse:
-            reponse = "Hmm, je n'ai pas compris. Tape 'help' pour voir ce que je peux faire !"
-        st.markdown(reponse)
+    # Un span par tour: la recherche, l'agent et la sauvegarde en sont les étapes.
+    with tracer("tour"):
+        # Au premier tour, la question ne dépend d'aucun échange précédent: sa
+        # réponse peut venir du cache (même version du corpus, même prompt),
+        # qu'elle soit fréquente ou préchauffée avec `warm_answers --question`.
+        premier_tour = st.session_state.premier_tour
+        st.session_state.premier_tour = False
+        reponse = None
+        if premier_tour:
+            debut = time.perf_counter()
+            reponse = obtenir_cache_reponses().lire(texte, style=STYLE_REPONSE, namespace=NAMESPACE)
+            ttft = duree = time.perf_counter() - debut
 
-    st.session_state.previous_response_id = result.last_response_id
-    st.session_state.messages.append({"role": "assistant", "content": reponse})
-    sauvegarder_conversation_en_cours()
+        with st.chat_message("assistant"):
+            if reponse is not None:
+                st.markdown(reponse)
+                stats["reponses_en_cache"] = stats.get("reponses_en_cache", 0) + 1
+                compter_chemin("cache")
+                # Hors de la chaîne côté serveur: rejoué à l'agent au tour suivant.
+                st.session_state.echanges_hors_chaine += [
+                    {"role": "user", "content": texte},
+                    {"role": "assistant", "content": reponse},
+                ]
+            else:
+                # Le tour mémoïse les recherches: l'outil de l'agent réutilise le contexte injecté.
+                with tour_de_conversation() as tour:
+                    if streaming_active():
+                        reponse, ttft, duree = repondre_en_flux(texte, agent)
+                    else:
+                        reponse, ttft, duree = repondre_en_bloc(texte, agent)
+                compter_chemin("rag")
+                stats["recherches_evitees"] = stats.get("recherches_evitees", 0) + tour.stats.recherches_servies
+                stats["appels_outil_evites"] = stats.get("appels_outil_evites", 0) + tour.stats.tours_sans_outil
+                stats["tokens_contexte"] = stats.get("tokens_contexte", 0) + tour.stats.tokens_contexte
+                # Seules les questions fréquentes entrent dans le cache au fil de l'eau, et
+                # seulement avec tout leur contexte (pas de réponse dégradée par un délai).
+                if (
+                    premier_tour
+                    and est_question_frequente(texte)
+                    and reponse != REPONSE_VIDE
+                    and tour.contexte_complet
+                ):
+                    obtenir_cache_reponses().ecrire(texte, reponse, style=STYLE_REPONSE, namespace=NAMESPACE)
+            stats.setdefault("ttft_ms", []).append(round(ttft * 1000))
+            stats.setdefault("latence_ms", []).append(round(duree * 1000))
+
+        st.session_state.messages.append({"role": "assistant", "content": reponse})
+        sauvegarder_conversation_en_cours()
+        if reponse != REPONSE_VIDE:
+            precharger_relances(reponse)
     st.rerun()
 
 
@@ -561,7 +841,9 @@ def main() -> None:
     Returns:
         None
     """
-    load_dotenv(override=True)
+    # Le .env n'est lu qu'une fois par processus: le client Upstash partagé
+    # (et ses connexions keep-alive) survit ainsi aux reruns Streamlit.
+    charger_environnement()
     
     st.set_page_config(
         page_title="Portfolio Yvan NEDELEC",
@@ -575,7 +857,7 @@ def main() -> None:
     afficher_entete()
     verifier_cle_api()
 
-    agent = build_portfolio_agent(namespace=NAMESPACE, style_reponse="concis")
+    agent = agent_portfolio(NAMESPACE, STYLE_REPONSE, VERSION, empreinte_instructions(STYLE_REPONSE, VERSION))
 
     afficher_messages()
     afficher_remerciement_si_necessaire()
@@ -0,0 +1,88 @@
+"""Tests de la détection des commandes du chat (automate d'Aho-Corasick)."""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.bench_commandes import detection_chaine
+from portfolio.commandes import MOTS_CLES_COMMANDES, AutomateCommandes, trouver_commande
+
+
+# (message, commande attendue): même réponse que l'ancienne chaîne de `in`
+COMMANDES: list[tuple[str, str]] = [
+    ("42", "42"),
+    ("Quelle est la réponse ? 42 !", "42"),
+    ("matrix", "matrix"),
+    ("hello world", "hello_world"),
+    ("Hello World!", "hello_world"),
+    ("konami", "konami"),
+    ("help", "aide"),
+    ("  Aide ", "aide"),
+    ("?", "aide"),
+    ("github", "github"),
+    ("Tu as un repo ?", "github"),
+    ("ton git stp", "github"),
+    ("linkedin", "linkedin"),
+    ("ton profil pro ?", "linkedin"),
+    ("liens", "liens"),
+    ("tes réseaux", "liens"),
+    ("contact", "liens"),
+    ("Comment te contacter ?", "liens"),
+    ("fun fact", "anecdote"),
+    ("une anecdote ?", "anecdote"),
+    ("un truc marrant", "anecdote"),
+    ("stats", "stats"),
+    ("statistiques", "stats"),
+    ("reset", "reset"),
+    ("on recommencer", "reset"),
+    ("effacer", "reset"),
+    ("quiz", "quiz"),
+    ("quizz !", "quiz"),
+    ("teste-moi", "quiz"),
+    # Priorité de l'ancienne chaîne: la première commande de la table gagne
+    ("un quiz sur github", "github"),
+    ("42 liens", "42"),
+]
+
+# Faux positifs corrigés (mot-clé au milieu d'un mot, mot-clé exact dans une phrase)
+FAUX_POSITIFS = [
+    "Tu travailles dans le digital ?",
+    "Je teste ton chatbot",
+    "Tu as fait de la reprogrammation ?",
+    "En 2042 tu feras quoi ?",
+    "Des contacts en entreprise ?",
+    "Help me with my homework",
+]
+
+QUESTIONS = ["Quels sont tes projets ?", "Parle-moi de ton alternance", ""]
+
+
+@pytest.mark.parametrize(("message", "attendu"), COMMANDES)
+def test_commande_reconnue(message, attendu):
+    assert trouver_commande(message) == attendu
+
+
+@pytest.mark.parametrize(("message", "attendu"), COMMANDES)
+def test_meme_commande_que_l_ancienne_chaine(message, attendu):
+    assert detection_chaine(message, MOTS_CLES_COMMANDES) == trouver_commande(message)
+
+
+@pytest.mark.parametrize("message", FAUX_POSITIFS)
+def test_faux_positifs_corriges(message):
+    assert trouver_commande(message) is None
+
+
+@pytest.mark.parametrize("message", QUESTIONS)
+def test_question_ordinaire(message):
+    assert trouver_commande(message) is None
+
+
+def test_grande_table_respecte_la_priorite():
+    table = [
+        (f"{nom}_{copie}", tuple(f"{mot}{copie}" for mot in mots))
+        for copie in range(3)
+        for nom, mots in MOTS_CLES_COMMANDES
+    ]
+    automate = AutomateCommandes(table)
+    for message in ("github1 quiz2", "reset0", "un quiz2 sur linkedin2"):
+        assert automate.trouver(message) == detection_chaine(message, table)
@@ -0,0 +1,29 @@
+"""Tests de l'envoi par lots et de la CLI d'indexation."""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.outils import IndexFactice
+from portfolio.index_data import construire_parser
+from portfolio.indexing import upsert_par_lots
+
+
+CHUNKS = [
+    {"id": f"c{i}", "text": f"texte {i}", "metadata": {"source": "a.md", "heading": "Titre"}}
+    for i in range(5)
+]
+
+
+@pytest.mark.parametrize("nb_essais", [0, -1, 1])
+def test_un_envoi_au_moins_par_lot(nb_essais):
+    index = IndexFactice()
+    upsert_par_lots(index, CHUNKS, taille_lot=2, nb_essais=nb_essais)
+    assert index.vecteurs == len(CHUNKS)
+
+
+@pytest.mark.parametrize("option", ["--retries", "--batch-size", "--batch-bytes", "--workers", "--jobs"])
+@pytest.mark.parametrize("valeur", ["0", "-3"])
+def test_cli_refuse_les_valeurs_non_positives(option, valeur):
+    with pytest.raises(SystemExit):
+        construire_parser().parse_args([option, valeur])
@@ -0,0 +1,64 @@
+"""Tests du routeur d'intentions."""
+
+from __future__ import annotations
+
+import pytest
+
+from portfolio.intentions import (
+    INTENTION_AU_REVOIR,
+    INTENTION_CA_VA,
+    INTENTION_HORS_SUJET,
+    INTENTION_PORTFOLIO,
+    INTENTION_REMERCIEMENT,
+    INTENTION_SALUTATION,
+    RouteurIntentions,
+)
+
+
+@pytest.fixture(scope="module")
+def routeur():
+    return RouteurIntentions()
+
+
+@pytest.mark.parametrize(
+    ("message", "intention"),
+    [
+        ("Bonjour !", INTENTION_SALUTATION),
+        ("salut yvan", INTENTION_SALUTATION),
+        ("bonjoour", INTENTION_SALUTATION),
+        ("Bonjour, ça va ?", INTENTION_CA_VA),
+        ("comment vas-tu ?", INTENTION_CA_VA),
+        ("quoi de neuf ?", INTENTION_CA_VA),
+        ("merci beaucoup", INTENTION_REMERCIEMENT),
+        ("thank you", INTENTION_REMERCIEMENT),
+        ("au revoir", INTENTION_AU_REVOIR),
+        ("à plus", INTENTION_AU_REVOIR),
+        ("bonne soirée", INTENTION_AU_REVOIR),
+        ("une recette de crêpes ?", INTENTION_HORS_SUJET),
+    ],
+)
+def test_intentions_reconnues(routeur, message, intention):
+    assert routeur.classer(message).intention == intention
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        # Mots outils seuls: pas de réponse toute prête.
+        "comment",
+        "comment ?",
+        "quoi",
+        "quoi ?",
+        "au",
+        "plus",
+        "tu",
+        "va",
+        "tu vas ?",
+        # Questions sur le portfolio, même avec une salutation ou une adresse directe.
+        "Bonjour, quels sont tes projets ?",
+        "tu cuisines ?",
+        "Quels sont tes centres d'intérêt ?",
+    ],
+)
+def test_messages_envoyes_au_rag(routeur, message):
+    assert routeur.classer(message).intention == INTENTION_PORTFOLIO
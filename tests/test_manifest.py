@@ -0,0 +1,52 @@
+"""Tests du manifeste d'indexation incrémentale."""
+
+from __future__ import annotations
+
+import pytest
+
+from portfolio.chunking import DecoupeStricte, chunk_markdown_files, dedupliquer_chunks
+from portfolio.manifest import DiffIndex, calculer_diff, iterer_diff, valider_manifeste
+
+
+@pytest.fixture
+def donnees(tmp_path, monkeypatch):
+    monkeypatch.setenv("PORTFOLIO_STATE_DIR", str(tmp_path / "etat"))
+    dossier = tmp_path / "data"
+    dossier.mkdir()
+    (dossier / "projets.md").write_text("# Projets\n\n" + "Une phrase sur un projet de data. " * 40, encoding="utf-8")
+    (dossier / "alternance.md").write_text("# Alternance\n\nData Analyst à la MAIF.\n", encoding="utf-8")
+    return str(dossier)
+
+
+def _indexer(donnees: str, **options) -> DiffIndex:
+    diff = DiffIndex()
+    chunks = list(iterer_diff(donnees, "test", diff, **options))
+    valider_manifeste("test", diff)
+    assert diff.nb_a_upserter == len(chunks)
+    return diff
+
+
+def test_decoupe_stricte_ignore_max_chars(donnees):
+    stricte = DecoupeStricte(max_tokens=40, chevauchement=8)
+    assert _indexer(donnees, max_chars=1000, stricte=stricte).nb_a_upserter > 0
+
+    assert calculer_diff(donnees, "test", max_chars=200, stricte=stricte).nb_a_upserter == 0
+    assert calculer_diff(donnees, "test", max_chars=1000, stricte=DecoupeStricte(40, 4)).nb_a_upserter > 0
+    assert calculer_diff(donnees, "test", max_chars=1000).nb_a_upserter > 0
+
+
+def test_meme_chunk_retenu_en_local_et_dans_le_manifeste(tmp_path, monkeypatch):
+    monkeypatch.setenv("PORTFOLIO_STATE_DIR", str(tmp_path / "etat"))
+    dossier = tmp_path / "data"
+    (dossier / "a").mkdir(parents=True)
+    # Parcours: a/b.md puis a-b.md; ordre alphabétique des sources: a-b.md puis a/b.md.
+    (dossier / "a" / "b.md").write_text("# Contact\n\n- Email : y@x.fr\n", encoding="utf-8")
+    (dossier / "a-b.md").write_text("# Résumé\n\n## Contact\n\n- email : y@x.fr\n", encoding="utf-8")
+
+    locaux = dedupliquer_chunks(chunk_markdown_files(str(dossier)))
+    envoyes = list(iterer_diff(str(dossier), "test", DiffIndex()))
+
+    assert [(c.id, c.text, c.source, c.sources) for c in locaux] == [
+        (c.id, c.text, c.source, c.sources) for c in envoyes
+    ]
+    assert [c.source for c in locaux] == ["a-b.md"]
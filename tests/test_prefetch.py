@@ -0,0 +1,25 @@
+"""Tests des compteurs du préchargement spéculatif."""
+
+from __future__ import annotations
+
+from portfolio.prefetch import Prechargeur
+
+
+def _rechercher(question: str, namespace: str) -> list[dict]:
+    # "hors délai": comme une recherche qui a dépassé son délai (rien en cache).
+    return [] if question == "hors délai" else [{"id": "c0", "text": question}]
+
+
+def test_prechargement_expire_n_est_pas_un_succes():
+    prechargeur = Prechargeur(rechercher=_rechercher)
+    prechargeur.precharger("s1", ["Quels sont tes projets ?", "hors délai"])
+
+    assert prechargeur.consommer("s1", "Quels sont tes projets ?")
+    assert not prechargeur.consommer("s1", "hors délai")
+    assert not prechargeur.consommer("s1", "Parle-moi de ton alternance")
+
+    stats = prechargeur.stats()
+    assert (stats.utilises, stats.expires, stats.manques) == (1, 1, 1)
+    assert stats.taux_succes == 1 / 3
+    assert stats.taux_gaspillage == 1 / 2
+    prechargeur.arreter()
@@ -0,0 +1,113 @@
+"""Tests des recherches bornées par un délai."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from upstash_vector import Index
+
+from benchmarks.outils import IndexFactice
+from portfolio import rag
+from portfolio.clients import RegistreClients
+from portfolio.rag import MAX_REQUETES_ABANDONNEES, asearch_portfolio, search_portfolio, stats_recherches_bornees
+from portfolio.turn import tour_de_conversation
+
+
+RESERVE = [
+    {"id": f"c{i}", "text": f"extrait {i}", "metadata": {"source": "a.md", "heading": "Titre"}}
+    for i in range(8)
+]
+
+
+class IndexEnPanne(IndexFactice):
+    def query(self, **options):
+        raise RuntimeError("index indisponible")
+
+
+def test_recherche_complete_garde_le_tour_fiable():
+    with tour_de_conversation() as tour:
+        chunks = search_portfolio("projets", index=IndexFactice(reserve=RESERVE), utiliser_cache=False, delai=1.0)
+        tour.contexte_injecte = bool(chunks)
+    assert chunks
+    assert tour.contexte_complet
+
+
+def test_delai_depasse_degrade_le_tour():
+    with tour_de_conversation() as tour:
+        debut = time.monotonic()
+        chunks = search_portfolio(
+            "projets", index=IndexFactice(latence=1.0, reserve=RESERVE), utiliser_cache=False, delai=0.1
+        )
+        assert time.monotonic() - debut < 0.5
+    assert chunks == []
+    assert tour.recherche_degradee
+    assert not tour.contexte_complet
+
+
+def test_erreur_d_index_degrade_le_tour():
+    with tour_de_conversation() as tour:
+        with pytest.raises(RuntimeError):
+            search_portfolio("projets", index=IndexEnPanne(), utiliser_cache=False, delai=1.0)
+    assert tour.recherche_degradee
+
+
+def _attendre_fin_des_abandons(limite: float = 2.0) -> None:
+    fin = time.monotonic() + limite
+    while stats_recherches_bornees().abandonnees_en_cours and time.monotonic() < fin:
+        time.sleep(0.02)
+
+
+def test_relances_suspendues_quand_le_pool_est_encombre(monkeypatch):
+    monkeypatch.setattr(rag, "delai_relance", lambda: 0.02)
+    _attendre_fin_des_abandons()
+    avant = stats_recherches_bornees()
+    lent = IndexFactice(latence=0.6, reserve=RESERVE)
+    for _ in range(MAX_REQUETES_ABANDONNEES):
+        assert search_portfolio("projets", index=lent, utiliser_cache=False, delai=0.1) == []
+
+    pendant = stats_recherches_bornees()
+    # Chaque appel abandonne sa requête et sa relance, jusqu'à la limite: ensuite, plus de relance.
+    assert pendant.relances - avant.relances == MAX_REQUETES_ABANDONNEES // 2
+    assert pendant.relances_evitees - avant.relances_evitees == MAX_REQUETES_ABANDONNEES // 2
+    # Le pool sert encore les recherches suivantes.
+    assert search_portfolio("projets", index=IndexFactice(reserve=RESERVE), utiliser_cache=False, delai=0.5)
+
+    _attendre_fin_des_abandons()
+    assert stats_recherches_bornees().abandonnees_en_cours == 0
+
+
+def test_index_synchrone_ne_bloque_pas_la_boucle():
+    async def scenario():
+        debut = time.monotonic()
+        battements = []
+
+        async def battre():
+            while time.monotonic() - debut < 0.3:
+                battements.append(time.monotonic() - debut)
+                await asyncio.sleep(0.02)
+
+        lent = IndexFactice(latence=0.5, reserve=RESERVE)
+        chunks, _ = await asyncio.gather(
+            asearch_portfolio("projets", index=lent, utiliser_cache=False, delai=0.2), battre()
+        )
+        return chunks, battements, time.monotonic() - debut
+
+    chunks, battements, duree = asyncio.run(scenario())
+    assert chunks == []
+    assert len(battements) >= 5
+    assert duree < 0.45
+
+
+def test_client_de_recherche_borne():
+    registre = RegistreClients(fabrique=Index)
+    defaut = registre.obtenir("https://exemple.upstash.io", "jeton")
+    borne = registre.obtenir("https://exemple.upstash.io", "jeton", delai_http=0.5)
+
+    assert borne is not defaut
+    assert borne._client.timeout.read == 0.5
+    assert borne._retries == 0
+    assert defaut._client.timeout.read == 600.0
+    assert registre.obtenir("https://exemple.upstash.io", "jeton", delai_http=0.5) is borne
+    assert registre.invalider() == 2
@@ -0,0 +1,16 @@
+"""Tests du cache de réponses aux questions fréquentes."""
+
+from __future__ import annotations
+
+import pytest
+
+from portfolio.commandes import trouver_commande
+from portfolio.intentions import router_message
+from portfolio.reponses import QUESTIONS_FREQUENTES
+
+
+@pytest.mark.parametrize("question", QUESTIONS_FREQUENTES)
+def test_question_frequente_atteint_le_cache(question):
+    # Une commande ou une réponse toute prête passerait avant le cache.
+    assert trouver_commande(question) is None
+    assert router_message(question)[1] is None
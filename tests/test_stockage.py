@@ -0,0 +1,72 @@
+"""Tests du stockage SQLite des conversations."""
+
+from __future__ import annotations
+
+from portfolio import stockage as stockage_module
+from portfolio.stockage import StockageConversations
+
+
+ACCUEIL = {"role": "assistant", "content": "Bonjour !"}
+STATS = {"questions": 0}
+
+
+def _echange(question: str, reponse: str) -> list[dict]:
+    return [{"role": "user", "content": question}, {"role": "assistant", "content": reponse}]
+
+
+def test_ajout_ecrit_seulement_les_nouveaux_messages(tmp_path):
+    stockage = StockageConversations(tmp_path / "conv.sqlite")
+    assert stockage.sauvegarder("c1", [ACCUEIL], None, STATS) == 1
+    assert stockage.sauvegarder("c1", [ACCUEIL, *_echange("q1", "r1")], "resp_1", STATS) == 2
+    assert stockage.sauvegarder("c1", [ACCUEIL, *_echange("q1", "r1")], "resp_1", STATS) == 0
+    assert stockage.charger("c1")["messages"] == [ACCUEIL, *_echange("q1", "r1")]
+
+
+def test_reset_puis_sauvegarde_de_meme_longueur(tmp_path):
+    stockage = StockageConversations(tmp_path / "conv.sqlite")
+    stockage.sauvegarder("c1", [ACCUEIL, *_echange("q1", "r1")], "resp_1", STATS)
+    stockage.sauvegarder("c1", [ACCUEIL], None, STATS)
+    ecrits = stockage.sauvegarder("c1", [ACCUEIL, *_echange("q2", "r2")], "resp_2", STATS)
+
+    assert ecrits == 2
+    conversation = stockage.charger("c1")
+    assert conversation["messages"] == [ACCUEIL, *_echange("q2", "r2")]
+    assert conversation["previous_response_id"] == "resp_2"
+
+
+def test_reset_sans_sauvegarde_intermediaire(tmp_path):
+    stockage = StockageConversations(tmp_path / "conv.sqlite")
+    stockage.sauvegarder("c1", [ACCUEIL, *_echange("q1", "r1")], "resp_1", STATS)
+    ecrits = stockage.sauvegarder("c1", [ACCUEIL, *_echange("q2", "r2"), *_echange("q3", "r3")], "resp_3", STATS)
+
+    assert ecrits == 4
+    assert stockage.charger("c1")["messages"] == [ACCUEIL, *_echange("q2", "r2"), *_echange("q3", "r3")]
+
+
+def test_ajout_ne_hache_que_les_nouveaux_messages(tmp_path, monkeypatch):
+    stockage = StockageConversations(tmp_path / "conv.sqlite")
+    messages = [ACCUEIL]
+    for numero in range(50):
+        messages += _echange(f"q{numero}", f"r{numero}")
+    stockage.sauvegarder("c1", messages, "resp_1", STATS)
+
+    haches = []
+    original = stockage_module.empreintes_chainees
+
+    def compter(messages_haches, depart=""):
+        haches.append(len(messages_haches))
+        return original(messages_haches, depart)
+
+    monkeypatch.setattr(stockage_module, "empreintes_chainees", compter)
+    assert stockage.sauvegarder("c1", [*messages, *_echange("q", "r")], "resp_2", STATS) == 2
+    assert sum(haches) <= 4
+
+    monkeypatch.undo()
+    rechaine = original(stockage.charger("c1")["messages"])
+    stockees = [
+        empreinte
+        for (empreinte,) in stockage._connexion.execute(
+            "SELECT empreinte FROM messages WHERE conversation_id = 'c1' ORDER BY position"
+        )
+    ]
+    assert stockees == rechaine
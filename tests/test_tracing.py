@@ -0,0 +1,68 @@
+"""Tests de l'export JSONL des spans."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from portfolio.tracing import Traceur
+
+
+def test_export_de_spans_concurrents(tmp_path):
+    fichier = tmp_path / "traces" / "spans.jsonl"
+    traceur = Traceur(fichier=fichier)
+
+    def tracer_tours(numero: int) -> None:
+        for _ in range(50):
+            with traceur.span("tour", thread=numero):
+                with traceur.span("recherche"):
+                    pass
+
+    threads = [threading.Thread(target=tracer_tours, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert traceur.vider_export(attente=5)
+
+    lignes = [json.loads(ligne) for ligne in fichier.read_text(encoding="utf-8").splitlines()]
+    assert len(lignes) == 8 * 50 * 2
+    assert traceur.stats()["tour"].nb == 8 * 50
+    recherches = [ligne for ligne in lignes if ligne["etape"] == "recherche"]
+    assert all(ligne["parent"] == "tour" for ligne in recherches)
+
+
+def test_un_disque_lent_ne_ralentit_pas_les_spans(tmp_path, monkeypatch):
+    ouvrir = Path.open
+
+    def ouvrir_lentement(self, *args, **kwargs):
+        time.sleep(0.2)
+        return ouvrir(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "open", ouvrir_lentement)
+    traceur = Traceur(fichier=tmp_path / "spans.jsonl")
+
+    debut = time.perf_counter()
+    for _ in range(20):
+        traceur.enregistrer("recherche", 1.0)
+    assert time.perf_counter() - debut < 0.1
+
+    assert traceur.vider_export(attente=5)
+    assert len((tmp_path / "spans.jsonl").read_text(encoding="utf-8").splitlines()) == 20
+
+
+def test_lignes_ecrites_a_l_arret_du_processus(tmp_path):
+    fichier = tmp_path / "spans.jsonl"
+    code = "from portfolio.tracing import tracer\nfor _ in range(100):\n    with tracer('tour'):\n        pass\n"
+    subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "PORTFOLIO_TRACE_FILE": str(fichier)},
+    )
+    assert len(fichier.read_text(encoding="utf-8").splitlines()) == 100